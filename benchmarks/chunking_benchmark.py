@@ -0,0 +1,77 @@
+"""Compare the legacy 50-word splitter with the token chunker.
+
+Usage (from the repository root, with the usual environment variables set):
+
+    python -m benchmarks.chunking_benchmark path/to/file.pdf [--embed]
+
+For each chunker it reports the number of chunks (one Qdrant point each),
+the tokens that would be embedded, the embedding requests the batched API
+needs and the chunking time. ``--embed`` also embeds every chunk through
+OpenAI, bypassing the persistent cache, and reports the wall-clock time.
+"""
+
+import argparse
+import asyncio
+from pathlib import Path
+import time
+from typing import List, Tuple
+
+import PyPDF2
+
+from src.core.rag.chunking import Chunker, TokenChunker, WordChunker
+from src.core.rag.qdrant import SemanticEmbeddingService
+from src.llm.tokens import estimate_tokens
+
+
+def load_pages(path: Path) -> List[Tuple[int, str]]:
+    if path.suffix.lower() == ".pdf":
+        with open(path, "rb") as f:
+            reader = PyPDF2.PdfReader(f)
+            return [(i, page.extract_text() or "") for i, page in enumerate(reader.pages, 1)]
+    return [(1, path.read_text())]
+
+
+async def run(path: Path, embed: bool) -> None:
+    pages = load_pages(path)
+    chunkers: List[Tuple[str, Chunker]] = [
+        ("word-50", WordChunker(50)),
+        ("token", TokenChunker()),
+    ]
+    embedding_service = SemanticEmbeddingService(persistent_cache=None)
+
+    print(f"{path.name}: {len(pages)} page(s), {sum(len(t) for _, t in pages)} characters")
+    print(
+        f"{'chunker':<10}{'chunks':>8}{'tokens':>10}{'requests':>10}{'chunk ms':>10}{'embed s':>10}"
+    )
+    for name, chunker in chunkers:
+        start = time.perf_counter()
+        texts = [chunk.text for chunk in chunker.chunk_pages(pages)]
+        chunk_ms = (time.perf_counter() - start) * 1000
+
+        tokens = sum(estimate_tokens(text) for text in texts)
+        requests = len(
+            embedding_service._plan_batches(
+                list(dict.fromkeys(texts)),
+                embedding_service.backend.max_batch_tokens,
+                embedding_service.backend.max_batch_size,
+            )
+        )
+
+        embed_seconds = "-"
+        if embed:
+            embedding_service.embeddings_cache.clear()
+            start = time.perf_counter()
+            await embedding_service.get_embeddings_batch(texts)
+            embed_seconds = f"{time.perf_counter() - start:.2f}"
+
+        print(
+            f"{name:<10}{len(texts):>8}{tokens:>10}{requests:>10}{chunk_ms:>10.1f}{embed_seconds:>10}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--embed", action="store_true", help="also time real embedding calls")
+    args = parser.parse_args()
+    asyncio.run(run(args.path, args.embed))
@@ -0,0 +1,150 @@
+"""Compare recall and latency of the Qdrant collection profiles.
+
+Usage (from the repository root, with the usual environment variables set):
+
+    python -m benchmarks.collection_profiles_benchmark [--source] [--points 10000]
+
+Every profile gets a temporary collection with the same vectors. Queries are
+perturbed copies of stored vectors, and recall@k is measured against an exact
+float32 search done with numpy. ``--source`` samples the vectors from the
+live collection instead of generating clustered random ones. The memory
+columns estimate RAM and disk use for a million 1536-d vectors.
+"""
+
+import argparse
+import asyncio
+import time
+from typing import List, Optional
+
+import numpy as np
+from qdrant_client import models
+
+from src.config.config import config
+from src.core.rag.collection_profiles import PROFILES, CollectionProfile
+from src.core.rag.qdrant import SemanticEmbeddingService, SemanticQdrantService
+
+
+def synthetic_vectors(count: int, dimension: int, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(max(1, count // 50), dimension))
+    vectors = centers[rng.integers(0, len(centers), count)] + rng.normal(
+        scale=0.6, size=(count, dimension)
+    )
+    return normalize(vectors.astype(np.float32))
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+async def sample_vectors(qdrant_service: SemanticQdrantService, count: int) -> np.ndarray:
+    vectors: List[List[float]] = []
+    offset = None
+    while len(vectors) < count:
+        points, offset = await qdrant_service.client.scroll(
+            collection_name=SemanticEmbeddingService(persistent_cache=None).collection_name,
+            limit=min(1000, count - len(vectors)),
+            offset=offset,
+            with_vectors=True,
+        )
+        vectors.extend(point.vector for point in points)  # type: ignore
+        if offset is None:
+            break
+    return normalize(np.asarray(vectors, dtype=np.float32))
+
+
+async def wait_until_indexed(qdrant_service: SemanticQdrantService, name: str) -> None:
+    while (
+        await qdrant_service.client.get_collection(name)
+    ).status != models.CollectionStatus.GREEN:
+        await asyncio.sleep(0.5)
+
+
+async def bench_profile(
+    qdrant_service: SemanticQdrantService,
+    profile: CollectionProfile,
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    truth: np.ndarray,
+    k: int,
+) -> None:
+    name = f"benchmark_{profile.name}"
+    client = qdrant_service.client
+    if await client.collection_exists(name):
+        await client.delete_collection(name)
+    await client.create_collection(
+        collection_name=name,
+        vectors_config=profile.vectors_config(vectors.shape[1]),
+        hnsw_config=profile.hnsw_config(),
+        quantization_config=profile.quantization_config(),
+    )
+    try:
+        for start in range(0, len(vectors), 512):
+            await client.upsert(
+                collection_name=name,
+                points=[
+                    models.PointStruct(id=i, vector=profile.reduce(vectors[i].tolist()))
+                    for i in range(start, min(start + 512, len(vectors)))
+                ],
+                wait=True,
+            )
+        await wait_until_indexed(qdrant_service, name)
+
+        latencies = []
+        found = 0
+        for query, expected in zip(queries, truth):
+            started = time.perf_counter()
+            response = await client.query_points(
+                collection_name=name,
+                query=profile.reduce(query.tolist()),
+                limit=k,
+                search_params=profile.search_params(),
+            )
+            latencies.append((time.perf_counter() - started) * 1000)
+            found += len({point.id for point in response.points} & set(expected.tolist()))
+
+        usage = profile.bytes_per_vector(1536)
+        print(
+            f"{profile.name:<16}{found / truth.size:>10.3f}"
+            f"{np.percentile(latencies, 50):>10.1f}{np.percentile(latencies, 95):>10.1f}"
+            f"{usage['ram']:>12.0f}{usage['disk']:>12.0f}"
+        )
+    finally:
+        await client.delete_collection(name)
+
+
+async def run(
+    points: int, queries: int, k: int, source: bool, profiles: Optional[List[str]]
+) -> None:
+    qdrant_service = SemanticQdrantService(
+        url=config.QDRANT_API_URL, api_key=config.QDRANT_API_KEY, timeout=120
+    )
+    try:
+        if source:
+            vectors = await sample_vectors(qdrant_service, points + queries)
+        else:
+            vectors = synthetic_vectors(points + queries, qdrant_service.dimension)
+        stored, held_out = vectors[:-queries], vectors[-queries:]
+        rng = np.random.default_rng(1)
+        query_vectors = normalize(held_out + rng.normal(scale=0.01, size=held_out.shape))
+        truth = np.argsort(-(query_vectors @ stored.T), axis=1)[:, :k]
+
+        print(f"{len(stored)} vectors, {len(query_vectors)} queries, recall@{k}")
+        print(
+            f"{'profile':<16}{'recall':>10}{'p50 ms':>10}{'p95 ms':>10}{'RAM MB/1M':>12}{'disk MB/1M':>12}"
+        )
+        for name in profiles or list(PROFILES):
+            await bench_profile(qdrant_service, PROFILES[name], stored, query_vectors, truth, k)
+    finally:
+        await qdrant_service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=10)
+    parser.add_argument("--source", action="store_true", help="sample the live collection")
+    parser.add_argument("--profile", action="append", choices=list(PROFILES))
+    args = parser.parse_args()
+    asyncio.run(run(args.points, args.queries, args.k, args.source, args.profile))
@@ -0,0 +1,78 @@
+"""Memory per tenant: one runtime per organization versus a shared runtime.
+
+Usage (from the repository root, with the usual environment variables set):
+
+    python -m benchmarks.tenant_runtime_benchmark [--tenants 100]
+
+For each layout, ``--tenants`` realtime handlers are created, each with an
+unconnected TelegramClient as they would have after setup. Python heap growth
+is measured with tracemalloc. The reachable-object estimate comes from
+TenantRuntime.memory_per_tenant. The last column counts the HTTP/database
+clients, which is also the number of connection pools to keep warm. Nothing
+connects to Telegram, Mongo or Qdrant.
+"""
+
+import argparse
+import asyncio
+import gc
+import time
+import tracemalloc
+from typing import List, Optional
+
+from telethon import TelegramClient
+from telethon.sessions import StringSession
+
+from src.core.tasks.realtime_intelligence import RealTimeIntelligenceHandler
+from src.core.tasks.tenant_runtime import TenantRuntime
+
+
+def make_handler(index: int, runtime: Optional[TenantRuntime]) -> RealTimeIntelligenceHandler:
+    handler = RealTimeIntelligenceHandler(organization_id=f"org-{index}", runtime=runtime)
+    handler.client = TelegramClient(StringSession(), 12345, "0" * 32)
+    return handler
+
+
+async def measure(tenants: int, shared: bool) -> None:
+    gc.collect()
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    started = time.perf_counter()
+
+    runtime = TenantRuntime() if shared else None
+    handlers: List[RealTimeIntelligenceHandler] = [make_handler(i, runtime) for i in range(tenants)]
+
+    elapsed = time.perf_counter() - started
+    gc.collect()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    runtimes = {id(handler.runtime): handler.runtime for handler in handlers}
+    estimates = [
+        size for runtime in runtimes.values() for size in runtime.memory_per_tenant().values()
+    ]
+    clients = 2 * len(runtimes)  # one Motor client and one Qdrant client each
+
+    label = "shared" if shared else "per-tenant"
+    print(
+        f"{label:<11} {tenants:>7} {(after - before) / tenants / 1024:>14.1f} "
+        f"{sum(estimates) / len(estimates) / 1024:>17.1f} {elapsed * 1000:>12.0f} {clients:>8}"
+    )
+
+    for runtime in runtimes.values():
+        await runtime.close()
+
+
+async def main(tenants: int) -> None:
+    print(
+        f"{'runtime':<11} {'tenants':>7} {'heap KiB/ten':>14} "
+        f"{'reachable KiB/ten':>17} {'create ms':>12} {'clients':>8}"
+    )
+    await measure(tenants, shared=False)
+    await measure(tenants, shared=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tenants", type=int, default=100)
+    args = parser.parse_args()
+    asyncio.run(main(args.tenants))
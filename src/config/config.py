@@ -1,5 +1,6 @@
 from dataclasses import dataclass, field
 import os
+import socket
 from typing import Optional
 
 from dotenv import load_dotenv
@@ -29,6 +30,21 @@ def require_int_env(key: str, default: Optional[int] = None) -> int:
         raise RuntimeError(f"Environment variable '{key}' must be a non-negative integer.")
 
 
+def require_float_env(key: str, default: Optional[float] = None) -> float:
+    value = os.getenv(key)
+    if value is None or value.strip() == "":
+        if default is not None:
+            return default
+        raise RuntimeError(f"Environment variable '{key}' is required but not set.")
+    try:
+        fvalue = float(value)
+        if fvalue < 0:
+            raise ValueError
+        return fvalue
+    except ValueError:
+        raise RuntimeError(f"Environment variable '{key}' must be a non-negative number.")
+
+
 @dataclass
 class Config:
     MONGODB_URI: str = field(default_factory=lambda: require_env("MONGODB_URI"))
@@ -46,6 +62,204 @@ class Config:
     AI_ML_API_KEY: str = field(default_factory=lambda: require_env("AI_ML_API"))
     SERVICE: str = field(default_factory=lambda: require_env("SERVICE"))
     DEEPGRAM_API_KEY: str = field(default_factory=lambda: require_env("DEEPGRAM_API_KEY"))
+    QDRANT_TIMEOUT: int = field(
+        default_factory=lambda: require_int_env("QDRANT_TIMEOUT", default=10)
+    )
+    QDRANT_MAX_CONNECTIONS: int = field(
+        default_factory=lambda: require_int_env("QDRANT_MAX_CONNECTIONS", default=20)
+    )
+    QDRANT_UPSERT_BATCH_SIZE: int = field(
+        default_factory=lambda: require_int_env("QDRANT_UPSERT_BATCH_SIZE", default=256)
+    )
+    QDRANT_COLLECTION_PROFILE: str = field(
+        default_factory=lambda: os.getenv("QDRANT_COLLECTION_PROFILE", "default")
+    )
+    CHUNKER: str = field(default_factory=lambda: os.getenv("CHUNKER", "token"))
+    CHUNK_MAX_TOKENS: int = field(
+        default_factory=lambda: require_int_env("CHUNK_MAX_TOKENS", default=256)
+    )
+    CHUNK_OVERLAP_TOKENS: int = field(
+        default_factory=lambda: require_int_env("CHUNK_OVERLAP_TOKENS", default=32)
+    )
+    INGEST_BATCH_SIZE: int = field(
+        default_factory=lambda: require_int_env("INGEST_BATCH_SIZE", default=128)
+    )
+    INGEST_MAX_IN_FLIGHT: int = field(
+        default_factory=lambda: require_int_env("INGEST_MAX_IN_FLIGHT", default=4)
+    )
+    INGEST_JOB_WORKERS: int = field(
+        default_factory=lambda: require_int_env("INGEST_JOB_WORKERS", default=2)
+    )
+    INGEST_JOBS_PER_ORG: int = field(
+        default_factory=lambda: require_int_env("INGEST_JOBS_PER_ORG", default=1)
+    )
+    INGEST_JOB_LEASE_SECONDS: int = field(
+        default_factory=lambda: require_int_env("INGEST_JOB_LEASE_SECONDS", default=120)
+    )
+    EMBEDDING_CACHE_PATH: str = field(
+        default_factory=lambda: os.getenv("EMBEDDING_CACHE_PATH", ".cache/embeddings.sqlite3")
+    )
+    EMBEDDING_CACHE_MAX_ENTRIES: int = field(
+        default_factory=lambda: require_int_env("EMBEDDING_CACHE_MAX_ENTRIES", default=200000)
+    )
+    EMBEDDING_BACKEND: str = field(default_factory=lambda: os.getenv("EMBEDDING_BACKEND", "openai"))
+    EMBEDDING_MODEL: str = field(
+        default_factory=lambda: os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+    )
+    LOCAL_EMBEDDING_MODEL: str = field(
+        default_factory=lambda: os.getenv(
+            "LOCAL_EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2"
+        )
+    )
+    LOCAL_EMBEDDING_BATCH_SIZE: int = field(
+        default_factory=lambda: require_int_env("LOCAL_EMBEDDING_BATCH_SIZE", default=32)
+    )
+    LOCAL_EMBEDDING_THREADS: int = field(
+        default_factory=lambda: require_int_env("LOCAL_EMBEDDING_THREADS", default=2)
+    )
+    LOCAL_EMBEDDING_ONNX: bool = field(
+        default_factory=lambda: os.getenv("LOCAL_EMBEDDING_ONNX", "false").lower() == "true"
+    )
+    PDF_EXTRACT_WORKERS: int = field(
+        default_factory=lambda: require_int_env("PDF_EXTRACT_WORKERS", default=2)
+    )
+    PDF_PAGE_TIMEOUT: int = field(
+        default_factory=lambda: require_int_env("PDF_PAGE_TIMEOUT", default=30)
+    )
+    PDF_PROCESS_POOL_MIN_PAGES: int = field(
+        default_factory=lambda: require_int_env("PDF_PROCESS_POOL_MIN_PAGES", default=20)
+    )
+    ANSWER_CACHE_ENABLED: bool = field(
+        default_factory=lambda: os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+    )
+    ANSWER_CACHE_THRESHOLD: float = field(
+        default_factory=lambda: require_float_env("ANSWER_CACHE_THRESHOLD", default=0.92)
+    )
+    ANSWER_CACHE_TTL: int = field(
+        default_factory=lambda: require_int_env("ANSWER_CACHE_TTL", default=86400)
+    )
+    ANSWER_CACHE_MAX_ENTRIES: int = field(
+        default_factory=lambda: require_int_env("ANSWER_CACHE_MAX_ENTRIES", default=1000)
+    )
+    STREAM_RESPONSES: bool = field(
+        default_factory=lambda: os.getenv("STREAM_RESPONSES", "true").lower() == "true"
+    )
+    STREAM_EDIT_INTERVAL: float = field(
+        default_factory=lambda: require_float_env("STREAM_EDIT_INTERVAL", default=1.0)
+    )
+    LLM_MAX_CONNECTIONS: int = field(
+        default_factory=lambda: require_int_env("LLM_MAX_CONNECTIONS", default=100)
+    )
+    LLM_MAX_CONCURRENCY: int = field(
+        default_factory=lambda: require_int_env("LLM_MAX_CONCURRENCY", default=32)
+    )
+    LLM_REQUESTS_PER_MINUTE: int = field(
+        default_factory=lambda: require_int_env("LLM_REQUESTS_PER_MINUTE", default=500)
+    )
+    LLM_TOKENS_PER_MINUTE: int = field(
+        default_factory=lambda: require_int_env("LLM_TOKENS_PER_MINUTE", default=200000)
+    )
+    LLM_MODEL_LIMITS: str = field(default_factory=lambda: os.getenv("LLM_MODEL_LIMITS", ""))
+    LLM_MAX_RETRIES: int = field(
+        default_factory=lambda: require_int_env("LLM_MAX_RETRIES", default=4)
+    )
+    PROMPT_MAX_TOKENS: int = field(
+        default_factory=lambda: require_int_env("PROMPT_MAX_TOKENS", default=3000)
+    )
+    SUMMARY_RECENT_TURNS: int = field(
+        default_factory=lambda: require_int_env("SUMMARY_RECENT_TURNS", default=6)
+    )
+    SUMMARY_FOLD_BATCH: int = field(
+        default_factory=lambda: require_int_env("SUMMARY_FOLD_BATCH", default=6)
+    )
+    SUMMARY_CACHE_TTL: int = field(
+        default_factory=lambda: require_int_env("SUMMARY_CACHE_TTL", default=3600)
+    )
+    SUMMARY_CACHE_MAX_CHATS: int = field(
+        default_factory=lambda: require_int_env("SUMMARY_CACHE_MAX_CHATS", default=1000)
+    )
+    HYBRID_SEARCH: bool = field(
+        default_factory=lambda: os.getenv("HYBRID_SEARCH", "true").lower() == "true"
+    )
+    LEXICAL_INDEX_DIR: str = field(
+        default_factory=lambda: os.getenv("LEXICAL_INDEX_DIR", ".cache/lexical")
+    )
+    HYBRID_CANDIDATES: int = field(
+        default_factory=lambda: require_int_env("HYBRID_CANDIDATES", default=4)
+    )
+    LEXICAL_MIN_SCORE: float = field(
+        default_factory=lambda: require_float_env("LEXICAL_MIN_SCORE", default=0.0)
+    )
+    TG_ENTITY_CACHE_TTL: int = field(
+        default_factory=lambda: require_int_env("TG_ENTITY_CACHE_TTL", default=3600)
+    )
+    TG_ENTITY_CACHE_MAX_ENTRIES: int = field(
+        default_factory=lambda: require_int_env("TG_ENTITY_CACHE_MAX_ENTRIES", default=5000)
+    )
+    TG_REPLY_WORKERS: int = field(
+        default_factory=lambda: require_int_env("TG_REPLY_WORKERS", default=16)
+    )
+    TG_CHAT_QUEUE_DEPTH: int = field(
+        default_factory=lambda: require_int_env("TG_CHAT_QUEUE_DEPTH", default=20)
+    )
+    TG_CHAT_QUEUE_POLICY: str = field(
+        default_factory=lambda: os.getenv("TG_CHAT_QUEUE_POLICY", "coalesce")
+    )
+    TG_DEBOUNCE_SECONDS: float = field(
+        default_factory=lambda: require_float_env("TG_DEBOUNCE_SECONDS", default=1.0)
+    )
+    TG_DEBOUNCE_MAX_WAIT_SECONDS: float = field(
+        default_factory=lambda: require_float_env("TG_DEBOUNCE_MAX_WAIT_SECONDS", default=5.0)
+    )
+    TG_DEBOUNCE_MAX_FRAGMENTS: int = field(
+        default_factory=lambda: require_int_env("TG_DEBOUNCE_MAX_FRAGMENTS", default=8)
+    )
+    MESSAGE_WRITE_BATCH_SIZE: int = field(
+        default_factory=lambda: require_int_env("MESSAGE_WRITE_BATCH_SIZE", default=50)
+    )
+    MESSAGE_WRITE_FLUSH_MS: int = field(
+        default_factory=lambda: require_int_env("MESSAGE_WRITE_FLUSH_MS", default=250)
+    )
+    WORKER_MODE: str = field(default_factory=lambda: os.getenv("WORKER_MODE", "local"))
+    WORKER_ID: str = field(
+        default_factory=lambda: os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+    )
+    WORKER_URL: str = field(
+        default_factory=lambda: os.getenv("WORKER_URL", "http://127.0.0.1:8101")
+    )
+    WORKER_SHARED_SECRET: str = field(default_factory=lambda: os.getenv("WORKER_SHARED_SECRET", ""))
+    WORKER_LEASE_TTL: int = field(
+        default_factory=lambda: require_int_env("WORKER_LEASE_TTL", default=30)
+    )
+    WORKER_HEARTBEAT_INTERVAL: int = field(
+        default_factory=lambda: require_int_env("WORKER_HEARTBEAT_INTERVAL", default=10)
+    )
+    WORKER_REQUEST_TIMEOUT: int = field(
+        default_factory=lambda: require_int_env("WORKER_REQUEST_TIMEOUT", default=10)
+    )
+    TRACING_ENABLED: bool = field(
+        default_factory=lambda: os.getenv("TRACING_ENABLED", "true").lower() == "true"
+    )
+    TRACING_WINDOW: int = field(
+        default_factory=lambda: require_int_env("TRACING_WINDOW", default=2048)
+    )
+    RRF_K: int = field(default_factory=lambda: require_int_env("RRF_K", default=60))
+    RERANK_ENABLED: bool = field(
+        default_factory=lambda: os.getenv("RERANK_ENABLED", "false").lower() == "true"
+    )
+    RERANK_MODEL: str = field(default_factory=lambda: os.getenv("RERANK_MODEL", ""))
+    RERANK_CANDIDATES: int = field(
+        default_factory=lambda: require_int_env("RERANK_CANDIDATES", default=20)
+    )
+    RERANK_BUDGET_MS: int = field(
+        default_factory=lambda: require_int_env("RERANK_BUDGET_MS", default=150)
+    )
+    RERANK_BATCH_SIZE: int = field(
+        default_factory=lambda: require_int_env("RERANK_BATCH_SIZE", default=16)
+    )
+    RERANK_WORKERS: int = field(
+        default_factory=lambda: require_int_env("RERANK_WORKERS", default=2)
+    )
 
 
 config = Config()
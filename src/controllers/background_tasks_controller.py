@@ -1,6 +1,8 @@
 from fastapi import HTTPException
 
 from src.core import background_task_manager
+from src.core.rag.answer_cache import answer_cache
+from src.core.rag.rerank import reranker
 from src.db.mongodb import MongoDBManager
 from src.logs.logs import logger
 from src.models.telegram_models import (
@@ -98,6 +100,11 @@ class BackgroundTasksController:
                 is_running=result.get("is_running"),
                 started_at=result.get("started_at"),
                 stopped_at=result.get("stopped_at"),
+                entity_cache=result.get("entity_cache"),
+                reply_queues=result.get("reply_queues"),
+                debounce=result.get("debounce"),
+                message_writes=result.get("message_writes"),
+                memory_bytes=result.get("memory_bytes"),
             )
 
         except HTTPException:
@@ -187,9 +194,26 @@ class BackgroundTasksController:
                 "unique_senders": unique_senders,
                 "replies_sent": replies_sent,
                 "date_range": date_range,
+                "answer_cache": answer_cache.stats(organization_id),
+                "rerank": reranker.stats() if reranker else None,
             }
         except Exception as e:
             logger.error(f"Error fetching tg messages stats: {str(e)}")
             raise HTTPException(
                 status_code=500, detail=f"Failed to fetch tg messages stats: {str(e)}"
             )
+
+    async def get_recent_traces(self, current_org: dict, limit: int = 100) -> dict:
+        try:
+            organization = await self.mongo_manager.find_one(
+                "organizations", {"email": current_org["email"]}
+            )
+            if not organization:
+                raise HTTPException(status_code=404, detail="Organization not found")
+
+            return await background_task_manager.get_recent_traces(organization["id"], limit)
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching traces: {str(e)}")
+            raise HTTPException(status_code=500, detail=f"Failed to fetch traces: {str(e)}")
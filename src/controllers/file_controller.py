@@ -1,17 +1,19 @@
-import asyncio
 import base64
 from pathlib import Path
-import re
 import shutil
-from typing import Any, Dict, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
 import aiofiles
 from fastapi import UploadFile
-import PyPDF2
 
 from src.config.config import config
 from src.core import SemanticEmbeddingService, SemanticQdrantService, SemanticSearchRepo
+from src.core.rag.answer_cache import answer_cache
+from src.core.rag.chunking import TextChunk, get_chunker
+from src.core.rag.ingestion import IngestionProgress, ProgressCallback
+from src.core.tasks.ingestion_job_manager import IngestionJobManager
 from src.db.mongodb import MongoDBManager
+from src.documents.pdf_extractor import PDFTextExtractor
 from src.llm.llm_manager import LLMManager
 from src.logs.logs import logger
 from src.voice.transcription import DeepgramTranscription
@@ -43,33 +45,109 @@ class FileController:
         self.qdrant_service = SemanticQdrantService(
             url=config.QDRANT_API_URL, api_key=config.QDRANT_API_KEY
         )
-        self.search_repo = SemanticSearchRepo(self.embedding_service, self.qdrant_service)
+        self.search_repo = SemanticSearchRepo(
+            self.embedding_service, self.qdrant_service, kb_version=answer_cache.kb_version
+        )
         self.deepgram_transcription = DeepgramTranscription()
         self.llm_manager = LLMManager()
+        self.chunker = get_chunker()
+        self.pdf_extractor = PDFTextExtractor(
+            max_workers=config.PDF_EXTRACT_WORKERS,
+            page_timeout=config.PDF_PAGE_TIMEOUT,
+            process_pool_min_pages=config.PDF_PROCESS_POOL_MIN_PAGES,
+        )
+        self.job_manager = IngestionJobManager(runner=self._run_ingestion_job)
 
     async def extract_text_from_pdf(self, pdf_path: str) -> str:
-        pdf_file = Path(pdf_path)
-        if not pdf_file.exists():
-            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-
-        def _read_pdf():
-            text = ""
-            with open(pdf_file, "rb") as f:
-                reader = PyPDF2.PdfReader(f)
-                for page in reader.pages:
-                    text += page.extract_text() or ""
-            return text
-
-        return await asyncio.to_thread(_read_pdf)
-
-    def chunk_text(self, text: str, chunk_size: int = 50) -> list[str]:
-        words = re.split(r"\s+", text.strip())
-        chunks = []
-        for i in range(0, len(words), chunk_size):
-            chunk = " ".join(words[i : i + chunk_size])
-            if chunk:  # skip empty chunks
-                chunks.append(chunk)
-        return chunks
+        pages = [text async for _, text in self.pdf_extractor.iter_pages(pdf_path)]
+        return "\n\n".join(pages)
+
+    def chunk_text(self, text: str) -> List[TextChunk]:
+        return self.chunker.chunk(text)
+
+    async def get_organization_id(self, current_org: Dict[str, Any]) -> Optional[str]:
+        organization = await self.mongo_manager.find_one(
+            "organizations", {"email": current_org["email"]}
+        )
+        if not organization:
+            logger.warning("Organization not found")
+            return None
+        return organization.get("id", "")
+
+    async def save_upload(self, org_id: str, file: UploadFile, file_type: str) -> Optional[Path]:
+        if file_type not in self.upload_dirs:
+            logger.error(f"Unsupported file type: {file_type}")
+            return None
+
+        file_path = self.upload_dirs[file_type] / f"{org_id}_{file.filename}"
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(1024 * 1024):  # 1 MB chunks
+                await buffer.write(chunk)
+
+        logger.info(f"Saved {file_type} file: {file_path}")
+        return file_path
+
+    async def ingest_file(
+        self,
+        org_id: str,
+        file_path: str,
+        file_type: str,
+        description: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> IngestionProgress:
+        chunks: Union[List[TextChunk], AsyncIterator[TextChunk]] = []
+        if file_type == "pdf":
+            # Pages are extracted, chunked and embedded as they become available.
+            pages = self.pdf_extractor.iter_pages(file_path)
+            chunks = self.chunker.achunk_pages(pages)
+
+        elif file_type == "image":
+            image_description = await self.image_description(file_path)
+            chunks = self.chunk_text(image_description)
+
+        elif file_type in ("audio", "video"):
+            transcription = await self.deepgram_transcription.transcribe(file_path)  # type: ignore
+            chunks = self.chunk_text(transcription)
+
+        else:
+            raise ValueError(f"Unhandled file type: {file_type}")
+
+        file_metadata = {
+            "account_id": org_id,
+            "type": file_type,
+            "path": file_path,
+        }
+
+        async def documents() -> AsyncIterator[Tuple[str, Dict]]:
+            if isinstance(chunks, list):
+                for chunk in chunks:
+                    yield chunk.text, {**file_metadata, **chunk.metadata()}
+            else:
+                async for chunk in chunks:
+                    yield chunk.text, {**file_metadata, **chunk.metadata()}
+            if description and file_type != "pdf":
+                yield description, {**file_metadata, "source": "description"}
+
+        collection_name = self.search_repo.collection_name
+        if not await self.qdrant_service.collection_exists(collection_name):
+            logger.info(f"Creating collection '{collection_name}'...")
+            await self.search_repo.create_collection()
+            logger.info(f"✓ Collection '{collection_name}' created successfully")
+        else:
+            logger.info(f"✓ Collection '{collection_name}' already exists")
+            await self.search_repo.create_collection()
+
+        progress = await self.search_repo.sync_document(
+            documents(),
+            account_id=org_id,
+            path=file_path,
+            on_progress=on_progress,
+        )
+        logger.info(f"✓ Successfully upserted {progress.chunks_committed} chunks for {file_type}")
+
+        # Cached answers may be contradicted by the new content.
+        await answer_cache.invalidate(org_id)
+        return progress
 
     async def process_embeddings(
         self,
@@ -79,76 +157,75 @@ class FileController:
         description: Optional[str] = None,
     ) -> bool:
         try:
-            organization = await self.mongo_manager.find_one(
-                "organizations", {"email": current_org["email"]}
-            )
-            if not organization:
-                logger.warning("Organization not found")
+            org_id = await self.get_organization_id(current_org)
+            if org_id is None:
                 return False
 
-            org_id = organization.get("id", "")
-            file_name = f"{org_id}_{file.filename}"
-
-            if file_type not in self.upload_dirs:
-                logger.error(f"Unsupported file type: {file_type}")
+            file_path = await self.save_upload(org_id, file, file_type)
+            if file_path is None:
                 return False
 
-            file_path = self.upload_dirs[file_type] / file_name
-            async with aiofiles.open(file_path, "wb") as buffer:
-                while chunk := await file.read(1024 * 1024):  # 1 MB chunks
-                    await buffer.write(chunk)
-
-            logger.info(f"Saved {file_type} file: {file_path}")
-
-            sample_texts = []
-            if file_type == "pdf":
-                pdf_text = await self.extract_text_from_pdf(file_path)  # type: ignore
-                sample_texts = self.chunk_text(pdf_text, chunk_size=50)
-
-            elif file_type == "image":
-                image_description = await self.image_description(file_path)  # type: ignore
-                sample_texts = self.chunk_text(image_description, chunk_size=50)
-                sample_texts.extend([description])  # type: ignore
-
-            elif file_type == "audio":
-                transcription = await self.deepgram_transcription.transcribe(file_path)  # type: ignore
-                sample_texts = self.chunk_text(transcription, chunk_size=50)
-                sample_texts.extend([description])  # type: ignore
-
-            elif file_type == "video":
-                transcription = await self.deepgram_transcription.transcribe(file_path)  # type: ignore
-                sample_texts = self.chunk_text(transcription, chunk_size=50)
-                sample_texts.extend([description])  # type: ignore
-
-            else:
-                logger.error(f"Unhandled file type: {file_type}")
-                return False
-
-            sample_metadata = [
-                {
-                    "account_id": org_id,
-                    "type": file_type,
-                    "path": str(file_path),
-                }
-            ] * len(sample_texts)
-
-            collection_name = "personal_assistant"
-            if not self.qdrant_service.collection_exists(collection_name):
-                logger.info(f"Creating collection '{collection_name}'...")
-                self.qdrant_service.create_collection(collection_name)
-                logger.info(f"✓ Collection '{collection_name}' created successfully")
-            else:
-                logger.info(f"✓ Collection '{collection_name}' already exists")
-
-            await self.search_repo.initialize_qdrant_async(sample_texts, sample_metadata)  # type: ignore
-            logger.info(f"✓ Successfully upserted {len(sample_texts)} chunks for {file_type}")
-
+            await self.ingest_file(org_id, str(file_path), file_type, description)
             return True
 
         except Exception as e:
             logger.error(f"Error in process_embeddings: {e}", exc_info=True)
             return False
 
+    async def _run_ingestion_job(
+        self, job: Dict[str, Any], on_progress: ProgressCallback
+    ) -> IngestionProgress:
+        return await self.ingest_file(
+            job["organization_id"],
+            job["file_path"],
+            job["file_type"],
+            job.get("description"),
+            on_progress=on_progress,
+        )
+
+    async def submit_upload(
+        self,
+        current_org: Dict[str, Any],
+        file: UploadFile,
+        file_type: str,
+        description: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        try:
+            org_id = await self.get_organization_id(current_org)
+            if org_id is None:
+                return None
+
+            file_path = await self.save_upload(org_id, file, file_type)
+            if file_path is None:
+                return None
+
+            if not self.job_manager.is_running:
+                await self.job_manager.start()
+
+            return await self.job_manager.submit(
+                org_id,
+                filename=file.filename,
+                file_path=str(file_path),
+                file_type=file_type,
+                description=description,
+            )
+
+        except Exception as e:
+            logger.error(f"Error in submit_upload: {e}", exc_info=True)
+            return None
+
+    async def get_job(self, current_org: Dict[str, Any], job_id: str) -> Optional[Dict[str, Any]]:
+        org_id = await self.get_organization_id(current_org)
+        if org_id is None:
+            return None
+        return await self.job_manager.get_job(org_id, job_id)
+
+    async def list_jobs(self, current_org: Dict[str, Any], limit: int = 50) -> List[Dict[str, Any]]:
+        org_id = await self.get_organization_id(current_org)
+        if org_id is None:
+            return []
+        return await self.job_manager.list_jobs(org_id, limit=limit)
+
     async def image_description(self, image_path: str) -> str:
         async with aiofiles.open(image_path, "rb") as img_file:
             image_bytes = await img_file.read()
@@ -0,0 +1,193 @@
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+import time
+from typing import Any, Dict, Hashable, List, Optional
+
+import numpy as np
+
+from src.config.config import config
+from src.db.mongodb import MongoDBManager
+from src.logs.logs import logger
+
+
+@dataclass
+class CachedAnswer:
+    query: str
+    answer: str
+    search_results: List[Dict[str, Any]]
+    kb_version: float
+    scope: Optional[Hashable] = None
+    created_at: float = field(default_factory=time.time)
+    last_used: float = field(default_factory=time.time)
+    hits: int = 0
+
+
+class _TenantAnswers:
+    def __init__(self) -> None:
+        self.entries: List[CachedAnswer] = []
+        self.vectors = np.empty((0, 0), dtype=np.float32)
+
+    def add(self, entry: CachedAnswer, vector: np.ndarray) -> None:
+        self.entries.append(entry)
+        if not self.vectors.size:
+            self.vectors = vector[np.newaxis, :]
+        else:
+            self.vectors = np.vstack([self.vectors, vector])
+
+    def remove(self, keep: List[int]) -> None:
+        self.entries = [self.entries[i] for i in keep]
+        self.vectors = self.vectors[keep] if keep else np.empty((0, 0), dtype=np.float32)
+
+
+class SemanticAnswerCache:
+    """Per-organization cache of generated answers, looked up by query similarity.
+
+    An answer is reused when the new query embedding has a cosine similarity of
+    at least ``threshold`` with a cached one, the entry is younger than ``ttl``
+    seconds, and the organization's knowledge base has not changed since it
+    was stored. Knowledge base versions are kept in Mongo so an ingestion in
+    one process invalidates the caches of every process.
+
+    Answers also depend on the conversation they were generated in, so
+    entries can be stored under a ``scope`` (the chat) and are only reused
+    for lookups with the same scope.
+    """
+
+    VERSIONS_COLLECTION = "knowledge_base_versions"
+
+    def __init__(
+        self,
+        threshold: float = config.ANSWER_CACHE_THRESHOLD,
+        ttl: int = config.ANSWER_CACHE_TTL,
+        max_entries: int = config.ANSWER_CACHE_MAX_ENTRIES,
+        version_refresh_interval: float = 5.0,
+        mongo_manager: Optional[MongoDBManager] = None,
+    ) -> None:
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self.version_refresh_interval = version_refresh_interval
+        self.mongo_manager = mongo_manager or MongoDBManager()
+        self._tenants: Dict[str, _TenantAnswers] = {}
+        self._versions: Dict[str, tuple[float, float]] = {}  # account -> (version, checked_at)
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if not vector.size or norm == 0:
+            return None
+        return vector / norm
+
+    async def kb_version(self, account_id: str) -> float:
+        cached = self._versions.get(account_id)
+        now = time.monotonic()
+        if cached and now - cached[1] < self.version_refresh_interval:
+            return cached[0]
+        document = await self.mongo_manager.find_one(
+            self.VERSIONS_COLLECTION, {"account_id": account_id}
+        )
+        version = document.get("version", 0.0) if document else 0.0
+        self._versions[account_id] = (version, now)
+        return version
+
+    async def invalidate(self, account_id: str) -> None:
+        version = datetime.now(timezone.utc).timestamp()
+        await self.mongo_manager.update_one(
+            self.VERSIONS_COLLECTION,
+            {"account_id": account_id},
+            {"account_id": account_id, "version": version},
+            upsert=True,
+        )
+        self._versions[account_id] = (version, time.monotonic())
+        self._tenants.pop(account_id, None)
+        logger.info(f"Invalidated answer cache for account {account_id}")
+
+    async def lookup(
+        self, account_id: str, query_embedding: List[float], scope: Optional[Hashable] = None
+    ) -> Optional[CachedAnswer]:
+        tenant = self._tenants.get(account_id)
+        query = self._normalize(query_embedding)
+        if tenant is None or not tenant.entries or query is None:
+            self.misses[account_id] = self.misses.get(account_id, 0) + 1
+            return None
+
+        version = await self.kb_version(account_id)
+        now = time.time()
+        keep = [
+            i
+            for i, entry in enumerate(tenant.entries)
+            if entry.kb_version == version and now - entry.created_at < self.ttl
+        ]
+        if len(keep) != len(tenant.entries):
+            tenant.remove(keep)
+
+        candidates = [i for i, entry in enumerate(tenant.entries) if entry.scope == scope]
+        if candidates and tenant.vectors.shape[1] == query.shape[0]:
+            scores = tenant.vectors[candidates] @ query
+            best = int(np.argmax(scores))
+            if scores[best] >= self.threshold:
+                entry = tenant.entries[candidates[best]]
+                entry.hits += 1
+                entry.last_used = now
+                self.hits[account_id] = self.hits.get(account_id, 0) + 1
+                logger.info(f"Answer cache hit for account {account_id} (score {scores[best]:.3f})")
+                return entry
+
+        self.misses[account_id] = self.misses.get(account_id, 0) + 1
+        return None
+
+    async def store(
+        self,
+        account_id: str,
+        query: str,
+        query_embedding: List[float],
+        answer: str,
+        search_results: List[Dict[str, Any]],
+        scope: Optional[Hashable] = None,
+    ) -> None:
+        vector = self._normalize(query_embedding)
+        if vector is None or not answer:
+            return
+        tenant = self._tenants.setdefault(account_id, _TenantAnswers())
+        if tenant.entries and tenant.vectors.shape[1] != vector.shape[0]:
+            # Embedding model changed; entries of the old dimension are unusable.
+            tenant.remove([])
+
+        if len(tenant.entries) >= self.max_entries:
+            by_recency = sorted(
+                range(len(tenant.entries)), key=lambda i: tenant.entries[i].last_used
+            )
+            tenant.remove(sorted(by_recency[len(tenant.entries) - self.max_entries + 1 :]))
+
+        entry = CachedAnswer(
+            query=query,
+            answer=answer,
+            search_results=search_results,
+            kb_version=await self.kb_version(account_id),
+            scope=scope,
+        )
+        tenant.add(entry, vector)
+
+    def stats(self, account_id: Optional[str] = None) -> Dict[str, Any]:
+        if account_id is not None:
+            hits = self.hits.get(account_id, 0)
+            misses = self.misses.get(account_id, 0)
+            tenant = self._tenants.get(account_id)
+            entries = len(tenant.entries) if tenant else 0
+        else:
+            hits = sum(self.hits.values())
+            misses = sum(self.misses.values())
+            entries = sum(len(tenant.entries) for tenant in self._tenants.values())
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "entries": entries,
+        }
+
+
+answer_cache = SemanticAnswerCache()
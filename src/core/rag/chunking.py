@@ -0,0 +1,215 @@
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+import re
+from typing import AsyncIterable, AsyncIterator, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.config.config import config
+from src.llm.tokens import estimate_tokens
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_WORD = re.compile(r"\S+")
+
+
+@dataclass
+class TextChunk:
+    text: str
+    index: int
+    start_offset: int
+    end_offset: int
+    token_count: int
+    page: Optional[int] = None
+
+    def metadata(self) -> Dict:
+        return {
+            "chunk_index": self.index,
+            "page": self.page,
+            "start_offset": self.start_offset,
+            "end_offset": self.end_offset,
+            "token_count": self.token_count,
+        }
+
+
+@dataclass
+class _Unit:
+    start: int
+    end: int
+    tokens: int
+    paragraph: int
+
+
+class Chunker(ABC):
+    """Splits text into chunks. Offsets are character positions in the text
+    passed to ``chunk``, which is the page text when chunking page by page."""
+
+    @abstractmethod
+    def chunk(self, text: str, page: Optional[int] = None) -> List[TextChunk]:
+        pass
+
+    def chunk_pages(self, pages: Iterable[Tuple[int, str]]) -> Iterator[TextChunk]:
+        index = 0
+        for page_number, page_text in pages:
+            for chunk in self.chunk(page_text, page=page_number):
+                chunk.index = index
+                index += 1
+                yield chunk
+
+    async def achunk_pages(self, pages: AsyncIterable[Tuple[int, str]]) -> AsyncIterator[TextChunk]:
+        index = 0
+        async for page_number, page_text in pages:
+            for chunk in self.chunk(page_text, page=page_number):
+                chunk.index = index
+                index += 1
+                yield chunk
+
+
+class WordChunker(Chunker):
+    """Fixed-size word windows without overlap (the original splitter)."""
+
+    def __init__(self, chunk_size: int = 50) -> None:
+        self.chunk_size = chunk_size
+
+    def chunk(self, text: str, page: Optional[int] = None) -> List[TextChunk]:
+        words = list(_WORD.finditer(text))
+        chunks = []
+        for i in range(0, len(words), self.chunk_size):
+            window = words[i : i + self.chunk_size]
+            start, end = window[0].start(), window[-1].end()
+            chunk_text = " ".join(word.group() for word in window)
+            chunks.append(
+                TextChunk(
+                    text=chunk_text,
+                    index=len(chunks),
+                    start_offset=start,
+                    end_offset=end,
+                    token_count=estimate_tokens(chunk_text),
+                    page=page,
+                )
+            )
+        return chunks
+
+
+class TokenChunker(Chunker):
+    """Packs whole sentences into chunks of at most ``max_tokens``.
+
+    Chunks prefer to end on a paragraph boundary once they are at least half
+    full. Each new chunk starts with the trailing sentences of the previous
+    one, up to ``overlap_tokens``, so facts that straddle a boundary remain
+    retrievable. Sentences longer than the budget are split on words.
+    """
+
+    def __init__(self, max_tokens: int = 256, overlap_tokens: int = 32) -> None:
+        if overlap_tokens >= max_tokens:
+            raise ValueError("overlap_tokens must be smaller than max_tokens")
+        self.max_tokens = max_tokens
+        self.overlap_tokens = overlap_tokens
+
+    def _units(self, text: str) -> List[_Unit]:
+        units: List[_Unit] = []
+        paragraph_start = 0
+        paragraph_spans = []
+        for match in _PARAGRAPH_BREAK.finditer(text):
+            paragraph_spans.append((paragraph_start, match.start()))
+            paragraph_start = match.end()
+        paragraph_spans.append((paragraph_start, len(text)))
+
+        for paragraph, (p_start, p_end) in enumerate(paragraph_spans):
+            sentence_start = p_start
+            boundaries = [m.start() + p_start for m in _SENTENCE_END.finditer(text[p_start:p_end])]
+            for boundary in [*boundaries, p_end]:
+                sentence = text[sentence_start:boundary]
+                stripped = sentence.strip()
+                if stripped:
+                    start = sentence_start + (len(sentence) - len(sentence.lstrip()))
+                    end = start + len(stripped)
+                    units.extend(self._split_long(text, start, end, paragraph))
+                sentence_start = boundary
+        return units
+
+    def _split_long(self, text: str, start: int, end: int, paragraph: int) -> List[_Unit]:
+        tokens = estimate_tokens(text[start:end])
+        if tokens <= self.max_tokens:
+            return [_Unit(start, end, tokens, paragraph)]
+
+        pieces: List[_Unit] = []
+        piece_start: Optional[int] = None
+        piece_end = start
+        for word in _WORD.finditer(text, start, end):
+            if piece_start is not None and (
+                estimate_tokens(text[piece_start : word.end()]) > self.max_tokens
+            ):
+                pieces.append(
+                    _Unit(
+                        piece_start,
+                        piece_end,
+                        estimate_tokens(text[piece_start:piece_end]),
+                        paragraph,
+                    )
+                )
+                piece_start = None
+            if piece_start is None:
+                piece_start = word.start()
+            piece_end = word.end()
+        if piece_start is not None:
+            pieces.append(
+                _Unit(
+                    piece_start, piece_end, estimate_tokens(text[piece_start:piece_end]), paragraph
+                )
+            )
+        return pieces
+
+    def chunk(self, text: str, page: Optional[int] = None) -> List[TextChunk]:
+        units = self._units(text)
+        chunks: List[TextChunk] = []
+        current: List[_Unit] = []
+        current_tokens = 0
+        fresh = 0  # units in ``current`` not already emitted as overlap
+
+        def emit() -> None:
+            start, end = current[0].start, current[-1].end
+            chunks.append(
+                TextChunk(
+                    text=text[start:end],
+                    index=len(chunks),
+                    start_offset=start,
+                    end_offset=end,
+                    token_count=current_tokens,
+                    page=page,
+                )
+            )
+
+        for unit in units:
+            paragraph_break = bool(current) and unit.paragraph != current[-1].paragraph
+            over_budget = current_tokens + unit.tokens > self.max_tokens
+            half_full = current_tokens >= self.max_tokens // 2
+            if fresh and (over_budget or (paragraph_break and half_full)):
+                emit()
+                overlap: List[_Unit] = []
+                overlap_tokens = 0
+                for previous in reversed(current):
+                    if overlap_tokens + previous.tokens > self.overlap_tokens:
+                        break
+                    overlap.insert(0, previous)
+                    overlap_tokens += previous.tokens
+                if overlap_tokens + unit.tokens > self.max_tokens:
+                    overlap, overlap_tokens = [], 0
+                current, current_tokens, fresh = overlap, overlap_tokens, 0
+            current.append(unit)
+            current_tokens += unit.tokens
+            fresh += 1
+
+        if fresh:
+            emit()
+        return chunks
+
+
+def get_chunker(
+    name: str = config.CHUNKER,
+    max_tokens: int = config.CHUNK_MAX_TOKENS,
+    overlap_tokens: int = config.CHUNK_OVERLAP_TOKENS,
+) -> Chunker:
+    if name == "word":
+        return WordChunker()
+    if name == "token":
+        return TokenChunker(max_tokens=max_tokens, overlap_tokens=overlap_tokens)
+    raise ValueError(f"Unknown chunker: {name}")
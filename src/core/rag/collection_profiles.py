@@ -0,0 +1,110 @@
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import numpy as np
+from qdrant_client import models
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    """How vectors of a collection are stored and searched.
+
+    ``dimension`` keeps only the first N components of every embedding.
+    ``quantization`` is "none", "scalar" (int8, 4x smaller) or "binary" (1 bit,
+    32x smaller). Quantized vectors stay in RAM while the originals can be
+    moved to disk with ``on_disk``. Searches then run on the quantized vectors
+    and the best ``oversampling`` times ``limit`` candidates are rescored with
+    the originals.
+    """
+
+    name: str
+    dimension: Optional[int] = None
+    quantization: str = "none"
+    on_disk: bool = False
+    hnsw_m: int = 16
+    hnsw_ef_construct: int = 100
+    search_ef: Optional[int] = None
+    oversampling: float = 2.0
+    rescore: bool = True
+
+    def vector_size(self, full_dimension: int) -> int:
+        return min(self.dimension or full_dimension, full_dimension)
+
+    def vectors_config(self, full_dimension: int) -> models.VectorParams:
+        return models.VectorParams(
+            size=self.vector_size(full_dimension),
+            distance=models.Distance.COSINE,
+            on_disk=self.on_disk,
+        )
+
+    def hnsw_config(self) -> models.HnswConfigDiff:
+        return models.HnswConfigDiff(m=self.hnsw_m, ef_construct=self.hnsw_ef_construct)
+
+    def quantization_config(self) -> Optional[models.QuantizationConfig]:
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8, quantile=0.99, always_ram=True
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=True)
+            )
+        return None
+
+    def search_params(self) -> Optional[models.SearchParams]:
+        if self.quantization == "none" and self.search_ef is None:
+            return None
+        quantization = None
+        if self.quantization != "none":
+            quantization = models.QuantizationSearchParams(
+                rescore=self.rescore, oversampling=self.oversampling
+            )
+        return models.SearchParams(hnsw_ef=self.search_ef, quantization=quantization)
+
+    def reduce(self, vector: List[float]) -> List[float]:
+        if not self.dimension or len(vector) <= self.dimension:
+            return vector
+        return truncate_embedding(vector, self.dimension)
+
+    def bytes_per_vector(self, full_dimension: int) -> Dict[str, float]:
+        """Approximate storage per vector: ``ram`` and ``disk`` bytes."""
+        size = self.vector_size(full_dimension)
+        original = size * 4
+        quantized = {"none": 0, "scalar": size, "binary": size / 8}[self.quantization]
+        graph = self.hnsw_m * 2 * 8
+        if self.on_disk:
+            return {"ram": quantized + graph, "disk": original}
+        return {"ram": original + quantized + graph, "disk": 0}
+
+
+# text-embedding-3-* vectors are trained Matryoshka style: a prefix of the
+# vector, renormalized, is a valid lower-dimensional embedding.
+def truncate_embedding(vector: List[float], dimension: int) -> List[float]:
+    reduced = np.asarray(vector[:dimension], dtype=np.float32)
+    norm = float(np.linalg.norm(reduced))
+    if norm:
+        reduced /= norm
+    return reduced.tolist()
+
+
+PROFILES: Dict[str, CollectionProfile] = {
+    # Full float32 vectors in RAM, as collections were created before profiles.
+    "default": CollectionProfile("default"),
+    # int8 copy in RAM, originals on disk for rescoring. ~3.5x less RAM.
+    "balanced": CollectionProfile("balanced", quantization="scalar", on_disk=True),
+    # 1-bit copy in RAM. Works well for 1536-d OpenAI embeddings with
+    # rescoring, ~14x less RAM.
+    "compact": CollectionProfile("compact", quantization="binary", on_disk=True, oversampling=3.0),
+    # 512 Matryoshka dimensions, int8 in RAM.
+    "matryoshka-512": CollectionProfile(
+        "matryoshka-512", dimension=512, quantization="scalar", on_disk=True
+    ),
+}
+
+
+def get_profile(name: str) -> CollectionProfile:
+    if name not in PROFILES:
+        raise ValueError(f"Unknown collection profile '{name}', expected one of {list(PROFILES)}")
+    return PROFILES[name]
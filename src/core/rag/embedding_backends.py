@@ -0,0 +1,180 @@
+from abc import ABC, abstractmethod
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from typing import Any, Dict, List, Optional
+
+from openai import OpenAI
+
+from src.config.config import config
+from src.logs.logs import logger
+
+OPENAI_DIMENSIONS = {
+    "text-embedding-3-small": 1536,
+    "text-embedding-3-large": 3072,
+    "text-embedding-ada-002": 1536,
+}
+
+
+class EmbeddingBackend(ABC):
+    """Turns texts into vectors. ``embed`` returns one vector per text, in
+    order, and raises when the batch could not be embedded.
+
+    ``model_name`` and ``dimension`` identify the vector space: caches are keyed
+    by the model and every model gets its own Qdrant collection.
+    """
+
+    model_name: str
+    max_batch_size: int
+    max_batch_tokens: int
+
+    @property
+    @abstractmethod
+    def dimension(self) -> int:
+        pass
+
+    @property
+    def available(self) -> bool:
+        return True
+
+    async def warmup(self) -> None:
+        pass
+
+    @abstractmethod
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        pass
+
+
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    # OpenAI accepts up to 2048 inputs and 300k tokens per embeddings request. We
+    # stay well below the token ceiling because our token counts are estimates.
+    max_batch_size = 2048
+    max_batch_tokens = 100_000
+
+    def __init__(self, model_name: str = "text-embedding-3-small") -> None:
+        self.model_name = model_name
+        self.client: Optional[OpenAI] = None
+
+        if not config.OPENAI_API_KEY:
+            logger.error("OPENAI_API_KEY not available")
+            return
+
+        try:
+            self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+            logger.info("OpenAI client initialized successfully")
+        except Exception as e:
+            logger.error(f"Failed to initialize OpenAI client: {str(e)}")
+
+    @property
+    def dimension(self) -> int:
+        return OPENAI_DIMENSIONS.get(self.model_name, 1536)
+
+    @property
+    def available(self) -> bool:
+        return self.client is not None
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        assert self.client is not None
+        response = await asyncio.to_thread(
+            self.client.embeddings.create, model=self.model_name, input=texts
+        )
+        if not response or not response.data:
+            raise RuntimeError("No embeddings in response")
+        embeddings: List[List[float]] = [[] for _ in texts]
+        for item in response.data:
+            embeddings[item.index] = item.embedding
+        return embeddings
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """sentence-transformers model running on the CPU, loaded on first use.
+
+    Inputs are split into ``batch_size`` batches that are encoded concurrently
+    on a small thread pool (the model releases the GIL while computing).
+    With ``onnx`` the model runs on ONNX Runtime instead of PyTorch.
+    sentence-transformers (and onnxruntime for ``onnx``) are optional
+    dependencies installed only where this backend is used.
+    """
+
+    # Local models truncate long inputs themselves; batches are bounded by count.
+    max_batch_tokens = 1_000_000
+
+    def __init__(
+        self,
+        model_name: str = config.LOCAL_EMBEDDING_MODEL,
+        batch_size: int = config.LOCAL_EMBEDDING_BATCH_SIZE,
+        threads: int = config.LOCAL_EMBEDDING_THREADS,
+        onnx: bool = config.LOCAL_EMBEDDING_ONNX,
+    ) -> None:
+        self.model_name = model_name
+        self.batch_size = max(1, batch_size)
+        self.max_batch_size = self.batch_size * max(1, threads) * 4
+        self.onnx = onnx
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, threads), thread_name_prefix="embedding"
+        )
+        self._model: Any = None
+        self._dimension: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Any:
+        with self._lock:
+            if self._model is None:
+                from sentence_transformers import SentenceTransformer
+
+                kwargs: Dict[str, Any] = {"device": "cpu"}
+                if self.onnx:
+                    kwargs["backend"] = "onnx"
+                self._model = SentenceTransformer(self.model_name, **kwargs)
+                self._dimension = int(self._model.get_sentence_embedding_dimension())
+                logger.info(
+                    f"Loaded local embedding model {self.model_name} ({self._dimension} dimensions)"
+                )
+        return self._model
+
+    @property
+    def dimension(self) -> int:
+        if self._dimension is None:
+            # Loading takes seconds and would stall every request on the loop.
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                self._load()
+            else:
+                raise RuntimeError(
+                    f"Local embedding model {self.model_name} is not loaded; await warmup() first"
+                )
+        assert self._dimension is not None
+        return self._dimension
+
+    def _encode(self, texts: List[str]) -> List[List[float]]:
+        vectors = self._load().encode(
+            texts,
+            batch_size=self.batch_size,
+            normalize_embeddings=True,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+        )
+        return vectors.tolist()
+
+    async def warmup(self) -> None:
+        await asyncio.get_running_loop().run_in_executor(self._executor, self._load)
+
+    async def embed(self, texts: List[str]) -> List[List[float]]:
+        loop = asyncio.get_running_loop()
+        batches = [texts[i : i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        results = await asyncio.gather(
+            *(loop.run_in_executor(self._executor, self._encode, batch) for batch in batches)
+        )
+        return [vector for batch in results for vector in batch]
+
+
+def get_embedding_backend(name: str = config.EMBEDDING_BACKEND) -> EmbeddingBackend:
+    if name == "local":
+        return LocalEmbeddingBackend()
+    if name == "openai":
+        return OpenAIEmbeddingBackend(config.EMBEDDING_MODEL)
+    raise ValueError(f"Unknown EMBEDDING_BACKEND '{name}', expected 'openai' or 'local'")
+
+
+embedding_backend = get_embedding_backend()
@@ -0,0 +1,172 @@
+from array import array
+import asyncio
+import hashlib
+from pathlib import Path
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from src.config.config import config
+from src.logs.logs import logger
+
+
+class EmbeddingCache:
+    """Disk-backed embedding cache shared by every embedding service.
+
+    Entries are keyed by a SHA-256 of (model, text) and stored as packed
+    float32 blobs in SQLite. WAL mode lets several worker processes on the
+    same host read and write the same file. When the table grows past
+    ``max_entries`` the least recently used entries are evicted.
+    """
+
+    EVICTION_HEADROOM = 0.9
+
+    def __init__(self, path: str, max_entries: int = 200_000) -> None:
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._entry_count = 0
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+    @staticmethod
+    def make_key(model: str, text: str) -> str:
+        return hashlib.sha256(f"{model}\x00{text}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _pack(vector: List[float]) -> bytes:
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _unpack(blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    dimension INTEGER NOT NULL,
+                    vector BLOB NOT NULL,
+                    last_used REAL NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings (last_used)"
+            )
+            connection.commit()
+            self._entry_count = connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+            self._connection = connection
+            logger.info(f"Embedding cache opened at {self.path} ({self._entry_count} entries)")
+        return self._connection
+
+    def get_many(self, model: str, texts: List[str]) -> Dict[str, List[float]]:
+        if not texts:
+            return {}
+        keys = {self.make_key(model, text): text for text in texts}
+        found: Dict[str, List[float]] = {}
+        try:
+            with self._lock:
+                connection = self._connect()
+                key_list = list(keys)
+                # Stay under SQLite's default bound-parameter limit.
+                for i in range(0, len(key_list), 500):
+                    chunk = key_list[i : i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows = connection.execute(
+                        f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", chunk
+                    ).fetchall()
+                    for key, blob in rows:
+                        found[keys[key]] = self._unpack(blob)
+                    if rows:
+                        connection.execute(
+                            f"UPDATE embeddings SET last_used = ? WHERE key IN ({placeholders})",
+                            [time.time(), *[key for key, _ in rows]],
+                        )
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Embedding cache read failed: {str(e)}")
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, model: str, embeddings: Dict[str, List[float]]) -> None:
+        rows = [
+            (self.make_key(model, text), model, len(vector), self._pack(vector), time.time())
+            for text, vector in embeddings.items()
+            if vector
+        ]
+        if not rows:
+            return
+        try:
+            with self._lock:
+                connection = self._connect()
+                connection.executemany(
+                    "INSERT OR REPLACE INTO embeddings "
+                    "(key, model, dimension, vector, last_used) VALUES (?, ?, ?, ?, ?)",
+                    rows,
+                )
+                connection.commit()
+                self.writes += len(rows)
+                self._entry_count += len(rows)
+                if self._entry_count > self.max_entries:
+                    self._evict(connection)
+        except sqlite3.Error as e:
+            logger.error(f"Embedding cache write failed: {str(e)}")
+
+    def _evict(self, connection: sqlite3.Connection) -> None:
+        # Other processes write to the same file, so recount before evicting.
+        self._entry_count = connection.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        excess = self._entry_count - int(self.max_entries * self.EVICTION_HEADROOM)
+        if self._entry_count <= self.max_entries or excess <= 0:
+            return
+        connection.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+            (excess,),
+        )
+        connection.commit()
+        self._entry_count -= excess
+        self.evictions += excess
+        logger.info(f"Evicted {excess} entries from embedding cache")
+
+    async def aget_many(self, model: str, texts: List[str]) -> Dict[str, List[float]]:
+        return await asyncio.to_thread(self.get_many, model, texts)
+
+    async def aput_many(self, model: str, embeddings: Dict[str, List[float]]) -> None:
+        await asyncio.to_thread(self.put_many, model, embeddings)
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": self._entry_count,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+embedding_cache = EmbeddingCache(
+    path=config.EMBEDDING_CACHE_PATH, max_entries=config.EMBEDDING_CACHE_MAX_ENTRIES
+)
@@ -0,0 +1,267 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timezone
+import hashlib
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterable,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+import uuid
+
+from qdrant_client.models import PointStruct
+
+from src.config.config import config
+from src.db.mongodb import MongoDBManager
+from src.logs.logs import logger
+
+if TYPE_CHECKING:
+    from src.core.rag.lexical_index import LexicalIndex
+    from src.core.rag.qdrant import SemanticEmbeddingService, SemanticQdrantService
+
+Chunk = Tuple[str, Dict]
+ChunkSource = Union[Iterable[Chunk], AsyncIterable[Chunk]]
+
+
+# Fixed namespace so point ids are stable across processes and deployments.
+POINT_ID_NAMESPACE = uuid.UUID("5c1f8f0e-7d4b-4d7e-9a51-6f1b2f0c9e37")
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def point_id(account_id: str, path: str, text: str) -> str:
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, f"{account_id}\x00{path}\x00{chunk_hash(text)}"))
+
+
+def build_points(
+    texts: List[str], metadata: List[Dict], embeddings: List[List[float]]
+) -> List[PointStruct]:
+    points = []
+    for text, meta, embedding in zip(texts, metadata, embeddings):
+        if not embedding:
+            logger.warning(f"Skipping chunk without embedding (length: {len(text)})")
+            continue
+        points.append(
+            PointStruct(
+                id=point_id(meta.get("account_id", ""), meta.get("path", ""), text),
+                vector=embedding,
+                payload={"text": text, "chunk_hash": chunk_hash(text), **meta},
+            )
+        )
+    return points
+
+
+@dataclass
+class IngestionProgress:
+    ingestion_id: Optional[str]
+    batches_committed: int = 0
+    chunks_committed: int = 0
+    batches_skipped: int = 0
+    resumed_from_batch: int = -1
+    done: bool = False
+
+
+ProgressCallback = Callable[[IngestionProgress], Awaitable[None]]
+
+
+class IngestionCheckpointStore:
+    """Persists the last contiguous committed batch of each ingestion."""
+
+    COLLECTION = "ingestion_checkpoints"
+
+    def __init__(self, mongo_manager: MongoDBManager) -> None:
+        self.mongo_manager = mongo_manager
+
+    async def load(self, ingestion_id: str) -> int:
+        checkpoint = await self.mongo_manager.find_one(
+            self.COLLECTION, {"ingestion_id": ingestion_id}
+        )
+        if not checkpoint:
+            return -1
+        return checkpoint.get("last_committed_batch", -1)
+
+    async def save(self, ingestion_id: str, last_committed_batch: int, chunks: int) -> bool:
+        return await self.mongo_manager.update_one(
+            self.COLLECTION,
+            {"ingestion_id": ingestion_id},
+            {
+                "ingestion_id": ingestion_id,
+                "last_committed_batch": last_committed_batch,
+                "chunks_committed": chunks,
+                "updated_at": datetime.now(timezone.utc),
+            },
+            upsert=True,
+        )
+
+    async def clear(self, ingestion_id: str) -> bool:
+        return await self.mongo_manager.delete_one(self.COLLECTION, {"ingestion_id": ingestion_id})
+
+
+class IngestionPipeline:
+    """Chunk -> embed batch -> upsert batch, with bounded memory.
+
+    The producer groups chunks into batches and hands them to a queue holding
+    at most ``max_in_flight`` batches, so a slow embedding or Qdrant call
+    pauses reading instead of buffering the whole document. The same number
+    of workers embed and upsert batches concurrently. With a checkpoint store,
+    the highest contiguous committed batch is recorded after every commit and
+    a rerun with the same ``ingestion_id`` skips everything up to it.
+    """
+
+    def __init__(
+        self,
+        embedding_service: "SemanticEmbeddingService",
+        qdrant_service: "SemanticQdrantService",
+        collection_name: str,
+        batch_size: int = config.INGEST_BATCH_SIZE,
+        max_in_flight: int = config.INGEST_MAX_IN_FLIGHT,
+        checkpoint_store: Optional[IngestionCheckpointStore] = None,
+        max_retries: int = 2,
+        lexical_index: Optional["LexicalIndex"] = None,
+    ) -> None:
+        self.embedding_service = embedding_service
+        self.qdrant_service = qdrant_service
+        self.collection_name = collection_name
+        self.batch_size = max(1, batch_size)
+        self.max_in_flight = max(1, max_in_flight)
+        self.checkpoint_store = checkpoint_store
+        self.max_retries = max_retries
+        self.lexical_index = lexical_index
+
+    @staticmethod
+    async def iterate(chunks: ChunkSource) -> AsyncIterator[Chunk]:
+        if isinstance(chunks, AsyncIterable):
+            async for chunk in chunks:
+                yield chunk
+        else:
+            for chunk in chunks:
+                yield chunk
+
+    async def _index_lexical(self, points: List[PointStruct]) -> None:
+        by_account: Dict[str, List[Tuple[str, str, Dict]]] = {}
+        for point in points:
+            payload = point.payload or {}
+            by_account.setdefault(payload.get("account_id", ""), []).append(
+                (str(point.id), payload.get("text", ""), payload)
+            )
+        assert self.lexical_index is not None
+        for account_id, rows in by_account.items():
+            await self.lexical_index.aadd(account_id, rows)
+
+    async def _process_batch(self, batch: List[Chunk]) -> int:
+        # Blank chunks have nothing to search for and can never be embedded.
+        batch = [(text, meta) for text, meta in batch if text.strip()]
+        if not batch:
+            return 0
+        texts = [text for text, _ in batch]
+        metadata = [meta for _, meta in batch]
+        for attempt in range(self.max_retries + 1):
+            try:
+                embeddings = await self.embedding_service.get_embeddings_batch(texts)
+                missing = sum(1 for embedding in embeddings if not embedding)
+                if missing:
+                    raise RuntimeError(f"{missing} chunk(s) could not be embedded")
+                points = build_points(texts, metadata, embeddings)
+                upserted = await self.qdrant_service.upsert_points(self.collection_name, points)
+                if self.lexical_index and upserted:
+                    await self._index_lexical(points)
+                return upserted
+            except Exception as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = 2**attempt
+                logger.warning(f"Batch failed ({str(e)}), retrying in {delay}s")
+                await asyncio.sleep(delay)
+        return 0
+
+    async def run(
+        self,
+        chunks: ChunkSource,
+        ingestion_id: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> IngestionProgress:
+        resume_from = -1
+        if self.checkpoint_store and ingestion_id:
+            resume_from = await self.checkpoint_store.load(ingestion_id)
+            if resume_from >= 0:
+                logger.info(f"Resuming ingestion {ingestion_id} after batch {resume_from}")
+
+        progress = IngestionProgress(ingestion_id=ingestion_id, resumed_from_batch=resume_from)
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.max_in_flight)
+        committed: set[int] = set()
+        watermark = resume_from
+
+        async def enqueue(index: int, batch: List[Chunk]) -> None:
+            if index <= resume_from:
+                progress.batches_skipped += 1
+                return
+            await queue.put((index, batch))
+
+        async def produce() -> None:
+            batch: List[Chunk] = []
+            index = 0
+            async for chunk in self.iterate(chunks):
+                batch.append(chunk)
+                if len(batch) < self.batch_size:
+                    continue
+                await enqueue(index, batch)
+                batch, index = [], index + 1
+            if batch:
+                await enqueue(index, batch)
+            for _ in range(self.max_in_flight):
+                await queue.put(None)
+
+        async def consume() -> None:
+            nonlocal watermark
+            while True:
+                item = await queue.get()
+                if item is None:
+                    return
+                index, batch = item
+                upserted = await self._process_batch(batch)
+
+                committed.add(index)
+                progress.batches_committed += 1
+                progress.chunks_committed += upserted
+                previous_watermark = watermark
+                while watermark + 1 in committed:
+                    watermark += 1
+                    committed.discard(watermark)
+                if self.checkpoint_store and ingestion_id and watermark > previous_watermark:
+                    await self.checkpoint_store.save(
+                        ingestion_id, watermark, progress.chunks_committed
+                    )
+
+                logger.info(
+                    f"Ingestion {ingestion_id or ''}: committed batch {index} "
+                    f"({progress.chunks_committed} chunks so far)"
+                )
+                if on_progress:
+                    await on_progress(progress)
+
+        tasks = [asyncio.create_task(produce())]
+        tasks.extend(asyncio.create_task(consume()) for _ in range(self.max_in_flight))
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+        progress.done = True
+        if self.checkpoint_store and ingestion_id:
+            await self.checkpoint_store.clear(ingestion_id)
+        if on_progress:
+            await on_progress(progress)
+        return progress
@@ -0,0 +1,251 @@
+import asyncio
+import hashlib
+import json
+from pathlib import Path
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.config.config import config
+from src.logs.logs import logger
+
+_QUERY_TERM = re.compile(r"\w+", flags=re.UNICODE)
+
+# Function words and chat filler. On their own they match nearly every chunk,
+# so a greeting or "what is the ..." would pull in unrelated documents.
+STOPWORDS = frozenset(
+    """
+    a about above after again all am an and any are as at be because been before being
+    below between both but by can could did do does doing down during each few for from
+    further had has have having he her here hers him his how i if in into is it its just
+    me more most my no nor not now of off on once only or other our ours out over own
+    please same she should so some such than that the their theirs them then there these
+    they this those through to too under until up very was we were what when where which
+    while who whom why will with would you your yours hi hello hey thanks thank ok okay
+    yes yeah
+    """.split()
+)
+
+LexicalHit = Tuple[str, float, str, Dict[str, Any]]
+
+
+class LexicalIndex:
+    """BM25 keyword index over chunk texts, one SQLite FTS5 file per tenant.
+
+    Keeping tenants in separate files keeps their term statistics apart, so
+    one organization's documents never change another's ranking. Rows are
+    keyed by the Qdrant point id, so the index follows upserts and deletes of
+    the vector collection one-to-one.
+    """
+
+    def __init__(self, directory: str) -> None:
+        self.directory = Path(directory)
+        self._connections: Dict[str, sqlite3.Connection] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, account_id: str) -> Path:
+        name = hashlib.sha256(account_id.encode("utf-8")).hexdigest()[:32]
+        return self.directory / f"{name}.sqlite3"
+
+    def exists(self, account_id: str) -> bool:
+        return account_id in self._connections or self._path(account_id).exists()
+
+    def backfilled_version(self, account_id: str) -> Optional[float]:
+        """Knowledge base version of the last completed backfill, or None if
+        there was none. The file alone is not enough: a new upload creates it
+        before older chunks are indexed."""
+        if not self.exists(account_id):
+            return None
+        try:
+            with self._lock:
+                row = (
+                    self._connect(account_id)
+                    .execute("SELECT value FROM meta WHERE key = 'backfilled_version'")
+                    .fetchone()
+                )
+            return float(row[0]) if row else None
+        except sqlite3.Error as e:
+            logger.error(f"Lexical index meta read failed: {str(e)}")
+            return None
+
+    def is_backfilled(self, account_id: str) -> bool:
+        return self.backfilled_version(account_id) is not None
+
+    def mark_backfilled(self, account_id: str, version: float = 0.0) -> None:
+        try:
+            with self._lock:
+                connection = self._connect(account_id)
+                connection.execute(
+                    "INSERT OR REPLACE INTO meta (key, value) VALUES ('backfilled_version', ?)",
+                    (repr(version),),
+                )
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Lexical index meta write failed: {str(e)}")
+
+    def clear(self, account_id: str) -> None:
+        if not self.exists(account_id):
+            return
+        try:
+            with self._lock:
+                connection = self._connect(account_id)
+                connection.execute("DELETE FROM chunks")
+                connection.execute("DELETE FROM meta")
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Lexical index clear failed: {str(e)}")
+
+    def _connect(self, account_id: str) -> sqlite3.Connection:
+        connection = self._connections.get(account_id)
+        if connection is None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(
+                self._path(account_id), check_same_thread=False, timeout=30
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS chunks USING fts5("
+                "text, point_id UNINDEXED, type UNINDEXED, payload UNINDEXED, "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+            connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+            connection.commit()
+            self._connections[account_id] = connection
+        return connection
+
+    def add(self, account_id: str, rows: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        rows = list(rows)
+        if not rows:
+            return 0
+        try:
+            with self._lock:
+                connection = self._connect(account_id)
+                connection.executemany(
+                    "DELETE FROM chunks WHERE point_id = ?",
+                    [(point_id,) for point_id, _, _ in rows],
+                )
+                connection.executemany(
+                    "INSERT INTO chunks (text, point_id, type, payload) VALUES (?, ?, ?, ?)",
+                    [
+                        (text, point_id, payload.get("type"), json.dumps(payload, default=str))
+                        for point_id, text, payload in rows
+                    ],
+                )
+                connection.commit()
+            return len(rows)
+        except sqlite3.Error as e:
+            logger.error(f"Lexical index write failed: {str(e)}")
+            return 0
+
+    def delete(self, account_id: str, point_ids: List[str]) -> None:
+        if not point_ids or not self.exists(account_id):
+            return
+        try:
+            with self._lock:
+                connection = self._connect(account_id)
+                connection.executemany(
+                    "DELETE FROM chunks WHERE point_id = ?", [(point_id,) for point_id in point_ids]
+                )
+                connection.commit()
+        except sqlite3.Error as e:
+            logger.error(f"Lexical index delete failed: {str(e)}")
+
+    @staticmethod
+    def query_terms(text: str) -> List[str]:
+        """Distinct search terms of ``text``. Stopwords and single letters,
+        such as the "s" left over from "what's", are dropped."""
+        return list(
+            dict.fromkeys(
+                term
+                for term in map(str.lower, _QUERY_TERM.findall(text))
+                if term not in STOPWORDS and (len(term) > 1 or term.isdigit())
+            )
+        )
+
+    @staticmethod
+    def build_query(text: str) -> str:
+        return " OR ".join(f'"{term}"' for term in LexicalIndex.query_terms(text))
+
+    @staticmethod
+    def is_strong_match(query: str, text: str) -> bool:
+        """Whether ``text`` shares more than one term with ``query``, or a
+        term with a digit in it (codes, prices, ids). One shared word is too
+        weak to stand as a result on its own."""
+        words = set(map(str.lower, _QUERY_TERM.findall(text)))
+        matched = [term for term in LexicalIndex.query_terms(query) if term in words]
+        return len(matched) > 1 or any(char.isdigit() for term in matched for char in term)
+
+    def search(
+        self,
+        account_id: str,
+        query: str,
+        limit: int = 20,
+        file_type: Optional[str] = None,
+        min_score: float = 0.0,
+    ) -> List[LexicalHit]:
+        match = self.build_query(query)
+        if not match or not self.exists(account_id):
+            return []
+        sql = "SELECT point_id, bm25(chunks), text, payload FROM chunks WHERE chunks MATCH ?"
+        params: List[Any] = [match]
+        if file_type:
+            sql += " AND type = ?"
+            params.append(file_type)
+        if min_score > 0:
+            sql += " AND bm25(chunks) <= ?"
+            params.append(-min_score)
+        # FTS5 reports BM25 as a negative number where lower is better.
+        sql += " ORDER BY bm25(chunks) LIMIT ?"
+        params.append(limit)
+        try:
+            with self._lock:
+                rows = self._connect(account_id).execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            logger.error(f"Lexical search failed: {str(e)}")
+            return []
+        return [
+            (point_id, -score, text, json.loads(payload)) for point_id, score, text, payload in rows
+        ]
+
+    async def aadd(self, account_id: str, rows: Iterable[Tuple[str, str, Dict[str, Any]]]) -> int:
+        return await asyncio.to_thread(self.add, account_id, list(rows))
+
+    async def adelete(self, account_id: str, point_ids: List[str]) -> None:
+        await asyncio.to_thread(self.delete, account_id, point_ids)
+
+    async def asearch(
+        self,
+        account_id: str,
+        query: str,
+        limit: int = 20,
+        file_type: Optional[str] = None,
+        min_score: float = 0.0,
+    ) -> List[LexicalHit]:
+        return await asyncio.to_thread(self.search, account_id, query, limit, file_type, min_score)
+
+    async def abackfilled_version(self, account_id: str) -> Optional[float]:
+        return await asyncio.to_thread(self.backfilled_version, account_id)
+
+    async def amark_backfilled(self, account_id: str, version: float = 0.0) -> None:
+        await asyncio.to_thread(self.mark_backfilled, account_id, version)
+
+    async def aclear(self, account_id: str) -> None:
+        await asyncio.to_thread(self.clear, account_id)
+
+    def close(self) -> None:
+        with self._lock:
+            for connection in self._connections.values():
+                connection.close()
+            self._connections.clear()
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> Dict[str, float]:
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, key in enumerate(ranking, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return scores
+
+
+lexical_index = LexicalIndex(config.LEXICAL_INDEX_DIR)
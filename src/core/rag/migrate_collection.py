@@ -0,0 +1,44 @@
+"""Move the knowledge base collection to another storage profile.
+
+Usage (from the repository root, with the usual environment variables set):
+
+    python -m src.core.rag.migrate_collection balanced [--keep-old]
+
+Points are copied into a new collection built with the profile and the
+collection name becomes an alias of it, so nothing is re-embedded. Set
+QDRANT_COLLECTION_PROFILE to the same profile afterwards, or searches keep
+using the previous profile's dimension and search parameters.
+"""
+
+import argparse
+import asyncio
+
+from src.config.config import config
+from src.core.rag.collection_profiles import PROFILES, get_profile
+from src.core.rag.qdrant import SemanticEmbeddingService, SemanticQdrantService
+
+
+async def run(profile_name: str, keep_old: bool) -> None:
+    qdrant_service = SemanticQdrantService(
+        url=config.QDRANT_API_URL, api_key=config.QDRANT_API_KEY, timeout=120
+    )
+    embedding_service = SemanticEmbeddingService(persistent_cache=None)
+    await embedding_service.backend.warmup()
+    collection_name = embedding_service.collection_name
+    try:
+        target = await qdrant_service.migrate_collection(
+            collection_name, get_profile(profile_name), drop_old=not keep_old
+        )
+        print(f"{collection_name} -> {target}")
+    finally:
+        await qdrant_service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("profile", choices=list(PROFILES))
+    parser.add_argument(
+        "--keep-old", action="store_true", help="keep the previous collection behind the alias"
+    )
+    args = parser.parse_args()
+    asyncio.run(run(args.profile, args.keep_old))
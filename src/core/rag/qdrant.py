@@ -1,102 +1,504 @@
 import asyncio
 from collections import OrderedDict
-from typing import List, Optional
-import uuid
+import re
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional
 
+import httpx
 from openai import OpenAI
-from qdrant_client import QdrantClient, models
-from qdrant_client.http.models import Distance, VectorParams
+from qdrant_client import AsyncQdrantClient, models
 from qdrant_client.models import FieldCondition, Filter, MatchValue, PointStruct, ScoredPoint
 
 from src.config.config import config
+from src.core.rag.collection_profiles import CollectionProfile, get_profile
+from src.core.rag.embedding_backends import EmbeddingBackend, embedding_backend
+from src.core.rag.embedding_cache import EmbeddingCache, embedding_cache
+from src.core.rag.ingestion import (
+    ChunkSource,
+    IngestionCheckpointStore,
+    IngestionPipeline,
+    IngestionProgress,
+    ProgressCallback,
+    build_points,
+    point_id,
+)
+from src.core.rag.lexical_index import (
+    LexicalHit,
+    LexicalIndex,
+    lexical_index,
+    reciprocal_rank_fusion,
+)
+from src.core.rag.rerank import Reranker, reranker
+from src.llm.tokens import estimate_tokens
 from src.logs.logs import logger
+from src.logs.tracing import tracer
 
+COLLECTION_NAME = "personal_assistant"
+# Vectors of the original OpenAI model stay in the unsuffixed collection.
+DEFAULT_EMBEDDING_SPACE = ("text-embedding-3-small", 1536)
 
-class SemanticEmbeddingService:
-    def __init__(self, cache_size: int = 1000) -> None:
-        self.embeddings_cache: OrderedDict[str, List[float]] = OrderedDict()
-        self.cache_size = cache_size
-        self.dimension = 1536
-
-        if not config.OPENAI_API_KEY:
-            logger.error("OPENAI_API_KEY not available")
-            self.client = None
-            return
 
-        try:
-            self.client = OpenAI(api_key=config.OPENAI_API_KEY)
-            logger.info("OpenAI client initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize OpenAI client: {str(e)}")
-            self.client = None
+def collection_name_for(model: str, dimension: int) -> str:
+    """Each embedding model and dimension gets its own collection, so vectors
+    from different models are never searched together."""
+    if (model, dimension) == DEFAULT_EMBEDDING_SPACE:
+        return COLLECTION_NAME
+    slug = re.sub(r"[^a-z0-9]+", "-", model.lower()).strip("-")
+    return f"{COLLECTION_NAME}__{slug}_{dimension}"
 
-    async def get_embeddings(self, text: str, model: str = "text-embedding-3-small") -> List[float]:
-        if text in self.embeddings_cache:
-            self.embeddings_cache.move_to_end(text)
-            return self.embeddings_cache[text]
 
-        if not self.client:
-            logger.error("OpenAI client not initialized")
-            return []
+class SemanticEmbeddingService:
+    MAX_INPUT_TOKENS = 8191
 
+    def __init__(
+        self,
+        cache_size: int = 1000,
+        persistent_cache: Optional[EmbeddingCache] = embedding_cache,
+        backend: Optional[EmbeddingBackend] = None,
+    ) -> None:
+        self.embeddings_cache: OrderedDict[str, List[float]] = OrderedDict()
+        self.cache_size = cache_size
+        self.persistent_cache = persistent_cache
+        self.backend = backend or embedding_backend
+
+    @property
+    def model(self) -> str:
+        return self.backend.model_name
+
+    @property
+    def dimension(self) -> int:
+        return self.backend.dimension
+
+    @property
+    def collection_name(self) -> str:
+        return collection_name_for(self.model, self.dimension)
+
+    @property
+    def client(self) -> Optional[OpenAI]:
+        return getattr(self.backend, "client", None)
+
+    @client.setter
+    def client(self, client: Optional[OpenAI]) -> None:
+        self.backend.client = client  # type: ignore
+
+    def _cache_get(self, model: str, text: str) -> Optional[List[float]]:
+        key = EmbeddingCache.make_key(model, text)
+        if key not in self.embeddings_cache:
+            return None
+        self.embeddings_cache.move_to_end(key)
+        return self.embeddings_cache[key]
+
+    def _cache_put(self, model: str, text: str, embedding: List[float]) -> None:
+        key = EmbeddingCache.make_key(model, text)
+        self.embeddings_cache[key] = embedding
+        self.embeddings_cache.move_to_end(key)
+        if len(self.embeddings_cache) > self.cache_size:
+            self.embeddings_cache.popitem(last=False)
+
+    async def get_embeddings(self, text: str) -> List[float]:
+        embeddings = await self.get_embeddings_batch([text])
+        return embeddings[0]
+
+    def _fit(self, text: str) -> str:
+        """Cut ``text`` down to ``MAX_INPUT_TOKENS``; one over-long input makes
+        the API reject the whole request it is part of."""
+        tokens = estimate_tokens(text)
+        while tokens > self.MAX_INPUT_TOKENS:
+            text = text[: len(text) * self.MAX_INPUT_TOKENS // tokens]
+            tokens = estimate_tokens(text)
+        return text
+
+    async def _embed_batch(self, batch: List[str]) -> List[List[float]]:
         try:
-            response = await asyncio.to_thread(
-                self.client.embeddings.create, model=model, input=text
-            )
+            return await self.backend.embed([self._fit(text) for text in batch])
+        except Exception as e:
+            if len(batch) == 1:
+                raise
+            # Find the input the request was rejected for instead of losing
+            # the whole batch to it.
+            logger.warning(f"Batch of {len(batch)} rejected ({str(e)}), embedding one by one")
+        embeddings: List[List[float]] = []
+        for text in batch:
+            try:
+                embeddings.extend(await self.backend.embed([self._fit(text)]))
+            except Exception as e:
+                logger.error(f"Error getting embedding for text {text[:50]!r}: {str(e)}")
+                embeddings.append([])
+        return embeddings
+
+    def _plan_batches(
+        self, texts: List[str], max_batch_tokens: int, max_batch_size: int
+    ) -> List[List[str]]:
+        batches: List[List[str]] = []
+        current: List[str] = []
+        current_tokens = 0
+        for text in texts:
+            tokens = min(estimate_tokens(text), self.MAX_INPUT_TOKENS)
+            if current and (
+                current_tokens + tokens > max_batch_tokens or len(current) >= max_batch_size
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+            current.append(text)
+            current_tokens += tokens
+        if current:
+            batches.append(current)
+        return batches
+
+    async def get_embeddings_batch(
+        self,
+        texts: List[str],
+        max_batch_tokens: Optional[int] = None,
+        max_batch_size: Optional[int] = None,
+    ) -> List[List[float]]:
+        """Embed many texts with as few requests as possible.
+
+        Results are returned in the same order as ``texts``. Texts are looked
+        up in the in-process LRU, then in the persistent cache, and each
+        distinct remaining miss is requested once. Over-long texts are
+        truncated to ``MAX_INPUT_TOKENS``. Blank texts, and texts whose
+        embedding could not be fetched, map to an empty list.
+        """
+        model = self.model
+        results: List[List[float]] = [[] for _ in texts]
+        misses: Dict[str, List[int]] = {}
+        for i, text in enumerate(texts):
+            if not text.strip():
+                continue
+            cached = self._cache_get(model, text)
+            if cached is not None:
+                results[i] = cached
+            else:
+                misses.setdefault(text, []).append(i)
+
+        if misses and self.persistent_cache is not None:
+            stored = await self.persistent_cache.aget_many(model, list(misses))
+            for text, embedding in stored.items():
+                self._cache_put(model, text, embedding)
+                for i in misses.pop(text):
+                    results[i] = embedding
+
+        if not misses:
+            return results
+
+        if not self.backend.available:
+            logger.error(f"Embedding backend for {model} not available")
+            return results
+
+        batches = self._plan_batches(
+            list(misses),
+            max_batch_tokens or self.backend.max_batch_tokens,
+            max_batch_size or self.backend.max_batch_size,
+        )
+        cache_hits = len(texts) - sum(len(positions) for positions in misses.values())
+        logger.info(
+            f"Embedding {len(misses)} texts in {len(batches)} request(s), {cache_hits} cache hits"
+        )
+        for batch_number, batch in enumerate(batches, start=1):
+            try:
+                embeddings = await self._embed_batch(batch)
+            except Exception as e:
+                logger.error(f"Error getting embeddings for batch {batch_number}: {str(e)}")
+                continue
 
-            if response and response.data and len(response.data) > 0:
-                embeddings = response.data[0].embedding
-                self.embeddings_cache[text] = embeddings
-                logger.info(f"Embedding for text (length: {len(text)}) completed")
+            fetched: Dict[str, List[float]] = {}
+            for text, embedding in zip(batch, embeddings):
+                if not embedding:
+                    continue
+                fetched[text] = embedding
+                self._cache_put(model, text, embedding)
+                for i in misses[text]:
+                    results[i] = embedding
 
-                if len(self.embeddings_cache) > self.cache_size:
-                    self.embeddings_cache.popitem(last=False)
+            if self.persistent_cache is not None:
+                await self.persistent_cache.aput_many(model, fetched)
 
-                return embeddings
-            else:
-                logger.error("No embedding in response")
-                return []
+            logger.info(f"Embedded batch {batch_number}/{len(batches)} ({len(batch)} texts)")
 
-        except Exception as e:
-            logger.error(f"Error getting embeddings: {str(e)}")
-            return []
+        if self.persistent_cache is not None:
+            logger.info(f"Embedding cache stats: {self.persistent_cache.stats()}")
+        return results
 
 
 class SemanticQdrantService:
-    def __init__(self, url: str, api_key: str) -> None:
-        self.client = QdrantClient(url=url, api_key=api_key)
+    # Payload fields every search filters on. account_id is flagged as the
+    # tenant key so Qdrant co-locates each organization's vectors.
+    PAYLOAD_INDEXES = {
+        "account_id": models.KeywordIndexParams(
+            type=models.KeywordIndexType.KEYWORD, is_tenant=True
+        ),
+        "type": models.PayloadSchemaType.KEYWORD,
+        "path": models.PayloadSchemaType.KEYWORD,
+    }
+
+    def __init__(
+        self,
+        url: str,
+        api_key: str,
+        timeout: int = config.QDRANT_TIMEOUT,
+        max_connections: int = config.QDRANT_MAX_CONNECTIONS,
+        upsert_batch_size: int = config.QDRANT_UPSERT_BATCH_SIZE,
+        profile: Optional[CollectionProfile] = None,
+    ) -> None:
+        # qdrant-client disables HTTP keep-alive unless limits are passed, which
+        # would open a new connection for every search.
+        self.client = AsyncQdrantClient(
+            url=url,
+            api_key=api_key,
+            timeout=timeout,
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+        )
         self.dimension = 1536
+        self.upsert_batch_size = upsert_batch_size
+        self.profile = profile or get_profile(config.QDRANT_COLLECTION_PROFILE)
+        self._indexed_collections: set[str] = set()
+        self._index_lock = asyncio.Lock()
 
-    def collection_exists(self, collection_name: str) -> bool:
+    async def collection_exists(self, collection_name: str) -> bool:
         try:
-            response = self.client.get_collection(collection_name)
-            return response is not None
+            return await self.client.collection_exists(collection_name)
         except Exception:
             return False
 
-    def create_collection(self, collection_name: str) -> None:
-        if not self.collection_exists(collection_name):
-            self.client.create_collection(
+    async def create_collection(
+        self,
+        collection_name: str,
+        profile: Optional[CollectionProfile] = None,
+        dimension: Optional[int] = None,
+    ) -> None:
+        profile = profile or self.profile
+        size = profile.vector_size(dimension or self.dimension)
+        if not await self.collection_exists(collection_name):
+            await self.client.create_collection(
                 collection_name=collection_name,
-                vectors_config=VectorParams(size=self.dimension, distance=Distance.COSINE),
+                vectors_config=profile.vectors_config(dimension or self.dimension),
+                hnsw_config=profile.hnsw_config(),
+                quantization_config=profile.quantization_config(),
             )
+            logger.info(f"Created collection '{collection_name}' with profile '{profile.name}'")
+        else:
+            info = await self.client.get_collection(collection_name)
+            existing = info.config.params.vectors.size  # type: ignore
+            if existing != size:
+                raise ValueError(
+                    f"Collection '{collection_name}' stores {existing}-d vectors, "
+                    f"the embedding model produces {size}-d vectors"
+                )
+        await self.ensure_payload_indexes(collection_name)
 
-    def upsert_points(self, collection_name: str, points: list[PointStruct]) -> None:
-        self.client.upsert(collection_name=collection_name, points=points)
-
-    def search(
+    async def ensure_payload_indexes(self, collection_name: str) -> None:
+        if collection_name in self._indexed_collections:
+            return
+        async with self._index_lock:
+            if collection_name in self._indexed_collections:
+                return
+            try:
+                info = await self.client.get_collection(collection_name)
+                existing = set(info.payload_schema or {})
+                for field_name, field_schema in self.PAYLOAD_INDEXES.items():
+                    if field_name in existing:
+                        continue
+                    await self.client.create_payload_index(
+                        collection_name=collection_name,
+                        field_name=field_name,
+                        field_schema=field_schema,
+                    )
+                    logger.info(f"Created payload index on '{field_name}' in '{collection_name}'")
+                self._indexed_collections.add(collection_name)
+            except Exception as e:
+                logger.error(f"Failed to ensure payload indexes for '{collection_name}': {str(e)}")
+
+    async def upsert_points(self, collection_name: str, points: list[PointStruct]) -> int:
+        if self.profile.dimension:
+            points = [
+                point.model_copy(update={"vector": self.profile.reduce(point.vector)})  # type: ignore
+                for point in points
+            ]
+        upserted = 0
+        for i in range(0, len(points), self.upsert_batch_size):
+            batch = points[i : i + self.upsert_batch_size]
+            await self.client.upsert(collection_name=collection_name, points=batch, wait=True)
+            upserted += len(batch)
+        return upserted
+
+    async def list_point_ids(
+        self, collection_name: str, account_id: str, path: Optional[str] = None
+    ) -> set[str]:
+        point_ids: set[str] = set()
+        scroll_filter = self.build_filter(account_id, path=path)
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=scroll_filter,
+                limit=1000,
+                offset=offset,
+                with_payload=False,
+                with_vectors=False,
+            )
+            point_ids.update(str(point.id) for point in points)
+            if offset is None:
+                return point_ids
+
+    async def iter_payloads(
+        self, collection_name: str, account_id: str
+    ) -> AsyncIterator[tuple[str, dict]]:
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=collection_name,
+                scroll_filter=self.build_filter(account_id),
+                limit=1000,
+                offset=offset,
+                with_payload=True,
+                with_vectors=False,
+            )
+            for point in points:
+                yield str(point.id), point.payload or {}
+            if offset is None:
+                return
+
+    async def delete_points(self, collection_name: str, point_ids: list[str]) -> int:
+        for i in range(0, len(point_ids), self.upsert_batch_size):
+            batch = point_ids[i : i + self.upsert_batch_size]
+            await self.client.delete(
+                collection_name=collection_name,
+                points_selector=models.PointIdsList(points=batch),  # type: ignore
+                wait=True,
+            )
+        return len(point_ids)
+
+    @staticmethod
+    def build_filter(
+        account_id: str, file_type: Optional[str] = None, path: Optional[str] = None
+    ) -> Filter:
+        conditions = [FieldCondition(key="account_id", match=MatchValue(value=account_id))]
+        if file_type:
+            conditions.append(FieldCondition(key="type", match=MatchValue(value=file_type)))
+        if path:
+            conditions.append(FieldCondition(key="path", match=MatchValue(value=path)))
+        return Filter(must=conditions)
+
+    async def search(
         self,
         query_embedding: list[float],
         account_id: str,
         limit: int = 5,
+        file_type: Optional[str] = None,
+        score_threshold: Optional[float] = None,
+        collection_name: str = COLLECTION_NAME,
     ) -> list[ScoredPoint]:
-        # For now, search without filters to avoid index issues
-        # TODO: Add proper index creation for owner_id, telegram_group_id, and account_id fields
-        return self.client.search(
-            collection_name="personal_assistant",
-            query_vector=query_embedding,
+        await self.ensure_payload_indexes(collection_name)
+        response = await self.client.query_points(
+            collection_name=collection_name,
+            query=self.profile.reduce(query_embedding),
+            query_filter=self.build_filter(account_id, file_type),
             limit=limit,
+            score_threshold=score_threshold,
+            search_params=self.profile.search_params(),
+            with_payload=True,
+        )
+        return response.points
+
+    async def resolve_alias(self, name: str) -> Optional[str]:
+        response = await self.client.get_aliases()
+        for alias in response.aliases:
+            if alias.alias_name == name:
+                return alias.collection_name
+        return None
+
+    async def migrate_collection(
+        self, name: str, profile: CollectionProfile, drop_old: bool = True
+    ) -> str:
+        """Copies ``name`` into a new collection built with ``profile`` and
+        points the alias ``name`` at it.
+
+        Stored vectors are copied as they are (reduced to the profile's
+        dimension), so nothing is re-embedded. Searches keep using ``name``
+        throughout. When ``name`` is still a plain collection rather than an
+        alias, it has to be deleted before the alias can take its name, so
+        searches fail for that moment; every later migration swaps the alias
+        atomically.
+        """
+        source = await self.resolve_alias(name)
+        is_alias = source is not None
+        if source is None:
+            if not await self.collection_exists(name):
+                raise ValueError(f"Collection '{name}' does not exist")
+            source = name
+
+        info = await self.client.get_collection(source)
+        source_size = info.config.params.vectors.size  # type: ignore
+        if profile.dimension and profile.dimension > source_size:
+            raise ValueError(
+                f"Profile '{profile.name}' needs {profile.dimension} dimensions "
+                f"but '{source}' only stores {source_size}"
+            )
+
+        target = f"{name}_{profile.name}_{int(time.time())}"
+        await self.create_collection(target, profile, dimension=source_size)
+
+        copied = 0
+        offset = None
+        while True:
+            points, offset = await self.client.scroll(
+                collection_name=source,
+                limit=self.upsert_batch_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True,
+            )
+            if points:
+                await self.client.upsert(
+                    collection_name=target,
+                    points=[
+                        PointStruct(
+                            id=point.id,
+                            vector=profile.reduce(point.vector),  # type: ignore
+                            payload=point.payload,
+                        )
+                        for point in points
+                    ],
+                    wait=True,
+                )
+                copied += len(points)
+                logger.info(f"Copied {copied} points from '{source}' to '{target}'")
+            if offset is None:
+                break
+
+        expected = (await self.client.count(source, exact=True)).count
+        actual = (await self.client.count(target, exact=True)).count
+        if actual < expected:
+            raise RuntimeError(
+                f"'{target}' has {actual} of {expected} points, keeping '{name}' as it is"
+            )
+
+        if is_alias:
+            operations: list = [
+                models.DeleteAliasOperation(delete_alias=models.DeleteAlias(alias_name=name))
+            ]
+        else:
+            logger.warning(f"Replacing collection '{name}' with an alias, searches pause briefly")
+            await self.client.delete_collection(name)
+            operations = []
+        operations.append(
+            models.CreateAliasOperation(
+                create_alias=models.CreateAlias(collection_name=target, alias_name=name)
+            )
         )
+        await self.client.update_collection_aliases(change_aliases_operations=operations)
+        self._indexed_collections.discard(name)
+        logger.info(f"'{name}' now points to '{target}' (profile '{profile.name}')")
+
+        if is_alias and drop_old:
+            await self.client.delete_collection(source)
+        return target
+
+    async def close(self) -> None:
+        await self.client.close()
 
 
 class SemanticSearchRepo:
@@ -104,81 +506,60 @@ class SemanticSearchRepo:
         self,
         embedding_service: SemanticEmbeddingService,
         qdrant_service: SemanticQdrantService,
+        checkpoint_store: Optional[IngestionCheckpointStore] = None,
+        lexical: Optional[LexicalIndex] = lexical_index if config.HYBRID_SEARCH else None,
+        reranker: Optional[Reranker] = reranker,
+        collection_name: Optional[str] = None,
+        kb_version: Optional[Callable[[str], Awaitable[float]]] = None,
     ):
         self.embedding_service = embedding_service
         self.qdrant_service = qdrant_service
+        self.checkpoint_store = checkpoint_store
+        self.lexical = lexical
+        self.reranker = reranker
+        self._lexical_rebuilds: dict[str, asyncio.Task] = {}
+        self.kb_version = kb_version
+        self._lexical_ready: dict[str, float] = {}
+        self.last_timings: dict[str, float] = {}
+        self._collection_name = collection_name
+
+    @property
+    def collection_name(self) -> str:
+        # Resolved lazily: a local embedding model is loaded to learn its dimension.
+        if self._collection_name is None:
+            self._collection_name = self.embedding_service.collection_name
+        return self._collection_name
 
     async def prepare_points(self, texts: list[str], metadata: list[dict]) -> list[PointStruct]:
-        points = []
-        for text, meta in zip(texts, metadata):
-            embedding = await self.embedding_service.get_embeddings(text)
-            points.append(
-                PointStruct(
-                    id=str(uuid.uuid4()),
-                    vector=embedding,
-                    payload={"text": text, **meta},
-                )
-            )
-        return points
+        embeddings = await self.embedding_service.get_embeddings_batch(texts)
+        return build_points(texts, metadata, embeddings)
 
     async def prepare_points_async(
-        self, texts: list[str], metadata: list[dict], semaphore: Optional[asyncio.Semaphore] = None
+        self, texts: list[str], metadata: list[dict], batch_size: int = 512
     ) -> list[PointStruct]:
-        if semaphore is None:
-            semaphore = asyncio.Semaphore(25)
-
-        async def process_batch(
-            batch_texts: list[str], batch_metadata: list[dict]
-        ) -> list[PointStruct]:
-            async with semaphore:
-                tasks = []
-                for text, _ in zip(batch_texts, batch_metadata):
-                    task = self.embedding_service.get_embeddings(text)
-                    tasks.append(task)
-
-                embeddings = await asyncio.gather(*tasks)
-
-                return [
-                    PointStruct(
-                        id=str(uuid.uuid4()),
-                        vector=embedding,
-                        payload={"text": text, **meta},
-                    )
-                    for text, meta, embedding in zip(batch_texts, batch_metadata, embeddings)
-                ]
-
-        batch_size = 25
         all_points = []
+        total_batches = (len(texts) + batch_size - 1) // batch_size
 
         for i in range(0, len(texts), batch_size):
             batch_texts = texts[i : i + batch_size]
             batch_metadata = metadata[i : i + batch_size]
 
-            batch_points = await process_batch(batch_texts, batch_metadata)
-            all_points.extend(batch_points)
+            embeddings = await self.embedding_service.get_embeddings_batch(batch_texts)
+            all_points.extend(build_points(batch_texts, batch_metadata, embeddings))
 
-            logger.info(
-                f"Processed batch {i // batch_size + 1}/{(len(texts) + batch_size - 1) // batch_size}"
-            )
+            logger.info(f"Processed batch {i // batch_size + 1}/{total_batches}")
 
         return all_points
 
-    async def create_collection(self, collection_name: str, embedding_dim: int = 1536) -> None:
-        collection_exists = self.qdrant_service.client.collection_exists(
-            collection_name=collection_name
+    async def create_collection(self) -> None:
+        await self.qdrant_service.create_collection(
+            self.collection_name, dimension=self.embedding_service.dimension
         )
-        if collection_exists is False:
-            self.qdrant_service.client.create_collection(
-                collection_name,
-                vectors_config=models.VectorParams(
-                    size=embedding_dim, distance=models.Distance.COSINE
-                ),
-            )
 
     async def initialize_qdrant(self, texts: list[str], metadata: list[dict[str, str]]) -> bool:
         try:
             points = await self.prepare_points(texts, metadata)
-            result = self.qdrant_service.upsert_points("personal_assistant", points)
+            result = await self.qdrant_service.upsert_points(self.collection_name, points)
             logger.info(f"The  upserted points results: {result}")
             return True
         except Exception as e:
@@ -188,42 +569,262 @@ class SemanticSearchRepo:
     async def initialize_qdrant_async(
         self, texts: list[str], metadata: list[dict[str, str]]
     ) -> bool:
-        semaphore = asyncio.Semaphore(25)
+        await self.ingest_stream(zip(texts, metadata))
+        return True
 
-        logger.info("Starting async batch processing...")
+    async def ingest_stream(
+        self,
+        chunks: ChunkSource,
+        ingestion_id: Optional[str] = None,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> IngestionProgress:
+        logger.info("Starting streaming ingestion...")
         start_time = asyncio.get_event_loop().time()
 
-        points = await self.prepare_points_async(texts, metadata, semaphore)
+        pipeline = IngestionPipeline(
+            self.embedding_service,
+            self.qdrant_service,
+            self.collection_name,
+            checkpoint_store=self.checkpoint_store,
+            lexical_index=self.lexical,
+        )
+        progress = await pipeline.run(chunks, ingestion_id=ingestion_id, on_progress=on_progress)
 
         processing_time = asyncio.get_event_loop().time() - start_time
-        logger.info(f"Async embedding processing completed in {processing_time:.2f} seconds")
+        logger.info(
+            f"Ingested {progress.chunks_committed} chunks in {progress.batches_committed} "
+            f"batches ({progress.batches_skipped} resumed) in {processing_time:.2f} seconds"
+        )
+        return progress
 
-        result = self.qdrant_service.upsert_points("personal_assistant", points)
-        logger.info(f"Upsert result: {result}")
-        return True
+    async def sync_document(
+        self,
+        chunks: ChunkSource,
+        account_id: str,
+        path: str,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> IngestionProgress:
+        """Bring the points stored for one file in line with its current chunks.
+
+        Point ids are derived from (account_id, path, chunk hash), so chunks that
+        are already stored are skipped, new or edited chunks are embedded and
+        upserted, and points whose chunk no longer exists are deleted once the
+        upsert has finished. A sync that fails midway resumes for free on the
+        next run because everything it committed is skipped.
+        """
+        existing = await self.qdrant_service.list_point_ids(self.collection_name, account_id, path)
+        seen: set[str] = set()
+
+        async def changed_chunks():
+            async for text, meta in IngestionPipeline.iterate(chunks):
+                chunk_id = point_id(account_id, path, text)
+                if chunk_id in seen:
+                    continue
+                seen.add(chunk_id)
+                if chunk_id not in existing:
+                    yield text, meta
+
+        progress = await self.ingest_stream(changed_chunks(), on_progress=on_progress)
+
+        stale = list(existing - seen)
+        if stale:
+            await self.qdrant_service.delete_points(self.collection_name, stale)
+            if self.lexical:
+                await self.lexical.adelete(account_id, stale)
+        logger.info(
+            f"Synced {path}: {progress.chunks_committed} upserted, "
+            f"{len(seen) - progress.chunks_committed} unchanged, {len(stale)} deleted"
+        )
+        return progress
+
+    async def rebuild_lexical_index(self, account_id: str, version: float = 0.0) -> int:
+        """Re-index every stored chunk of a tenant from Qdrant, e.g. ones
+        ingested before the lexical index existed or by another process, and
+        record ``version`` as the knowledge base version the index matches."""
+        if not self.lexical:
+            return 0
+        await self.lexical.aclear(account_id)
+        indexed = 0
+        batch: list[tuple[str, str, dict]] = []
+        async for point_id, payload in self.qdrant_service.iter_payloads(
+            self.collection_name, account_id
+        ):
+            batch.append((point_id, payload.get("text", ""), payload))
+            if len(batch) >= 1000:
+                indexed += await self.lexical.aadd(account_id, batch)
+                batch = []
+        indexed += await self.lexical.aadd(account_id, batch)
+        await self.lexical.amark_backfilled(account_id, version)
+        logger.info(f"Rebuilt lexical index for account {account_id}: {indexed} chunks")
+        return indexed
+
+    async def _ensure_lexical_index(self, account_id: str) -> bool:
+        """True when the tenant's lexical index holds every chunk in Qdrant.
+
+        Each process keeps its own SQLite index, while uploads are indexed
+        only by the process that ingests them. The index therefore records
+        the knowledge base version it was rebuilt at, and is rebuilt in the
+        background whenever an ingestion anywhere bumps that version. Keyword
+        search is skipped until the rebuild finishes.
+        """
+        if not self.lexical:
+            return False
+        version = await self.kb_version(account_id) if self.kb_version else 0.0
+        if self._lexical_ready.get(account_id) == version:
+            return True
+        indexed = await self.lexical.abackfilled_version(account_id)
+        if indexed is not None and indexed >= version:
+            self._lexical_ready[account_id] = version
+            return True
+        task = self._lexical_rebuilds.get(account_id)
+        if task is not None and task.done() and not task.cancelled() and task.exception():
+            logger.error(f"Lexical index rebuild for {account_id} failed: {task.exception()}")
+        if task is None or task.done():
+            self._lexical_rebuilds[account_id] = asyncio.create_task(
+                self.rebuild_lexical_index(account_id, version)
+            )
+        return False
+
+    async def _vector_search(
+        self,
+        query_text: str,
+        account_id: str,
+        threshold: float,
+        limit: int,
+        file_type: Optional[str],
+        timings: dict[str, float],
+    ) -> list[ScoredPoint]:
+        started = time.perf_counter()
+        with tracer.span("embedding.query"):
+            query_embedding = await self.embedding_service.get_embeddings(query_text)
+        timings["embed_ms"] = (time.perf_counter() - started) * 1000
+        if not query_embedding:
+            return []
+        started = time.perf_counter()
+        with tracer.span("qdrant.search"):
+            points = await self.qdrant_service.search(
+                query_embedding,
+                account_id,
+                limit=limit,
+                file_type=file_type,
+                score_threshold=threshold,
+                collection_name=self.collection_name,
+            )
+        timings["vector_ms"] = (time.perf_counter() - started) * 1000
+        return points
+
+    async def _lexical_search(
+        self,
+        query_text: str,
+        account_id: str,
+        limit: int,
+        file_type: Optional[str],
+        timings: dict[str, float],
+    ) -> list[LexicalHit]:
+        if not self.lexical or not await self._ensure_lexical_index(account_id):
+            return []
+        started = time.perf_counter()
+        with tracer.span("lexical.search"):
+            hits = await self.lexical.asearch(
+                account_id,
+                query_text,
+                limit=limit,
+                file_type=file_type,
+                min_score=config.LEXICAL_MIN_SCORE,
+            )
+        timings["lexical_ms"] = (time.perf_counter() - started) * 1000
+        return hits
 
     async def query_text(
         self,
         query_text: str,
         account_id: str,
         threshold: float = 0.5,
+        limit: int = 5,
+        file_type: Optional[str] = None,
     ) -> list[dict]:
+        """Dense search fused with BM25 keyword search by reciprocal rank.
+
+        Each signal fetches ``HYBRID_CANDIDATES`` times ``limit`` candidates.
+        Dense candidates must reach ``threshold`` and keyword candidates must
+        match a non-stopword query term with BM25 of at least
+        ``LEXICAL_MIN_SCORE``, so exact matches on codes, prices or names can
+        still come in through the keyword side. When nothing dense matched,
+        keyword candidates must also be a strong match (see
+        ``LexicalIndex.is_strong_match``). Results only the keyword side found
+        are flagged ``lexical_only`` and never attach media files.
+        With a reranker, the best ``RERANK_CANDIDATES`` fused results are
+        rescored and the top ``limit`` of them returned.
+        """
         try:
-            query_embedding = await self.embedding_service.get_embeddings(query_text)
-            response = self.qdrant_service.search(query_embedding, account_id)
+            timings: dict[str, float] = {}
+            started = time.perf_counter()
+            pool = max(limit, config.RERANK_CANDIDATES) if self.reranker else limit
+            candidates = pool * config.HYBRID_CANDIDATES if self.lexical else pool
+            vector_points, lexical_hits = await asyncio.gather(
+                self._vector_search(
+                    query_text, account_id, threshold, candidates, file_type, timings
+                ),
+                self._lexical_search(query_text, account_id, candidates, file_type, timings),
+            )
             logger.info(f"Query: {query_text}")
-            result = []
 
-            logger.info(f"Response: {response}")
-            for data in response:
-                if data.score > threshold and data.payload:
-                    result.append(
+            results: dict[str, dict] = {}
+            for data in vector_points:
+                if data.payload:
+                    results[str(data.id)] = {
+                        "score": data.score,
+                        "text": data.payload.get("text", ""),
+                        "metadata": data.payload,
+                        "vector_score": data.score,
+                    }
+
+            if not vector_points:
+                # Without a dense hit the keyword side alone decides whether the
+                # query gets any context, so a single shared word is not enough.
+                lexical_hits = [
+                    hit for hit in lexical_hits if LexicalIndex.is_strong_match(query_text, hit[2])
+                ]
+
+            if not lexical_hits:
+                result = list(results.values())[:pool]
+            else:
+                fusion_started = time.perf_counter()
+                for point_id, score, text, payload in lexical_hits:
+                    entry = results.setdefault(
+                        point_id,
                         {
-                            "score": data.score,
-                            "text": data.payload.get("text", ""),
-                            "metadata": data.payload,
-                        }
+                            "text": text,
+                            "metadata": payload,
+                            "vector_score": None,
+                            "lexical_only": True,
+                        },
                     )
+                    entry["lexical_score"] = score
+                fused = reciprocal_rank_fusion(
+                    [
+                        [str(data.id) for data in vector_points if data.payload],
+                        [hit[0] for hit in lexical_hits],
+                    ],
+                    k=config.RRF_K,
+                )
+                ranked = sorted(fused, key=fused.get, reverse=True)[:pool]  # type: ignore
+                result = [{**results[key], "score": fused[key]} for key in ranked]
+                timings["fusion_ms"] = (time.perf_counter() - fusion_started) * 1000
+
+            if self.reranker and len(result) > limit:
+                rerank_started = time.perf_counter()
+                with tracer.span("rerank"):
+                    result = await self.reranker.rerank(query_text, result, limit)
+                timings["rerank_ms"] = (time.perf_counter() - rerank_started) * 1000
+
+            timings["total_ms"] = (time.perf_counter() - started) * 1000
+            self.last_timings = timings
+            logger.info(
+                f"Retrieved {len(result)} chunks ({len(vector_points)} dense, "
+                f"{len(lexical_hits)} lexical) "
+                + " ".join(f"{name}={value:.1f}" for name, value in timings.items())
+            )
             return result
         except Exception as e:
             logger.error(f"Failed to search: {e}")
@@ -0,0 +1,212 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import math
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Protocol
+
+import numpy as np
+
+from src.config.config import config
+from src.logs.logs import logger
+
+_TERM = re.compile(r"\w+", flags=re.UNICODE)
+
+
+class Scorer(Protocol):
+    def score(self, query: str, texts: List[str]) -> np.ndarray: ...
+
+
+class TermCoverageScorer:
+    """Dependency-free scorer: how much of the query's (IDF weighted) terms and
+    adjacent term pairs each candidate contains.
+
+    IDF is computed over the candidate set itself, so terms that appear in
+    every candidate count for little. Scoring is a single matrix product over
+    all candidates.
+    """
+
+    def __init__(self, bigram_weight: float = 0.5) -> None:
+        self.bigram_weight = bigram_weight
+
+    @staticmethod
+    def _terms(text: str) -> List[str]:
+        return [term.lower() for term in _TERM.findall(text)]
+
+    def score(self, query: str, texts: List[str]) -> np.ndarray:
+        query_terms = self._terms(query)
+        vocabulary = list(dict.fromkeys(query_terms))
+        bigrams = list(dict.fromkeys(zip(query_terms, query_terms[1:])))
+        if not vocabulary or not texts:
+            return np.zeros(len(texts), dtype=np.float32)
+
+        columns = {term: i for i, term in enumerate(vocabulary)}
+        columns.update({bigram: len(vocabulary) + i for i, bigram in enumerate(bigrams)})
+        counts = np.zeros((len(texts), len(columns)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            terms = self._terms(text)
+            for feature in (*terms, *zip(terms, terms[1:])):
+                column = columns.get(feature)
+                if column is not None:
+                    counts[row, column] += 1
+
+        document_frequency = (counts > 0).sum(axis=0)
+        idf = np.log((len(texts) + 1) / (document_frequency + 1)) + 1
+        weights = idf * np.concatenate(
+            [np.ones(len(vocabulary)), np.full(len(bigrams), self.bigram_weight)]
+        )
+        # Sublinear term frequency so one repeated word cannot dominate.
+        matched = np.log1p(counts) @ weights
+        return (matched / weights.sum()).astype(np.float32)
+
+
+class CrossEncoderScorer:
+    """Local cross-encoder from sentence-transformers, loaded on first use.
+
+    sentence-transformers is optional. When it is not installed, or the model
+    fails to load, scoring falls back to ``TermCoverageScorer``.
+    """
+
+    def __init__(self, model_name: str, batch_size: int = 16) -> None:
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self._model: Any = None
+        self._fallback: Optional[TermCoverageScorer] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> Any:
+        with self._lock:
+            if self._model is None and self._fallback is None:
+                try:
+                    from sentence_transformers import CrossEncoder
+
+                    self._model = CrossEncoder(self.model_name, device="cpu")
+                    logger.info(f"Loaded reranking model {self.model_name}")
+                except Exception as e:
+                    logger.error(f"Could not load reranking model {self.model_name}: {str(e)}")
+                    self._fallback = TermCoverageScorer()
+        return self._model
+
+    def score(self, query: str, texts: List[str]) -> np.ndarray:
+        model = self._load()
+        if model is None:
+            assert self._fallback is not None
+            return self._fallback.score(query, texts)
+        scores = model.predict(
+            [(query, text) for text in texts], batch_size=self.batch_size, convert_to_numpy=True
+        )
+        return np.asarray(scores, dtype=np.float32)
+
+
+class Reranker:
+    """Rescores retrieved candidates on CPU and keeps the best ``top_k``.
+
+    Scoring runs on a dedicated pool of ``workers`` threads under a latency
+    budget. When the budget runs out or the scorer fails, the candidates are
+    returned in their retrieval order instead, so a slow rerank never delays
+    a reply by more than ``budget_ms``. A call that ran over budget keeps its
+    thread until it finishes, so while every thread is still busy new
+    requests skip reranking rather than queue behind them. The pool is
+    separate from the default executor, which other ``to_thread`` users
+    such as the PDF extractor and the SQLite indexes rely on.
+    """
+
+    def __init__(
+        self,
+        scorer: Scorer,
+        budget_ms: int = config.RERANK_BUDGET_MS,
+        workers: int = config.RERANK_WORKERS,
+    ) -> None:
+        self.scorer = scorer
+        self.budget_ms = budget_ms
+        self.workers = max(1, workers)
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="rerank")
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self.requests = 0
+        self.fallbacks = 0
+        self.skipped = 0
+        self.total_ms = 0.0
+
+    def _release(self, _: Any) -> None:
+        with self._in_flight_lock:
+            self._in_flight -= 1
+
+    async def rerank(
+        self, query: str, results: List[Dict[str, Any]], top_k: int
+    ) -> List[Dict[str, Any]]:
+        if len(results) <= 1:
+            return results[:top_k]
+        self.requests += 1
+        with self._in_flight_lock:
+            saturated = self._in_flight >= self.workers
+            if not saturated:
+                self._in_flight += 1
+        if saturated:
+            self.skipped += 1
+            logger.warning("All rerank workers are busy, keeping retrieval order")
+            return results[:top_k]
+
+        started = time.perf_counter()
+        texts = [result.get("text", "") for result in results]
+        try:
+            future = self._executor.submit(self.scorer.score, query, texts)
+        except RuntimeError as e:
+            self._release(None)
+            self.fallbacks += 1
+            logger.error(f"Rerank unavailable, keeping retrieval order: {str(e)}")
+            return results[:top_k]
+        # Released when the thread is done, not when the caller stops waiting.
+        future.add_done_callback(self._release)
+        try:
+            scores = await asyncio.wait_for(
+                asyncio.wrap_future(future), timeout=self.budget_ms / 1000
+            )
+        except asyncio.TimeoutError:
+            self.fallbacks += 1
+            logger.warning(f"Rerank exceeded {self.budget_ms}ms, keeping retrieval order")
+            return results[:top_k]
+        except Exception as e:
+            self.fallbacks += 1
+            logger.error(f"Rerank failed, keeping retrieval order: {str(e)}")
+            return results[:top_k]
+        finally:
+            self.total_ms += (time.perf_counter() - started) * 1000
+
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        reranked = []
+        for i in order:
+            score = float(scores[i])
+            if math.isnan(score):
+                score = 0.0
+            reranked.append(
+                {**results[i], "retrieval_score": results[i].get("score"), "score": score}
+            )
+        return reranked
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "fallbacks": self.fallbacks,
+            "skipped": self.skipped,
+            "busy_workers": self._in_flight,
+            "avg_ms": self.total_ms / self.requests if self.requests else 0,
+        }
+
+
+def build_reranker() -> Optional[Reranker]:
+    if not config.RERANK_ENABLED:
+        return None
+    scorer: Scorer = (
+        CrossEncoderScorer(config.RERANK_MODEL, batch_size=config.RERANK_BATCH_SIZE)
+        if config.RERANK_MODEL
+        else TermCoverageScorer()
+    )
+    return Reranker(scorer)
+
+
+reranker = build_reranker()
@@ -2,9 +2,13 @@ import asyncio
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional
 
+from src.config.config import config
 from src.core.tasks.realtime_intelligence import RealTimeIntelligenceHandler
+from src.core.tasks.sharding import WorkerLeaseStore, WorkerRouter
+from src.core.tasks.tenant_runtime import TenantRuntime
 from src.db.mongodb import MongoDBManager
 from src.logs.logs import logger
+from src.logs.tracing import tracer
 
 
 class BackgroundTaskManager:
@@ -12,10 +16,37 @@ class BackgroundTaskManager:
         self.active_tasks: Dict[str, asyncio.Task] = {}
         self.task_handlers: Dict[str, RealTimeIntelligenceHandler] = {}
         self.mongo_manager = MongoDBManager()
+        self._runtime: Optional[TenantRuntime] = None
+        # Organizations being moved to another worker; their desired state stays "running".
+        self._handoffs: set = set()
+        # In control mode this process runs no listeners and forwards every call
+        # to the worker process that owns the organization.
+        self.router: Optional[WorkerRouter] = (
+            WorkerRouter(WorkerLeaseStore(self.mongo_manager))
+            if config.WORKER_MODE == "control"
+            else None
+        )
+
+    @property
+    def runtime(self) -> TenantRuntime:
+        """Shared clients and queues of the listeners, built on first use so a
+        control process, which runs no listeners, never creates them."""
+        if self._runtime is None:
+            self._runtime = TenantRuntime()
+        return self._runtime
+
+    async def memory_report(self) -> Dict[str, Any]:
+        if self._runtime is None:
+            return {"tenants": 0}
+        return await self._runtime.memory_report()
 
     async def start_intelligence_task(
         self, organization_id: str, group_ids: Optional[list] = None
     ) -> Dict[str, Any]:
+        if self.router:
+            return await self.router.call_owner(
+                "POST", organization_id, "start", {"group_ids": group_ids}
+            )
         try:
             if organization_id in self.active_tasks:
                 return {
@@ -24,9 +55,12 @@ class BackgroundTaskManager:
                     "task_id": organization_id,
                 }
 
-            handler = RealTimeIntelligenceHandler(organization_id=organization_id)
+            handler = RealTimeIntelligenceHandler(
+                organization_id=organization_id, runtime=self.runtime
+            )
 
             if not await handler.setup_client():
+                self.runtime.unregister(organization_id)
                 return {"success": False, "message": "Failed to setup Telegram client"}
 
             if group_ids:
@@ -50,6 +84,13 @@ class BackgroundTaskManager:
                 "last_activity": datetime.now(timezone.utc),
             }
 
+            await self.mongo_manager.update_one(
+                "background_tasks",
+                {"organization_id": organization_id},
+                task_info,
+                upsert=True,
+            )
+
             logger.info(f"Started background intelligence task for organization {organization_id}")
 
             return {
@@ -64,7 +105,13 @@ class BackgroundTaskManager:
             logger.error(f"Error starting background task: {str(e)}")
             return {"success": False, "message": f"Failed to start background task: {str(e)}"}
 
-    async def stop_intelligence_task(self, organization_id: str) -> Dict[str, Any]:
+    async def stop_intelligence_task(
+        self, organization_id: str, handoff: bool = False
+    ) -> Dict[str, Any]:
+        """Stop the organization's listener. With ``handoff`` it is stopped only
+        here, to be started by another worker, and stays marked as running."""
+        if self.router:
+            return await self.router.call_owner("POST", organization_id, "stop")
         try:
             if organization_id not in self.active_tasks:
                 return {
@@ -72,6 +119,14 @@ class BackgroundTaskManager:
                     "message": f"No active background task found for organization {organization_id}",
                 }
 
+            if handoff:
+                self._handoffs.add(organization_id)
+            else:
+                await self.mongo_manager.update_one(
+                    "background_tasks",
+                    {"organization_id": organization_id},
+                    {"status": "stopped", "stopped_at": datetime.now(timezone.utc)},
+                )
             task = self.active_tasks[organization_id]
             task.cancel()
 
@@ -105,13 +160,18 @@ class BackgroundTaskManager:
         except Exception as e:
             logger.error(f"Error in intelligence task for organization {organization_id}: {str(e)}")
         finally:
-            await self.mongo_manager.update_one(
-                "background_tasks",
-                {"organization_id": organization_id},
-                {"status": "stopped", "stopped_at": datetime.now(timezone.utc)},
-            )
+            if organization_id in self._handoffs:
+                self._handoffs.discard(organization_id)
+            else:
+                await self.mongo_manager.update_one(
+                    "background_tasks",
+                    {"organization_id": organization_id},
+                    {"status": "stopped", "stopped_at": datetime.now(timezone.utc)},
+                )
 
     async def get_active_tasks(self) -> Dict[str, Any]:
+        if self.router:
+            return await self.router.list_tasks()
         active_tasks = {}
         for org_id, _ in self.active_tasks.items():
             handler = self.task_handlers.get(org_id)
@@ -125,6 +185,8 @@ class BackgroundTaskManager:
         return {"success": True, "active_tasks": active_tasks, "total_active": len(active_tasks)}
 
     async def get_task_status(self, organization_id: str) -> Dict[str, Any]:
+        if self.router:
+            return await self.router.call_owner("GET", organization_id, "status")
         try:
             if organization_id in self.active_tasks:
                 handler = self.task_handlers.get(organization_id)
@@ -134,6 +196,11 @@ class BackgroundTaskManager:
                     "status": "running",
                     "allowed_groups": handler.get_allowed_groups() if handler else [],
                     "is_running": handler.is_running if handler else False,
+                    "entity_cache": handler.entity_cache.stats() if handler else None,
+                    "reply_queues": handler.dispatcher.stats() if handler else None,
+                    "debounce": handler.debouncer.stats() if handler else None,
+                    "message_writes": handler.message_writer.stats() if handler else None,
+                    "memory_bytes": await self.runtime.memory_for(organization_id),
                 }
             else:
                 return {
@@ -147,17 +214,40 @@ class BackgroundTaskManager:
             logger.error(f"Error getting task status: {str(e)}")
             return {"success": False, "message": f"Failed to get task status: {str(e)}"}
 
+    async def get_recent_traces(self, organization_id: str, limit: int = 100) -> Dict[str, Any]:
+        if self.router:
+            return await self.router.call_owner("GET", organization_id, f"traces?limit={limit}")
+        return {
+            "success": True,
+            "spans": tracer.recent_spans(limit, organization_id=organization_id),
+        }
+
     async def stop_all_tasks(self) -> Dict[str, Any]:
         results = []
-        for org_id in list(self.active_tasks.keys()):
+        organization_ids = (await self.get_active_tasks())["active_tasks"]
+        for org_id in list(organization_ids):
             result = await self.stop_intelligence_task(org_id)
             results.append(result)
 
+        if self._runtime:
+            await self._runtime.message_writer.flush()
         return {
             "success": True,
             "message": f"Stopped {len(results)} background tasks",
             "results": results,
         }
 
+    async def shutdown(self, handoff: bool = False) -> None:
+        """Stop the listeners of this process. With ``handoff``, as a shard
+        worker, they stay marked running so the remaining workers take them
+        over; otherwise they are marked stopped."""
+        if self.router:
+            await self.router.close()
+            return
+        for org_id in list(self.active_tasks):
+            await self.stop_intelligence_task(org_id, handoff=handoff)
+        if self._runtime:
+            await self._runtime.close()
+
 
 background_task_manager = BackgroundTaskManager()
@@ -0,0 +1,187 @@
+import asyncio
+from collections import deque
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, Hashable, List, Optional, Set, Tuple
+
+from src.config.config import config
+from src.logs.logs import logger
+from src.logs.tracing import LatencyHistogram
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "coalesce")
+
+
+class ChatWorkDispatcher:
+    """Per-chat FIFO queues drained by a fixed pool of workers.
+
+    ``submit`` only enqueues, so the Telegram event callback returns at once.
+    A chat is handed to at most one worker at a time, which keeps replies in
+    order within the chat, and a worker takes one item per turn before the
+    chat goes to the back of the ready queue, so a busy group cannot starve
+    quieter chats. When a chat already has ``max_queue_depth`` items waiting,
+    ``overflow_policy`` decides what happens to the new one:
+
+    - ``drop_oldest``: the oldest waiting item is discarded.
+    - ``drop_newest``: the new item is discarded.
+    - ``coalesce``: the new item is merged into the newest waiting one with
+      ``coalesce(waiting, new)``, which by default keeps just the new item.
+
+    Items discarded by the drop policies are passed to ``on_drop(chat_id,
+    item)``, so the caller can still record what will not be processed.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Any], Awaitable[Any]],
+        workers: int = config.TG_REPLY_WORKERS,
+        max_queue_depth: int = config.TG_CHAT_QUEUE_DEPTH,
+        overflow_policy: str = config.TG_CHAT_QUEUE_POLICY,
+        coalesce: Optional[Callable[[Any, Any], Any]] = None,
+        on_drop: Optional[Callable[[Hashable, Any], Any]] = None,
+    ) -> None:
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown overflow policy '{overflow_policy}', expected one of {OVERFLOW_POLICIES}"
+            )
+        self.handler = handler
+        self.workers = max(1, workers)
+        self.max_queue_depth = max(1, max_queue_depth)
+        self.overflow_policy = overflow_policy
+        self.coalesce = coalesce or (lambda waiting, new: new)
+        self.on_drop = on_drop
+        self._queues: Dict[Hashable, Deque[Tuple[float, Any]]] = {}
+        self._scheduled: Set[Hashable] = set()
+        self._ready: "asyncio.Queue[Hashable]" = asyncio.Queue()
+        self._tasks: List[asyncio.Task] = []
+        self._busy = 0
+        self.wait_times = LatencyHistogram(config.TRACING_WINDOW)
+        self.counters = {
+            "submitted": 0,
+            "processed": 0,
+            "failed": 0,
+            "dropped": 0,
+            "coalesced": 0,
+        }
+        self.max_depth_seen = 0
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._tasks = [
+            asyncio.create_task(self._worker(), name=f"chat-dispatch-{i}")
+            for i in range(self.workers)
+        ]
+        logger.info(f"Started {self.workers} chat dispatch workers")
+
+    def submit(self, chat_id: Hashable, item: Any) -> bool:
+        """Queue ``item`` for ``chat_id``. Returns False if it was dropped."""
+        self.start()
+        self.counters["submitted"] += 1
+        queue = self._queues.setdefault(chat_id, deque())
+
+        if len(queue) >= self.max_queue_depth:
+            if self.overflow_policy == "drop_newest":
+                self.counters["dropped"] += 1
+                logger.warning(f"Chat {chat_id} queue full, dropping new message")
+                self._dropped(chat_id, item)
+                return False
+            if self.overflow_policy == "coalesce":
+                enqueued_at, waiting = queue[-1]
+                queue[-1] = (enqueued_at, self.coalesce(waiting, item))
+                self.counters["coalesced"] += 1
+                return True
+            _, oldest = queue.popleft()
+            self.counters["dropped"] += 1
+            logger.warning(f"Chat {chat_id} queue full, dropping oldest waiting message")
+            self._dropped(chat_id, oldest)
+
+        queue.append((time.perf_counter(), item))
+        self.max_depth_seen = max(self.max_depth_seen, len(queue))
+        if chat_id not in self._scheduled:
+            self._scheduled.add(chat_id)
+            self._ready.put_nowait(chat_id)
+        return True
+
+    def _dropped(self, chat_id: Hashable, item: Any) -> None:
+        if self.on_drop is None:
+            return
+        try:
+            self.on_drop(chat_id, item)
+        except Exception as e:
+            logger.error(f"Error handling dropped work for chat {chat_id}: {str(e)}")
+
+    async def _worker(self) -> None:
+        while True:
+            chat_id = await self._ready.get()
+            queue = self._queues[chat_id]
+            enqueued_at, item = queue.popleft()
+            self.wait_times.record((time.perf_counter() - enqueued_at) * 1000)
+            self._busy += 1
+            try:
+                await self.handler(item)
+                self.counters["processed"] += 1
+            except Exception as e:
+                self.counters["failed"] += 1
+                logger.error(f"Error processing queued work for chat {chat_id}: {str(e)}")
+            finally:
+                self._busy -= 1
+                if queue:
+                    self._ready.put_nowait(chat_id)
+                else:
+                    self._scheduled.discard(chat_id)
+                    del self._queues[chat_id]
+                self._ready.task_done()
+
+    async def drain(
+        self, match: Callable[[Hashable], bool] = lambda chat_id: True, timeout: float = 30
+    ) -> bool:
+        """Wait until no chat matching ``match`` has queued or running work."""
+        deadline = time.perf_counter() + timeout
+        while any(match(chat_id) for chat_id in self._queues):
+            if time.perf_counter() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def stop(self, drain_timeout: Optional[float] = 30) -> None:
+        """Finish queued work (waiting at most ``drain_timeout`` seconds), then stop the workers."""
+        if self.running and drain_timeout:
+            try:
+                await asyncio.wait_for(self._ready.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Chat dispatch queues not drained after {drain_timeout}s, "
+                    f"discarding {self.queued} waiting messages"
+                )
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    @property
+    def queued(self) -> int:
+        return sum(len(queue) for queue in self._queues.values())
+
+    def depth(self, chat_id: Hashable) -> int:
+        queue = self._queues.get(chat_id)
+        return len(queue) if queue else 0
+
+    def stats(self, top: int = 5) -> Dict[str, Any]:
+        deepest = sorted(self._queues.items(), key=lambda kv: len(kv[1]), reverse=True)[:top]
+        return {
+            "workers": self.workers,
+            "busy_workers": self._busy,
+            "policy": self.overflow_policy,
+            "max_queue_depth": self.max_queue_depth,
+            "queued": self.queued,
+            "chats_waiting": len(self._queues),
+            "max_depth_seen": self.max_depth_seen,
+            "deepest_chats": [
+                {"chat_id": chat_id, "depth": len(queue)} for chat_id, queue in deepest
+            ],
+            "queue_wait": self.wait_times.summary(),
+            **self.counters,
+        }
@@ -0,0 +1,180 @@
+import asyncio
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from src.config.config import config
+from src.core.tasks.entity_cache import TTLCache
+from src.db.mongodb import MongoDBManager
+from src.llm import LLMManager
+from src.logs.logs import logger
+
+HistoryLoader = Callable[[int, int], Awaitable[List[Dict[str, Any]]]]
+
+
+@dataclass
+class ConversationState:
+    summary: str = ""
+    turns: List[Dict[str, Any]] = field(default_factory=list)
+    summarized_turns: int = 0
+
+
+class ConversationSummaryStore:
+    """Rolling summary plus the last few verbatim turns of every chat.
+
+    Each exchange (the incoming message and the reply) is appended in the
+    background. Once ``fold_batch`` turns have piled up beyond the
+    ``recent_turns`` kept verbatim, the oldest ones are folded into the summary
+    with a single LLM call, so the context handed to the prompt stays the same
+    size however long the chat runs. State is persisted to the
+    ``chat_summaries`` collection and cached in memory for at most
+    ``max_chats`` recently active chats, each for ``ttl`` seconds after its
+    last update; an evicted chat is reloaded from Mongo. A chat without state
+    is seeded once from its stored messages. Turns carry the message id, so a
+    message that was both seeded and then added by ``update`` counts once.
+    """
+
+    COLLECTION = "chat_summaries"
+
+    def __init__(
+        self,
+        organization_id: Optional[str],
+        llm_manager: LLMManager,
+        history_loader: HistoryLoader,
+        mongo_manager: Optional[MongoDBManager] = None,
+        recent_turns: int = config.SUMMARY_RECENT_TURNS,
+        fold_batch: int = config.SUMMARY_FOLD_BATCH,
+        ttl: float = config.SUMMARY_CACHE_TTL,
+        max_chats: int = config.SUMMARY_CACHE_MAX_CHATS,
+    ) -> None:
+        self.organization_id = organization_id
+        self.llm_manager = llm_manager
+        self.history_loader = history_loader
+        self.mongo_manager = mongo_manager or MongoDBManager()
+        self.recent_turns = max(1, recent_turns)
+        self.fold_batch = max(1, fold_batch)
+        self._states: TTLCache[int, ConversationState] = TTLCache(ttl, max_chats)
+        # Only chats with an update in flight hold a lock.
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._lock_users: Dict[int, int] = {}
+        # States of chats with an update in flight, which the cache must not
+        # evict and reload under it.
+        self._active: Dict[int, ConversationState] = {}
+        self._pending: Set[asyncio.Task] = set()
+
+    @staticmethod
+    def make_turn(
+        sender_name: str,
+        text: str,
+        date: Optional[datetime] = None,
+        message_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
+        return {"sender_name": sender_name, "text": text, "date": date, "message_id": message_id}
+
+    def _cached(self, chat_id: int) -> Optional[ConversationState]:
+        return self._active.get(chat_id) or self._states.get(chat_id)
+
+    async def get(self, chat_id: int) -> ConversationState:
+        state = self._cached(chat_id)
+        if state is not None:
+            return state
+
+        document = await self.mongo_manager.find_one(
+            self.COLLECTION, {"organization_id": self.organization_id, "chat_id": chat_id}
+        )
+        if document:
+            state = ConversationState(
+                summary=document.get("summary", ""),
+                turns=document.get("turns", []),
+                summarized_turns=document.get("summarized_turns", 0),
+            )
+        else:
+            history = await self.history_loader(chat_id, self.recent_turns)
+            state = ConversationState(
+                turns=[
+                    self.make_turn(
+                        m.get("sender_name", "Unknown"),
+                        m["text"],
+                        m.get("date"),
+                        m.get("message_id"),
+                    )
+                    for m in history
+                    if m.get("text")
+                ]
+            )
+        # Another caller may have loaded the chat while this one waited.
+        existing = self._cached(chat_id)
+        if existing is not None:
+            return existing
+        self._states.put(chat_id, state)
+        return state
+
+    async def recent_context(self, chat_id: int) -> List[Dict[str, Any]]:
+        """History in the shape the prompt builder expects: the summary, then
+        the verbatim turns, oldest first."""
+        state = await self.get(chat_id)
+        context = []
+        if state.summary:
+            context.append({"text": f"Summary of the earlier conversation: {state.summary}"})
+        context.extend(
+            {"text": f"{turn.get('sender_name', 'Unknown')}: {turn['text']}"}
+            for turn in state.turns
+        )
+        return context
+
+    def schedule_update(self, chat_id: int, turns: List[Dict[str, Any]]) -> None:
+        task = asyncio.create_task(self.update(chat_id, turns))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def update(self, chat_id: int, turns: List[Dict[str, Any]]) -> None:
+        lock = self._locks.setdefault(chat_id, asyncio.Lock())
+        self._lock_users[chat_id] = self._lock_users.get(chat_id, 0) + 1
+        try:
+            # New turns are visible to the next prompt straight away; only the
+            # summarizing and persisting wait for earlier updates of the chat.
+            state = await self.get(chat_id)
+            self._active[chat_id] = state
+            # Seeding reads the write buffer, so it may already hold these messages.
+            seen = {turn.get("message_id") for turn in state.turns} - {None}
+            state.turns.extend(turn for turn in turns if turn.get("message_id") not in seen)
+            self._states.put(chat_id, state)
+
+            async with lock:
+                overflow = len(state.turns) - self.recent_turns
+                if overflow >= self.fold_batch:
+                    folded = state.turns[:overflow]
+                    summary = await self.llm_manager.summarize_conversation(state.summary, folded)
+                    # Keep the turns if summarizing failed; the next update retries.
+                    if summary:
+                        state.summary = summary
+                        state.turns = state.turns[len(folded) :]
+                        state.summarized_turns += len(folded)
+
+                await self.mongo_manager.update_one(
+                    self.COLLECTION,
+                    {"organization_id": self.organization_id, "chat_id": chat_id},
+                    {
+                        "organization_id": self.organization_id,
+                        "chat_id": chat_id,
+                        "summary": state.summary,
+                        "turns": state.turns,
+                        "summarized_turns": state.summarized_turns,
+                        "updated_at": datetime.now(timezone.utc),
+                    },
+                    upsert=True,
+                )
+        except Exception as e:
+            logger.error(f"Failed to update conversation summary for chat {chat_id}: {str(e)}")
+        finally:
+            self._lock_users[chat_id] -= 1
+            if not self._lock_users[chat_id]:
+                del self._lock_users[chat_id]
+                del self._locks[chat_id]
+                state = self._active.pop(chat_id, None)
+                if state is not None:
+                    self._states.put(chat_id, state)
+
+    async def flush(self) -> None:
+        if self._pending:
+            await asyncio.gather(*self._pending, return_exceptions=True)
@@ -18,6 +18,7 @@ import aiosmtplib
 
 from src.config.config import config
 from src.core import SemanticEmbeddingService, SemanticQdrantService, SemanticSearchRepo
+from src.core.rag.answer_cache import answer_cache
 from src.db.mongodb import MongoDBManager
 from src.logs.logs import logger
 
@@ -163,7 +164,9 @@ class EmailTaskManager:
             url=config.QDRANT_API_URL,
             api_key=config.QDRANT_API_KEY,
         )
-        self.rag_repo = SemanticSearchRepo(embedding_service, qdrant_service)
+        self.rag_repo = SemanticSearchRepo(
+            embedding_service, qdrant_service, kb_version=answer_cache.kb_version
+        )
 
     async def start_email_task(
         self,
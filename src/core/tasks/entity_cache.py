@@ -0,0 +1,144 @@
+from collections import OrderedDict
+import time
+from typing import Any, Dict, Generic, Optional, Tuple, TypeVar
+
+from telethon import utils
+from telethon.tl import types
+
+from src.config.config import config
+from src.logs.logs import logger
+
+K = TypeVar("K")
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """LRU mapping whose entries also expire ``ttl`` seconds after being stored."""
+
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[K, Tuple[float, V]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: K) -> Optional[V]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: K, value: V) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: K) -> bool:
+        return self._entries.pop(key, None) is not None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class TelegramEntityCache:
+    """Caches the account's own id plus sender and chat entities by id.
+
+    Telethon events usually carry the sender and chat entities already, so
+    those are stored before anything is fetched. Lookups go to Telegram only
+    for entities the event did not include and that are not cached yet.
+    ``handle_update`` drops entries when Telegram reports that a user or chat
+    changed.
+    """
+
+    def __init__(
+        self,
+        ttl: float = config.TG_ENTITY_CACHE_TTL,
+        max_entries: int = config.TG_ENTITY_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.self_id: Optional[int] = None
+        self.users: TTLCache[int, Any] = TTLCache(ttl, max_entries)
+        self.chats: TTLCache[int, Any] = TTLCache(ttl, max_entries)
+        self.self_id_lookups = 0
+
+    async def load_self_id(self, client: Any) -> Optional[int]:
+        if self.self_id is None:
+            me = await client.get_me(input_peer=True)
+            self.self_id_lookups += 1
+            self.self_id = getattr(me, "user_id", None) or getattr(me, "id", None)
+            logger.info(f"Cached own user id {self.self_id}")
+        return self.self_id
+
+    async def get_sender(self, client: Any, message: Any) -> Any:
+        sender_id = getattr(message, "sender_id", None)
+        if not sender_id:
+            return None
+        carried = getattr(message, "sender", None)
+        if carried is not None:
+            self.users.put(sender_id, carried)
+            return carried
+        sender = self.users.get(sender_id)
+        if sender is None:
+            sender = await client.get_entity(sender_id)
+            self.users.put(sender_id, sender)
+        return sender
+
+    async def get_chat(self, message: Any) -> Any:
+        chat_id = getattr(message, "chat_id", None)
+        carried = getattr(message, "chat", None)
+        if carried is not None:
+            if chat_id is not None:
+                self.chats.put(chat_id, carried)
+            return carried
+        chat = self.chats.get(chat_id) if chat_id is not None else None
+        if chat is None:
+            chat = await message.get_chat()
+            if chat_id is not None and chat is not None:
+                self.chats.put(chat_id, chat)
+        return chat
+
+    def invalidate_user(self, user_id: int) -> None:
+        if self.users.invalidate(user_id):
+            logger.debug(f"Dropped cached user {user_id}")
+
+    def invalidate_chat(self, chat_id: int) -> None:
+        if self.chats.invalidate(chat_id):
+            logger.debug(f"Dropped cached chat {chat_id}")
+
+    async def handle_update(self, update: Any) -> None:
+        if isinstance(update, (types.UpdateUserName, types.UpdateUser)):
+            self.invalidate_user(update.user_id)
+        elif isinstance(update, types.UpdateChat):
+            self.invalidate_chat(utils.get_peer_id(types.PeerChat(update.chat_id)))
+        elif isinstance(update, types.UpdateChannel):
+            self.invalidate_chat(utils.get_peer_id(types.PeerChannel(update.channel_id)))
+
+    async def handle_chat_action(self, event: Any) -> None:
+        if getattr(event, "chat_id", None) is not None:
+            self.invalidate_chat(event.chat_id)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "self_id_cached": self.self_id is not None,
+            "self_id_lookups": self.self_id_lookups,
+            "users": self.users.stats(),
+            "chats": self.chats.stats(),
+        }
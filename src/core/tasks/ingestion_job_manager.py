@@ -0,0 +1,260 @@
+import asyncio
+from collections import OrderedDict, deque
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set
+import uuid
+
+from src.config.config import config
+from src.core.rag.ingestion import IngestionProgress, ProgressCallback
+from src.db.mongodb import MongoDBManager
+from src.logs.logs import logger
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+
+JobRunner = Callable[[Dict[str, Any], ProgressCallback], Awaitable[IngestionProgress]]
+
+
+class IngestionJobManager:
+    """Runs document ingestion jobs on a bounded pool of workers.
+
+    Job state lives in the ``ingestion_jobs`` collection, so status survives
+    restarts and jobs that were queued or running when the process stopped are
+    picked up again by ``start``. Organizations are served round-robin and
+    each may have at most ``max_jobs_per_org`` jobs running at once, so a bulk
+    upload from one tenant cannot starve the others.
+
+    Several processes may share the collection. A job is claimed with an
+    atomic find_one_and_update before it runs, and its owner refreshes
+    ``heartbeat_at`` while it works; a running job whose heartbeat is older
+    than ``lease_seconds`` is taken over by the next process that looks.
+    """
+
+    COLLECTION = "ingestion_jobs"
+
+    def __init__(
+        self,
+        runner: JobRunner,
+        max_workers: int = config.INGEST_JOB_WORKERS,
+        max_jobs_per_org: int = config.INGEST_JOBS_PER_ORG,
+        mongo_manager: Optional[MongoDBManager] = None,
+        lease_seconds: int = config.INGEST_JOB_LEASE_SECONDS,
+    ) -> None:
+        self.runner = runner
+        self.lease_seconds = max(1, lease_seconds)
+        self.owner_id = uuid.uuid4().hex
+        self.max_workers = max(1, max_workers)
+        self.max_jobs_per_org = max(1, max_jobs_per_org)
+        self.mongo_manager = mongo_manager or MongoDBManager()
+        self._pending: "OrderedDict[str, Deque[str]]" = OrderedDict()
+        self._running: Dict[str, int] = {}
+        self._condition = asyncio.Condition()
+        self._workers: List[asyncio.Task] = []
+        self._known: Set[str] = set()
+
+    @property
+    def is_running(self) -> bool:
+        return bool(self._workers)
+
+    def _claimable(self) -> Dict[str, Any]:
+        stale = datetime.now(timezone.utc) - timedelta(seconds=self.lease_seconds)
+        return {
+            "$or": [
+                {"status": JOB_QUEUED},
+                {"status": JOB_RUNNING, "heartbeat_at": None},
+                {"status": JOB_RUNNING, "heartbeat_at": {"$lt": stale}},
+            ]
+        }
+
+    async def _enqueue_orphans(self) -> int:
+        """Queue jobs that are waiting in Mongo or whose owner stopped heartbeating."""
+        jobs = await self.mongo_manager.find_many(
+            self.COLLECTION, self._claimable(), sort_fields=[("created_at", 1)]
+        )
+        added = 0
+        async with self._condition:
+            for job in jobs:
+                if job["job_id"] not in self._known:
+                    self._enqueue(job["organization_id"], job["job_id"])
+                    added += 1
+            self._condition.notify_all()
+        return added
+
+    async def _recover(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds)
+            try:
+                await self._enqueue_orphans()
+            except Exception as e:
+                logger.error(f"Error looking for orphaned ingestion jobs: {str(e)}")
+
+    async def start(self) -> None:
+        if self._workers:
+            return
+        resumed = await self._enqueue_orphans()
+        if resumed:
+            logger.info(f"Resuming {resumed} ingestion job(s)")
+
+        self._workers = [
+            asyncio.create_task(self._worker(worker_id)) for worker_id in range(self.max_workers)
+        ]
+        self._workers.append(asyncio.create_task(self._recover()))
+        logger.info(f"Started {self.max_workers} ingestion workers")
+
+    async def stop(self) -> None:
+        # In-flight jobs stay "running" in Mongo and are taken over once their
+        # heartbeat goes stale.
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._pending.clear()
+        self._running.clear()
+        self._known.clear()
+
+    async def submit(self, organization_id: str, **params: Any) -> Dict[str, Any]:
+        job = {
+            "job_id": str(uuid.uuid4()),
+            "organization_id": organization_id,
+            "status": JOB_QUEUED,
+            "batches_committed": 0,
+            "chunks_committed": 0,
+            "error": None,
+            "created_at": datetime.now(timezone.utc),
+            "started_at": None,
+            "finished_at": None,
+            **params,
+        }
+        if not await self.mongo_manager.insert_one(self.COLLECTION, dict(job)):
+            raise RuntimeError("Failed to persist ingestion job")
+
+        async with self._condition:
+            self._enqueue(organization_id, job["job_id"])
+            self._condition.notify()
+        logger.info(f"Queued ingestion job {job['job_id']} for organization {organization_id}")
+        return job
+
+    async def get_job(self, organization_id: str, job_id: str) -> Optional[Dict[str, Any]]:
+        job = await self.mongo_manager.find_one(
+            self.COLLECTION, {"job_id": job_id, "organization_id": organization_id}
+        )
+        if job:
+            job.pop("_id", None)
+        return job
+
+    async def list_jobs(self, organization_id: str, limit: int = 50) -> List[Dict[str, Any]]:
+        jobs = await self.mongo_manager.find_many(
+            self.COLLECTION,
+            {"organization_id": organization_id},
+            sort_fields=[("created_at", -1)],
+            limit=limit,
+        )
+        for job in jobs:
+            job.pop("_id", None)
+        return jobs
+
+    def queue_depth(self, organization_id: Optional[str] = None) -> int:
+        if organization_id is not None:
+            return len(self._pending.get(organization_id, ()))
+        return sum(len(queue) for queue in self._pending.values())
+
+    def _enqueue(self, organization_id: str, job_id: str) -> None:
+        self._known.add(job_id)
+        self._pending.setdefault(organization_id, deque()).append(job_id)
+
+    def _next_job(self) -> Optional[tuple[str, str]]:
+        for organization_id in list(self._pending):
+            if self._running.get(organization_id, 0) >= self.max_jobs_per_org:
+                continue
+            queue = self._pending[organization_id]
+            job_id = queue.popleft()
+            # Move the organization to the back so the others get the next slots.
+            if queue:
+                self._pending.move_to_end(organization_id)
+            else:
+                del self._pending[organization_id]
+            self._running[organization_id] = self._running.get(organization_id, 0) + 1
+            return organization_id, job_id
+        return None
+
+    async def _worker(self, worker_id: int) -> None:
+        while True:
+            async with self._condition:
+                while (item := self._next_job()) is None:
+                    await self._condition.wait()
+            organization_id, job_id = item
+            try:
+                await self._run_job(job_id)
+            finally:
+                async with self._condition:
+                    self._known.discard(job_id)
+                    self._running[organization_id] -= 1
+                    if not self._running[organization_id]:
+                        del self._running[organization_id]
+                    self._condition.notify_all()
+
+    async def _update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        # Scoped to the owner, so a process that lost its claim cannot
+        # overwrite the state written by the one that took the job over.
+        await self.mongo_manager.update_one(
+            self.COLLECTION, {"job_id": job_id, "owner": self.owner_id}, fields
+        )
+
+    async def _claim(self, job_id: str) -> Optional[Dict[str, Any]]:
+        now = datetime.now(timezone.utc)
+        return await self.mongo_manager.find_one_and_update(
+            self.COLLECTION,
+            {"job_id": job_id, **self._claimable()},
+            {"status": JOB_RUNNING, "owner": self.owner_id, "started_at": now, "heartbeat_at": now},
+        )
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await self._update(job_id, {"heartbeat_at": datetime.now(timezone.utc)})
+
+    async def _run_job(self, job_id: str) -> None:
+        job = await self._claim(job_id)
+        if not job:
+            logger.info(f"Ingestion job {job_id} is finished or owned by another process")
+            return
+
+        async def on_progress(progress: IngestionProgress) -> None:
+            await self._update(
+                job_id,
+                {
+                    "batches_committed": progress.batches_committed,
+                    "chunks_committed": progress.chunks_committed,
+                    "heartbeat_at": datetime.now(timezone.utc),
+                },
+            )
+
+        heartbeat = asyncio.create_task(self._heartbeat(job_id))
+        try:
+            progress = await self.runner(job, on_progress)
+            await self._update(
+                job_id,
+                {
+                    "status": JOB_COMPLETED,
+                    "batches_committed": progress.batches_committed,
+                    "chunks_committed": progress.chunks_committed,
+                    "finished_at": datetime.now(timezone.utc),
+                },
+            )
+            logger.info(f"Ingestion job {job_id} completed ({progress.chunks_committed} chunks)")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Ingestion job {job_id} failed: {str(e)}", exc_info=True)
+            await self._update(
+                job_id,
+                {
+                    "status": JOB_FAILED,
+                    "error": str(e),
+                    "finished_at": datetime.now(timezone.utc),
+                },
+            )
+        finally:
+            heartbeat.cancel()
@@ -1,38 +1,44 @@
 import asyncio
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from src.llm import LLMManager
+from src.llm.context_builder import ContextBuilder, PromptContext
+from src.llm.llm_manager import INTELLIGENT_RESPONSE_PROMPT_BUILDER
 from src.logs.logs import logger
 
 
 class IntelligentResponseHandler:
     def __init__(self):
         self.llm_manager = LLMManager()
+        self.context_builder = ContextBuilder(template=INTELLIGENT_RESPONSE_PROMPT_BUILDER)
 
-    async def handle_message(
+    def _build_prompt(
         self,
         message: str,
         recent_messages: Optional[List[Dict[str, Any]]] = None,
         current_message: Optional[Dict[str, Any]] = None,
         search_results: Optional[List[Dict[str, Any]]] = None,
-    ) -> List[str]:
-        recent_messages_string = ""
-        current_message_string = ""
-        if recent_messages:
-            recent_messages_string = "\n- ".join([f"{m['text']}" for m in recent_messages])
-        if current_message:
-            current_message_string = f"{current_message['text']}"
+    ) -> PromptContext:
+        # The message is sent once, as the text to answer. It used to be repeated
+        # alongside the context and history, which were also sent twice.
+        if current_message and current_message.get("text"):
+            message = current_message["text"]
         logger.info(f"Search results message: {search_results}")
-        search_results_string = ""
-        if search_results:
-            search_results_string = "\n- ".join([f"{m['text']}" for m in search_results])
+        return self.context_builder.build(message, search_results, recent_messages)
 
-        response = f"========================\nReceived message: {message}.\n ====================\nRecent messages available: {recent_messages_string}\n ==========================\n Current message: {current_message_string} \n ======================\nSearch results: {search_results_string}"
+    async def handle_message(
+        self,
+        message: str,
+        recent_messages: Optional[List[Dict[str, Any]]] = None,
+        current_message: Optional[Dict[str, Any]] = None,
+        search_results: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[str]:
+        context = self._build_prompt(message, recent_messages, current_message, search_results)
 
         # Generate three responses in parallel
         tasks = [
             self.llm_manager.generate_response(
-                response, search_results_string, recent_messages_string
+                context.message, context.search_results, context.recent_messages
             )
             for _ in range(1)
         ]
@@ -40,3 +46,15 @@ class IntelligentResponseHandler:
         intelligent_responses = await asyncio.gather(*tasks)
         logger.info(f"Intelligent responses: {intelligent_responses}")
         return intelligent_responses
+
+    def handle_message_stream(
+        self,
+        message: str,
+        recent_messages: Optional[List[Dict[str, Any]]] = None,
+        current_message: Optional[Dict[str, Any]] = None,
+        search_results: Optional[List[Dict[str, Any]]] = None,
+    ) -> AsyncIterator[str]:
+        context = self._build_prompt(message, recent_messages, current_message, search_results)
+        return self.llm_manager.generate_response_stream(
+            context.message, context.search_results, context.recent_messages
+        )
@@ -0,0 +1,94 @@
+import asyncio
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from src.config.config import config
+from src.logs.logs import logger
+
+
+@dataclass
+class _PendingBurst:
+    started_at: float
+    items: List[Any] = field(default_factory=list)
+    timer: Optional[asyncio.TimerHandle] = None
+
+
+class MessageDebouncer:
+    """Groups items that arrive in quick succession under the same key.
+
+    Each new item restarts a ``window`` second timer for its key. When the
+    timer fires, ``on_flush(key, items)`` receives the whole burst in arrival
+    order. A burst is also flushed ``max_wait`` seconds after its first item,
+    or as soon as it holds ``max_fragments`` items, so a sender who keeps
+    typing still gets an answer. With ``window <= 0`` every item is flushed
+    on its own right away.
+    """
+
+    def __init__(
+        self,
+        on_flush: Callable[[Hashable, List[Any]], Any],
+        window: float = config.TG_DEBOUNCE_SECONDS,
+        max_wait: float = config.TG_DEBOUNCE_MAX_WAIT_SECONDS,
+        max_fragments: int = config.TG_DEBOUNCE_MAX_FRAGMENTS,
+    ) -> None:
+        self.on_flush = on_flush
+        self.window = window
+        self.max_wait = max(window, max_wait)
+        self.max_fragments = max(1, max_fragments)
+        self._pending: Dict[Hashable, _PendingBurst] = {}
+        self.fragments = 0
+        self.flushed = 0
+        self.bursts = 0
+
+    def add(self, key: Hashable, item: Any) -> None:
+        self.fragments += 1
+        if self.window <= 0:
+            self._emit(key, [item])
+            return
+
+        loop = asyncio.get_running_loop()
+        burst = self._pending.get(key)
+        if burst is None:
+            burst = self._pending[key] = _PendingBurst(started_at=loop.time())
+        burst.items.append(item)
+        if burst.timer is not None:
+            burst.timer.cancel()
+
+        if len(burst.items) >= self.max_fragments:
+            self.flush(key)
+            return
+        delay = min(self.window, burst.started_at + self.max_wait - loop.time())
+        burst.timer = loop.call_later(max(0.0, delay), self.flush, key)
+
+    def flush(self, key: Hashable) -> None:
+        burst = self._pending.pop(key, None)
+        if burst is None:
+            return
+        if burst.timer is not None:
+            burst.timer.cancel()
+        self._emit(key, burst.items)
+
+    def flush_all(self, match: Optional[Callable[[Hashable], bool]] = None) -> None:
+        for key in list(self._pending):
+            if match is None or match(key):
+                self.flush(key)
+
+    def _emit(self, key: Hashable, items: List[Any]) -> None:
+        self.bursts += 1
+        self.flushed += len(items)
+        if len(items) > 1:
+            logger.info(f"Coalesced {len(items)} messages from {key}")
+        try:
+            self.on_flush(key, items)
+        except Exception as e:
+            logger.error(f"Error flushing debounced messages for {key}: {str(e)}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "window_seconds": self.window,
+            "pending_senders": len(self._pending),
+            "pending_fragments": sum(len(burst.items) for burst in self._pending.values()),
+            "fragments": self.fragments,
+            "bursts": self.bursts,
+            "requests_saved": self.flushed - self.bursts,
+        }
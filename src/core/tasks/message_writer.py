@@ -0,0 +1,158 @@
+import asyncio
+from typing import Any, Dict, List, Optional, Set
+
+from src.config.config import config
+from src.db.mongodb import MongoDBManager
+from src.logs.logs import logger
+from src.logs.tracing import tracer
+
+
+class MessageWriteBuffer:
+    """Write-behind buffer for message documents.
+
+    ``add`` only queues a document. Queued documents are written with one
+    unordered ``insert_many`` once ``batch_size`` of them are waiting or
+    ``flush_interval_ms`` after the first one arrived. Deduplication is left
+    to the unique index on the collection, so there is no existence check
+    before inserting. That also makes retries safe: a batch with failed
+    inserts is queued again as a whole and retried with exponential backoff,
+    up to ``max_retries`` times, and documents that did go in the first time
+    are then skipped as duplicates. Call ``close`` on shutdown to write
+    whatever is still queued.
+    """
+
+    def __init__(
+        self,
+        mongo_manager: MongoDBManager,
+        collection: str = "messages",
+        batch_size: int = config.MESSAGE_WRITE_BATCH_SIZE,
+        flush_interval_ms: int = config.MESSAGE_WRITE_FLUSH_MS,
+        max_retries: int = 5,
+        retry_delay: float = 1.0,
+    ) -> None:
+        self.mongo_manager = mongo_manager
+        self.collection = collection
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = max(0, flush_interval_ms) / 1000
+        self._pending: List[Dict] = []
+        # Documents of inserts that have not completed, still visible to pending().
+        self._in_flight: List[Dict] = []
+        self.max_retries = max(0, max_retries)
+        self.retry_delay = retry_delay
+        self._failures = 0
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes: Set[asyncio.Task] = set()
+        self.counters = {
+            "queued": 0,
+            "inserted": 0,
+            "duplicates": 0,
+            "failed": 0,
+            "retries": 0,
+            "round_trips": 0,
+        }
+
+    def add(self, document: Dict) -> None:
+        self.add_many([document])
+
+    def add_many(self, documents: List[Dict]) -> None:
+        if not documents:
+            return
+        self._pending.extend(documents)
+        self.counters["queued"] += len(documents)
+
+        if self._failures:
+            # A retry is already scheduled; writing sooner would skip the backoff.
+            return
+        if len(self._pending) >= self.batch_size or self.flush_interval == 0:
+            self._schedule_flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(
+                self.flush_interval, self._schedule_flush
+            )
+
+    def _schedule_flush(self) -> None:
+        task = asyncio.create_task(self.flush())
+        self._flushes.add(task)
+        task.add_done_callback(self._flushes.discard)
+
+    def _backoff(self) -> float:
+        return self.retry_delay * 2 ** max(0, self._failures - 1)
+
+    async def flush(self) -> Dict[str, int]:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return {"inserted": 0, "duplicates": 0, "failed": 0}
+
+        self._in_flight.extend(batch)
+        try:
+            with tracer.span("mongo.flush_messages", documents=len(batch)):
+                result = await self.mongo_manager.insert_many_ignore_duplicates(
+                    self.collection, batch
+                )
+        finally:
+            done = {id(doc) for doc in batch}
+            self._in_flight = [doc for doc in self._in_flight if id(doc) not in done]
+        self.counters["round_trips"] += 1
+        self.counters["inserted"] += result["inserted"]
+        self.counters["duplicates"] += result["duplicates"]
+
+        if not result["failed"]:
+            self._failures = 0
+            logger.debug(
+                f"Flushed {len(batch)} messages: {result['inserted']} inserted, "
+                f"{result['duplicates']} duplicates"
+            )
+        elif self._failures < self.max_retries:
+            self._failures += 1
+            self.counters["retries"] += 1
+            self._pending[:0] = batch
+            delay = self._backoff()
+            logger.warning(
+                f"Failed to write {result['failed']} of {len(batch)} buffered messages, "
+                f"retrying in {delay:.1f}s"
+            )
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = asyncio.get_running_loop().call_later(delay, self._schedule_flush)
+        else:
+            self._failures = 0
+            self.counters["failed"] += result["failed"]
+            logger.error(
+                f"Dropped {result['failed']} of {len(batch)} buffered messages "
+                f"after {self.max_retries} retries"
+            )
+        return result
+
+    def pending(self, **match: Any) -> List[Dict]:
+        """Queued or in-flight documents whose fields equal ``match``, for
+        read-your-writes lookups."""
+        return [
+            doc
+            for doc in self._in_flight + self._pending
+            if all(doc.get(key) == value for key, value in match.items())
+        ]
+
+    async def close(self) -> None:
+        if self._flushes:
+            await asyncio.gather(*list(self._flushes), return_exceptions=True)
+        # flush() drops a batch once it runs out of retries, so this ends.
+        await self.flush()
+        while self._pending:
+            await asyncio.sleep(self._backoff())
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        written = self.counters["inserted"] + self.counters["duplicates"] + self.counters["failed"]
+        return {
+            **self.counters,
+            "pending": len(self._pending),
+            "in_flight": len(self._in_flight),
+            "batch_size": self.batch_size,
+            "flush_interval_ms": int(self.flush_interval * 1000),
+            "round_trips_per_message": (
+                round(self.counters["round_trips"] / written, 3) if written else 0.0
+            ),
+        }
@@ -1,38 +1,65 @@
+import asyncio
 from datetime import datetime, timedelta, timezone
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import time
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 from telethon import TelegramClient, events
+from telethon.errors import FloodWaitError, MessageNotModifiedError
 from telethon.sessions import StringSession
-from telethon.tl.types import Channel, Chat, Message
+from telethon.tl.types import (
+    Channel,
+    Chat,
+    Message,
+    UpdateChannel,
+    UpdateChat,
+    UpdateUser,
+    UpdateUserName,
+)
 
 from src.config.config import config
-from src.core.rag.qdrant import SemanticEmbeddingService, SemanticQdrantService, SemanticSearchRepo
-from src.core.tasks.intelligent_response import IntelligentResponseHandler
-from src.db.mongodb import MongoDBManager
-from src.llm import LLMManager
+from src.core.rag.answer_cache import answer_cache
+from src.core.tasks.conversation_summary import ConversationSummaryStore
+from src.core.tasks.entity_cache import TelegramEntityCache
+from src.core.tasks.tenant_runtime import TenantRuntime
+from src.llm.html import close_open_tags, strip_code_fences
 from src.logs.logs import logger
+from src.logs.tracing import tracer
 
 
 class RealTimeIntelligenceHandler:
-    def __init__(self, organization_id: Optional[str] = None):
+    STREAM_PLACEHOLDER = "…"
+
+    def __init__(
+        self, organization_id: Optional[str] = None, runtime: Optional[TenantRuntime] = None
+    ):
         self.organization_id = organization_id
         self.api_id: Optional[int] = None
         self.api_hash: Optional[str] = None
         self.phone: Optional[str] = None
         self.client: Optional[TelegramClient] = None
-        self.mongo_manager = MongoDBManager()
-        self.llm_manager = LLMManager()
+        # Connections, LLM and retrieval clients and the reply workers come from
+        # the runtime, which is shared by all organizations in the process.
+        self._owns_runtime = runtime is None
+        self.runtime = runtime or TenantRuntime()
+        self.mongo_manager = self.runtime.mongo_manager
+        self.message_writer = self.runtime.message_writer
+        self.llm_manager = self.runtime.llm_manager
+        self.intelligent_response_handler = self.runtime.intelligent_response_handler
+        self.rag_repo = self.runtime.rag_repo
+        self.dispatcher = self.runtime.dispatcher
+        self.debouncer = self.runtime.debouncer
         self.message_handlers: Dict[str, Callable] = {}
         self.allowed_group_ids: set = set()  # Track groups to monitor
         self.is_running = False
-        self.intelligent_response_handler = IntelligentResponseHandler()
         self.is_auto_response_enabled = True
-        embedding_service = SemanticEmbeddingService()
-        qdrant_service = SemanticQdrantService(
-            url=config.QDRANT_API_URL,
-            api_key=config.QDRANT_API_KEY,
+        self.entity_cache = TelegramEntityCache()
+        self.conversation_summaries = ConversationSummaryStore(
+            organization_id,
+            llm_manager=self.llm_manager,
+            history_loader=lambda chat_id, limit: self.get_recent_messages(chat_id, limit=limit),
+            mongo_manager=self.mongo_manager,
         )
-        self.rag_repo = SemanticSearchRepo(embedding_service, qdrant_service)
+        self.runtime.register(self)
 
     async def _setup_database_indexes(self) -> bool:
         try:
@@ -47,6 +74,20 @@ class RealTimeIntelligenceHandler:
                 "messages",
                 [("organization_id", 1), ("chat_id", 1), ("date", -1)],
             )
+            # Buffered message writes rely on this index to skip duplicates. The
+            # analyzer stores messages without organization_id, so they are excluded.
+            if not await self.mongo_manager.create_index(
+                "messages",
+                [("organization_id", 1), ("chat_id", 1), ("message_id", 1)],
+                unique=True,
+                partialFilterExpression={"organization_id": {"$type": "string"}},
+            ):
+                logger.warning("Could not create unique message index, duplicates may be stored")
+            await self.mongo_manager.create_index(
+                ConversationSummaryStore.COLLECTION,
+                [("organization_id", 1), ("chat_id", 1)],
+                unique=True,
+            )
 
             return True
         except Exception as e:
@@ -59,7 +100,7 @@ class RealTimeIntelligenceHandler:
                 logger.error("No organization ID provided")
                 return False
 
-            if not await self.mongo_manager.setup():
+            if not await self.runtime.setup_mongo():
                 logger.error("Failed to setup MongoDB connection")
                 return False
 
@@ -121,25 +162,11 @@ class RealTimeIntelligenceHandler:
             logger.info("No existing session found in MongoDB")
         return None
 
-    async def _save_message(self, message_data: Dict) -> Dict[str, int]:
-        chat_id = message_data["chat_id"]
-
-        existing_message = await self.mongo_manager.find_one(
-            "messages",
-            {
-                "message_id": message_data["id"],
-                "chat_id": chat_id,
-                "organization_id": self.organization_id,
-            },
-        )
-
-        if existing_message:
-            return {"saved": 0, "skipped": 1}
-
-        message_doc = {
+    def _message_doc(self, message_data: Dict) -> Dict:
+        return {
             "organization_id": self.organization_id,
             "message_id": message_data["id"],
-            "chat_id": chat_id,
+            "chat_id": message_data["chat_id"],
             "chat_type": message_data.get("chat_type", "unknown"),
             "chat_title": message_data.get("chat_title", "Unknown"),
             "text": message_data["text"],
@@ -153,63 +180,6 @@ class RealTimeIntelligenceHandler:
             "created_at": datetime.now(timezone.utc),
         }
 
-        if await self.mongo_manager.insert_one("messages", message_doc):
-            return {"saved": 1, "skipped": 0}
-        else:
-            return {"saved": 0, "skipped": 0}
-
-    async def _save_messages_bulk(self, messages_data: List[Dict]) -> Dict[str, int]:
-        if not messages_data:
-            return {"saved": 0, "skipped": 0}
-
-        # Check for existing messages in bulk
-        message_ids = [msg["id"] for msg in messages_data]
-        existing_messages = await self.mongo_manager.find_many(
-            "messages",
-            {
-                "message_id": {"$in": message_ids},
-                "organization_id": self.organization_id,
-            },
-        )
-
-        existing_message_ids = {msg["message_id"] for msg in existing_messages}
-
-        # Filter out existing messages and prepare bulk insert
-        new_messages = []
-        skipped_count = 0
-
-        for msg_data in messages_data:
-            if msg_data["id"] in existing_message_ids:
-                skipped_count += 1
-                continue
-
-            chat_id = msg_data["chat_id"]
-
-            message_doc = {
-                "organization_id": self.organization_id,
-                "message_id": msg_data["id"],
-                "chat_id": chat_id,
-                "chat_type": msg_data.get("chat_type", "unknown"),
-                "chat_title": msg_data.get("chat_title", "Unknown"),
-                "text": msg_data["text"],
-                "date": msg_data["date"],
-                "sender_id": msg_data["sender_id"],
-                "sender_name": msg_data["sender_name"],
-                "sentiment": msg_data.get("sentiment"),
-                "polarity": msg_data.get("polarity"),
-                "is_own_message": msg_data.get("is_own_message", False),
-                "intelligent_response": msg_data.get("intelligent_response"),
-                "created_at": datetime.now(timezone.utc),
-            }
-            new_messages.append(message_doc)
-
-        # Bulk insert new messages
-        saved_count = 0
-        if new_messages:
-            saved_count = await self.mongo_manager.insert_many("messages", new_messages)
-
-        return {"saved": saved_count, "skipped": skipped_count}
-
     async def _update_message_sentiment(
         self, chat_id: int, message_id: int, sentiment: str, polarity: float
     ) -> bool:
@@ -235,7 +205,7 @@ class RealTimeIntelligenceHandler:
                 logger.error("Failed to load organization credentials")
                 return False
 
-            if not await self.mongo_manager.setup():
+            if not await self.runtime.setup_mongo():
                 logger.error("Failed to setup MongoDB connection")
                 return False
 
@@ -364,12 +334,10 @@ class RealTimeIntelligenceHandler:
         return False
 
     async def get_message_ownership(self, message: Message) -> bool:
-        current_user = None
         is_own_message = False
         try:
-            current_user = await self.client.get_me()  # type: ignore
+            current_user_id = await self.entity_cache.load_self_id(self.client)
             message_sender_id = getattr(message, "sender_id", None)
-            current_user_id = getattr(current_user, "id", None)
 
             if message_sender_id and current_user_id:
                 is_own_message = message_sender_id == current_user_id
@@ -396,6 +364,12 @@ class RealTimeIntelligenceHandler:
             messages = await self.mongo_manager.find_many(
                 "messages", query_filter, sort_fields=[("date", -1)], limit=limit
             )
+            # Messages still waiting in the write buffer are part of the history too.
+            pending = self.message_writer.pending(**query_filter)
+            if pending:
+                stored_ids = {msg.get("message_id") for msg in messages}
+                messages.extend(msg for msg in pending if msg["message_id"] not in stored_ids)
+                messages = sorted(messages, key=lambda msg: msg["date"], reverse=True)[:limit]
 
             recent_messages = []
             for msg in messages:
@@ -405,6 +379,7 @@ class RealTimeIntelligenceHandler:
                         "sender_name": msg.get("sender_name", "Unknown"),
                         "date": msg.get("date"),
                         "sender_id": msg.get("sender_id"),
+                        "message_id": msg.get("message_id"),
                         "is_own_message": msg.get("is_own_message", False),
                     }
                 )
@@ -496,75 +471,237 @@ class RealTimeIntelligenceHandler:
             logger.error(f"Error sending intelligent response: {str(e)}")
             return False
 
-    async def process_message(self, message: Message) -> Dict[str, Any]:
+    async def stream_intelligent_response(
+        self,
+        chat_id: int,
+        deltas: AsyncIterator[str],
+        edit_interval: float = config.STREAM_EDIT_INTERVAL,
+    ) -> Optional[str]:
+        """Posts a placeholder and edits it with the response as it is generated.
+
+        Edits are throttled to one per ``edit_interval`` seconds and each one
+        closes any tags the partial HTML has left open. Returns the full text,
+        or None if streaming failed part way and the answer is incomplete.
+        """
+        try:
+            return await self._stream_response(chat_id, deltas, edit_interval)
+        finally:
+            # Release the upstream stream (and its gateway slot) right away
+            # rather than whenever the generator is garbage collected.
+            aclose = getattr(deltas, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+    async def _stream_response(
+        self, chat_id: int, deltas: AsyncIterator[str], edit_interval: float
+    ) -> Optional[str]:
+        if not self.client or not self.client.is_connected():
+            logger.error("Client not connected, cannot send message")
+            return None
+
+        text = ""
+        shown = ""
+        next_edit_at = 0.0
         try:
-            sender_name = "Unknown"
-            if hasattr(message, "sender_id") and message.sender_id:  # type: ignore
+            placeholder = await self.client.send_message(chat_id, self.STREAM_PLACEHOLDER)
+            async for delta in deltas:
+                text += delta
+                now = time.monotonic()
+                if now < next_edit_at:
+                    continue
+                partial = close_open_tags(strip_code_fences(text))
+                if not partial.strip() or partial == shown:
+                    continue
+                next_edit_at = now + edit_interval
                 try:
-                    sender = await self.client.get_entity(message.sender_id)  # type: ignore
-                    sender_name = (
-                        getattr(sender, "first_name", "")
-                        + " "
-                        + getattr(sender, "last_name", "").strip()
-                    ).strip()
-                except Exception:
-                    sender_name = f"User_{getattr(message, 'sender_id', 'unknown')}"
-
-            chat = await message.get_chat()  # type: ignore
-            chat_title = getattr(chat, "title", "Unknown Chat")
-            chat_type = type(chat).__name__
-
-            message_data = {
-                "id": message.id,
-                "text": getattr(message, "text", "") or "",
-                "date": message.date,
-                "sender_id": getattr(message, "sender_id", None),
-                "sender_name": sender_name,
-                "chat_id": getattr(message, "chat_id", None),
-                "chat_title": chat_title,
-                "chat_type": chat_type,
-                "received_at": datetime.now(timezone.utc),
-                "sentiment": None,
-                "polarity": None,
-                "intelligent_response": None,
-            }
+                    await placeholder.edit(partial, parse_mode="html")
+                    shown = partial
+                except FloodWaitError as e:
+                    next_edit_at = now + e.seconds
+                except MessageNotModifiedError:
+                    pass
+
+            final = strip_code_fences(text)
+            if not final:
+                await placeholder.delete()
+                logger.warning(f"Empty streamed response for chat {chat_id}")
+                return ""
+
+            final_html = close_open_tags(final)
+            if final_html != shown:
+                try:
+                    await placeholder.edit(final_html, parse_mode="html")
+                except FloodWaitError as e:
+                    await asyncio.sleep(e.seconds)
+                    await placeholder.edit(final_html, parse_mode="html")
+            logger.info(f"Streamed response to chat {chat_id}: {final[:50]}...")
+            return final
+
+        except Exception as e:
+            logger.error(f"Error streaming intelligent response: {str(e)}")
+            return None
+
+    async def process_message(
+        self, message: Message, earlier: Sequence[Message] = ()
+    ) -> Dict[str, Any]:
+        """Answer ``message``. ``earlier`` are fragments the same sender sent just
+        before it; they are stored too and answered together with it."""
+        with tracer.span(
+            "telegram.process_message",
+            organization_id=self.organization_id,
+            chat_id=getattr(message, "chat_id", None),
+            fragments=len(earlier) + 1,
+        ):
+            return await self._process_message(message, earlier)
+
+    async def _build_message_data(self, message: Message) -> Dict[str, Any]:
+        sender_name = "Unknown"
+        if hasattr(message, "sender_id") and message.sender_id:  # type: ignore
+            try:
+                with tracer.span("telegram.get_entity"):
+                    sender = await self.entity_cache.get_sender(self.client, message)
+                sender_name = (
+                    getattr(sender, "first_name", "")
+                    + " "
+                    + getattr(sender, "last_name", "").strip()
+                ).strip()
+            except Exception:
+                sender_name = f"User_{getattr(message, 'sender_id', 'unknown')}"
+
+        with tracer.span("telegram.get_chat"):
+            chat = await self.entity_cache.get_chat(message)
+        chat_title = getattr(chat, "title", "Unknown Chat")
+        chat_type = type(chat).__name__
+
+        message_data = {
+            "id": message.id,
+            "text": getattr(message, "text", "") or "",
+            "date": message.date,
+            "sender_id": getattr(message, "sender_id", None),
+            "sender_name": sender_name,
+            "chat_id": getattr(message, "chat_id", None),
+            "chat_title": chat_title,
+            "chat_type": chat_type,
+            "received_at": datetime.now(timezone.utc),
+            "sentiment": None,
+            "polarity": None,
+            "intelligent_response": None,
+        }
+
+        with tracer.span("telegram.get_me"):
+            message_data["is_own_message"] = await self.get_message_ownership(message)
+        return message_data
 
-            is_own_message = await self.get_message_ownership(message)
-            message_data["is_own_message"] = is_own_message
+    async def _process_message(
+        self, message: Message, earlier: Sequence[Message] = ()
+    ) -> Dict[str, Any]:
+        try:
+            message_data = await self._build_message_data(message)
+            fragments_data = [await self._build_message_data(m) for m in earlier]
+            is_own_message = message_data["is_own_message"]
             logger.info(f"Is own message: {is_own_message}")
 
-            if message_data["text"] and not is_own_message:
-                logger.info(
-                    f"Starting intelligent response for message: {message_data['text'][:50]}..."
-                )
+            # A question typed as several quick messages is answered as one.
+            query_text = "\n".join(
+                data["text"] for data in [*fragments_data, message_data] if data["text"]
+            )
+
+            if query_text and not is_own_message:
+                logger.info(f"Starting intelligent response for message: {query_text[:50]}...")
                 try:
                     chat_id = message_data["chat_id"]
-                    recent_messages = await self.get_recent_messages(chat_id, limit=30)
-
-                    current_message = {
-                        "text": message_data["text"],
-                        "sender_name": message_data["sender_name"],
-                        "date": message_data["date"],
-                        "sender_id": message_data["sender_id"],
-                        "is_own_message": is_own_message,
-                    }
-
-                    search_results = await self.rag_repo.query_text(
-                        query_text=message_data["text"],
-                        account_id=message_data.get("account_id", None),
-                    )
 
-                    logger.info(f"The search result is: {search_results}")
-
-                    intelligent_response = await self.intelligent_response_handler.handle_message(
-                        message_data["text"],
-                        recent_messages=recent_messages,
-                        current_message=current_message,
-                        search_results=search_results,
-                    )
+                    query_embedding: List[float] = []
+                    cached_answer = None
+                    streamed = False
+                    if config.ANSWER_CACHE_ENABLED:
+                        with tracer.span("embedding.query"):
+                            query_embedding = await self.rag_repo.embedding_service.get_embeddings(
+                                query_text
+                            )
+                        with tracer.span("answer_cache.lookup"):
+                            # Scoped to the chat: the answer was generated with
+                            # this conversation's history and summary in the prompt.
+                            cached_answer = await answer_cache.lookup(
+                                self.organization_id,  # type: ignore
+                                query_embedding,
+                                scope=chat_id,
+                            )
+
+                    if cached_answer:
+                        search_results = cached_answer.search_results
+                        intelligent_response = [cached_answer.answer]
+                    else:
+                        with tracer.span("history.load"):
+                            recent_messages = await self.conversation_summaries.recent_context(
+                                chat_id
+                            )
+
+                        current_message = {
+                            "text": query_text,
+                            "sender_name": message_data["sender_name"],
+                            "date": message_data["date"],
+                            "sender_id": message_data["sender_id"],
+                            "is_own_message": is_own_message,
+                        }
+
+                        with tracer.span("rag.query") as span:
+                            search_results = await self.rag_repo.query_text(
+                                query_text=query_text,
+                                account_id=self.organization_id,  # type: ignore
+                            )
+                            if span:
+                                span.set_attribute("results", len(search_results))
+
+                        logger.info(f"The search result is: {search_results}")
+
+                        # Media has to be sent as a file with a caption, which cannot be
+                        # streamed, so only text-only answers are delivered progressively.
+                        if (
+                            config.STREAM_RESPONSES
+                            and self.is_auto_response_enabled is True
+                            and not any(self.extract_media_files(search_results))
+                        ):
+                            with tracer.span("llm.generate_stream"):
+                                streamed_answer = await self.stream_intelligent_response(
+                                    chat_id,
+                                    self.intelligent_response_handler.handle_message_stream(
+                                        query_text,
+                                        recent_messages=recent_messages,
+                                        current_message=current_message,
+                                        search_results=search_results,
+                                    ),
+                                )
+                            # A failed stream (None) leaves only a partial reply on
+                            # screen, which must be neither cached nor recorded.
+                            intelligent_response = [streamed_answer] if streamed_answer else []
+                            streamed = True
+                        else:
+                            with tracer.span("llm.generate"):
+                                intelligent_response = (
+                                    await self.intelligent_response_handler.handle_message(
+                                        query_text,
+                                        recent_messages=recent_messages,
+                                        current_message=current_message,
+                                        search_results=search_results,
+                                    )
+                                )
+                        if query_embedding and intelligent_response and intelligent_response[0]:
+                            await answer_cache.store(
+                                self.organization_id,  # type: ignore
+                                query_text,
+                                query_embedding,
+                                intelligent_response[0],
+                                search_results,
+                                scope=chat_id,
+                            )
                     message_data["intelligent_response"] = intelligent_response
 
-                    if self.is_auto_response_enabled is True and intelligent_response:
+                    if (
+                        self.is_auto_response_enabled is True
+                        and intelligent_response
+                        and not streamed
+                    ):
                         logger.info(
                             f"The message does not belong to the session owner. Sending intelligent response to chat {chat_id}: {intelligent_response}"
                         )
@@ -572,29 +709,29 @@ class RealTimeIntelligenceHandler:
                             search_results
                         )
 
-                        await self.send_intelligent_response(
-                            chat_id,
-                            intelligent_response[0],
-                            images=image_lists,
-                            videos=video_lists,
-                            audios=audio_lists,
-                            pdfs=pdf_files,
-                        )
+                        with tracer.span("telegram.send"):
+                            await self.send_intelligent_response(
+                                chat_id,
+                                intelligent_response[0],
+                                images=image_lists,
+                                videos=video_lists,
+                                audios=audio_lists,
+                                pdfs=pdf_files,
+                            )
 
                 except Exception as e:
                     logger.error(f"Error in intelligent response: {str(e)}")
             else:
-                if not message_data["text"]:
+                if not query_text:
                     logger.info("Message has no text, skipping intelligent response")
                 elif is_own_message:
                     logger.info("Message is from own user, skipping intelligent response")
                 else:
                     logger.info("Skipping intelligent response for unknown reason")
 
-            result = await self._save_message(message_data)
-            logger.info(
-                f"Message save result: {result['saved']} saved, {result['skipped']} skipped"
-            )
+            response = message_data.get("intelligent_response")
+            self._record([*fragments_data, message_data], response[0] if response else None)
+            logger.info(f"Queued {len(fragments_data) + 1} message(s) for saving")
             return message_data
 
         except Exception as e:
@@ -611,7 +748,8 @@ class RealTimeIntelligenceHandler:
 
         for search_result in search_results:
             metadata = search_result.get("metadata")
-            if not metadata:
+            # A keyword-only hit is not reliable enough to send its file.
+            if not metadata or search_result.get("lexical_only"):
                 continue
 
             file_type = metadata.get("type")
@@ -637,22 +775,63 @@ class RealTimeIntelligenceHandler:
         return image_files, video_files, audio_files, pdf_files
 
     async def handle_new_message(self, event):
-        try:
-            logger.info(f"=== EVENT HANDLER TRIGGERED ===")
-            logger.info(f"Event received: {type(event)}")
-            message = event.message
-            logger.info(
-                f"Message from chat_id: {message.chat_id}, text: {message.text[:50] if message.text else 'No text'}"
+        logger.info(f"=== EVENT HANDLER TRIGGERED ===")
+        logger.info(f"Event received: {type(event)}")
+        message = event.message
+        logger.info(
+            f"Message from chat_id: {message.chat_id}, text: {message.text[:50] if message.text else 'No text'}"
+        )
+        if not message.text:
+            logger.info("Message has no text, skipping...")
+            return
+        self.runtime.enqueue(self.organization_id, event)
+
+    def _record(self, messages_data: List[Dict[str, Any]], reply: Optional[str] = None) -> None:
+        """Queue messages for saving and add them, with the reply if one was
+        sent, to the chat's conversation summary."""
+        if not messages_data:
+            return
+        self.message_writer.add_many([self._message_doc(data) for data in messages_data])
+        turns = [
+            ConversationSummaryStore.make_turn(
+                data["sender_name"], data["text"], data["date"], data["id"]
             )
-            if not message.text:
-                logger.info("Message has no text, skipping...")
-                return
+            for data in messages_data
+            if data["text"]
+        ]
+        if reply:
+            turns.append(
+                ConversationSummaryStore.make_turn("Assistant", reply, datetime.now(timezone.utc))
+            )
+        if turns:
+            self.conversation_summaries.schedule_update(messages_data[-1]["chat_id"], turns)
+
+    async def save_unanswered(self, events: List[Any]) -> None:
+        """Store messages that will not get a reply, e.g. ones dropped from a
+        full chat queue."""
+        try:
+            messages_data = [await self._build_message_data(event.message) for event in events]
+            self._record(messages_data)
+            logger.info(f"Queued {len(messages_data)} unanswered message(s) for saving")
+        except Exception as e:
+            logger.error(f"Error saving unanswered messages: {str(e)}")
 
+    async def _handle_new_message(self, events: List[Any]):
+        try:
+            message = events[-1].message
+            # A merged batch can hold other senders' messages; only the last
+            # sender's run is answered, the rest is stored without a reply.
+            split = len(events) - 1
+            while split > 0 and events[split - 1].message.sender_id == message.sender_id:
+                split -= 1
+            if split:
+                await self.save_unanswered(events[:split])
+                events = events[split:]
             chat_id = message.chat_id
             logger.info(f"Processing message from chat_id: {chat_id} for intelligence response")
 
             try:
-                chat = await message.get_chat()
+                chat = await self.entity_cache.get_chat(message)
                 chat_title = getattr(chat, "title", "Unknown Chat")
                 chat_type = type(chat).__name__
                 logger.info(f"Chat type: {chat_type}, Title: {chat_title}")
@@ -663,7 +842,9 @@ class RealTimeIntelligenceHandler:
 
             logger.info(f"New message received in {chat_type}: {chat_title} (ID: {chat_id})")
 
-            message_data = await self.process_message(message)
+            message_data = await self.process_message(
+                message, earlier=[event.message for event in events[:-1]]
+            )
             if not message_data:
                 return
 
@@ -733,6 +914,13 @@ class RealTimeIntelligenceHandler:
 
             logger.info(f"Client connected: {self.client.is_connected()}")
 
+            await self.entity_cache.load_self_id(self.client)
+            self.client.add_event_handler(
+                self.entity_cache.handle_update,
+                events.Raw(types=[UpdateUserName, UpdateUser, UpdateChat, UpdateChannel]),
+            )
+            self.client.add_event_handler(self.entity_cache.handle_chat_action, events.ChatAction())
+            self.dispatcher.start()
             self.client.add_event_handler(self.handle_new_message, events.NewMessage())
 
             logger.info("Event handler registration completed - monitoring all chats")
@@ -748,9 +936,13 @@ class RealTimeIntelligenceHandler:
 
     async def stop_listening(self):
         self.is_running = False
+        await self.runtime.drain(self.organization_id)
+        self.runtime.unregister(self.organization_id)
         if self.client:
             await self.client.disconnect()  # type: ignore
-        self.mongo_manager.close()
+        await self.conversation_summaries.flush()
+        if self._owns_runtime:
+            await self.runtime.close()
         logger.info("Message listener stopped")
 
     async def get_active_groups(self) -> list:
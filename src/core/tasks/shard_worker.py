@@ -0,0 +1,118 @@
+import asyncio
+from typing import Any, Dict, List, Optional
+
+from src.config.config import config
+from src.core.tasks.background_task_manager import BackgroundTaskManager
+from src.core.tasks.sharding import HashRing, WorkerLeaseStore
+from src.logs.logs import logger
+
+
+class ShardWorker:
+    """Runs the Telegram listeners of the organizations this worker owns.
+
+    Every ``interval`` seconds the worker refreshes its heartbeat and
+    reconciles against the ``background_tasks`` collection: organizations
+    that should be running and hash to this worker are started once their
+    lease is acquired, and organizations that now hash to another worker, or
+    whose lease was taken over, are handed off. When a worker stops
+    heartbeating, its leases expire and the remaining workers pick its
+    organizations up.
+    """
+
+    def __init__(
+        self,
+        manager: BackgroundTaskManager,
+        worker_id: str = config.WORKER_ID,
+        url: str = config.WORKER_URL,
+        interval: float = config.WORKER_HEARTBEAT_INTERVAL,
+    ) -> None:
+        self.manager = manager
+        self.leases = WorkerLeaseStore(manager.mongo_manager, worker_id, url)
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def worker_id(self) -> str:
+        return self.leases.worker_id
+
+    async def start(self) -> None:
+        # Lease exclusivity rests on the unique index; without it two workers
+        # could run the same organization.
+        if not await self.leases.setup_indexes():
+            raise RuntimeError(f"Worker {self.worker_id} could not create the lease indexes")
+        await self.leases.heartbeat()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Worker {self.worker_id} started at {self.leases.url}")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        await self.manager.shutdown(handoff=True)
+        await self.leases.deregister()
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.reconcile()
+            except Exception as e:
+                logger.error(f"Worker {self.worker_id} reconcile failed: {str(e)}")
+            await asyncio.sleep(self.interval)
+
+    async def reconcile(self) -> Dict[str, List[str]]:
+        await self.leases.heartbeat()
+        ring = HashRing(await self.leases.live_workers())
+        desired = {
+            task["organization_id"]: task
+            for task in await self.manager.mongo_manager.find_many(
+                "background_tasks", {"status": "running"}
+            )
+        }
+        running = list(self.manager.active_tasks)
+        started: List[str] = []
+        handed_off: List[str] = []
+
+        lost = set(await self.leases.renew(running))
+        for organization_id in running:
+            if organization_id not in desired:
+                await self.manager.stop_intelligence_task(organization_id)
+                await self.leases.release(organization_id)
+            elif organization_id in lost or ring.owner(organization_id) != self.worker_id:
+                await self.manager.stop_intelligence_task(organization_id, handoff=True)
+                await self.leases.release(organization_id)
+                handed_off.append(organization_id)
+
+        for organization_id, task in desired.items():
+            if (
+                organization_id not in self.manager.active_tasks
+                and ring.owner(organization_id) == self.worker_id
+                and await self.leases.acquire(organization_id)
+            ):
+                result = await self.manager.start_intelligence_task(
+                    organization_id, task.get("group_ids") or None
+                )
+                if result["success"]:
+                    started.append(organization_id)
+                else:
+                    await self.leases.release(organization_id)
+
+        if started or handed_off:
+            logger.info(f"Worker {self.worker_id} started {started}, handed off {handed_off}")
+        return {"started": started, "handed_off": handed_off}
+
+    async def start_task(self, organization_id: str, group_ids: Optional[list]) -> Dict[str, Any]:
+        if not await self.leases.acquire(organization_id):
+            return {
+                "success": False,
+                "message": f"Organization {organization_id} is running on another worker",
+            }
+        result = await self.manager.start_intelligence_task(organization_id, group_ids)
+        if not result["success"] and organization_id not in self.manager.active_tasks:
+            await self.leases.release(organization_id)
+        return result
+
+    async def stop_task(self, organization_id: str) -> Dict[str, Any]:
+        result = await self.manager.stop_intelligence_task(organization_id)
+        await self.leases.release(organization_id)
+        return result
@@ -0,0 +1,179 @@
+import bisect
+from datetime import datetime, timedelta, timezone
+import hashlib
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import httpx
+
+from src.config.config import config
+from src.db.mongodb import MongoDBManager
+from src.logs.logs import logger
+
+WORKERS_COLLECTION = "workers"
+LEASES_COLLECTION = "tenant_leases"
+
+
+def _hash(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent hash ring. Each node is placed ``replicas`` times, so adding
+    or removing one of N nodes moves only about 1/N of the keys."""
+
+    def __init__(self, nodes: Iterable[str] = (), replicas: int = 64) -> None:
+        self.replicas = replicas
+        self._ring: List[Tuple[int, str]] = sorted(
+            (_hash(f"{node}#{i}"), node) for node in set(nodes) for i in range(replicas)
+        )
+        self._hashes = [point for point, _ in self._ring]
+
+    def owner(self, key: str) -> Optional[str]:
+        if not self._ring:
+            return None
+        index = bisect.bisect(self._hashes, _hash(key)) % len(self._ring)
+        return self._ring[index][1]
+
+
+class WorkerLeaseStore:
+    """Worker heartbeats and per-organization leases, kept in Mongo.
+
+    A worker is alive while its heartbeat is younger than ``lease_ttl``. An
+    organization's listener may only run on the worker holding its lease;
+    the lease is taken with an atomic find_one_and_update and the unique
+    index on organization_id, so two workers can never both hold it.
+    """
+
+    def __init__(
+        self,
+        mongo_manager: MongoDBManager,
+        worker_id: str = "",
+        url: str = "",
+        lease_ttl: int = config.WORKER_LEASE_TTL,
+    ) -> None:
+        self.mongo_manager = mongo_manager
+        self.worker_id = worker_id
+        self.url = url
+        self.lease_ttl = lease_ttl
+
+    def _expiry(self) -> datetime:
+        return datetime.now(timezone.utc) + timedelta(seconds=self.lease_ttl)
+
+    async def setup_indexes(self) -> bool:
+        return await self.mongo_manager.create_index(
+            WORKERS_COLLECTION, [("worker_id", 1)], unique=True
+        ) and await self.mongo_manager.create_index(
+            LEASES_COLLECTION, [("organization_id", 1)], unique=True
+        )
+
+    async def heartbeat(self) -> bool:
+        return await self.mongo_manager.update_one(
+            WORKERS_COLLECTION,
+            {"worker_id": self.worker_id},
+            {
+                "url": self.url,
+                "heartbeat_at": datetime.now(timezone.utc),
+                "expires_at": self._expiry(),
+            },
+            upsert=True,
+        )
+
+    async def live_workers(self) -> Dict[str, str]:
+        workers = await self.mongo_manager.find_many(
+            WORKERS_COLLECTION, {"expires_at": {"$gt": datetime.now(timezone.utc)}}
+        )
+        return {worker["worker_id"]: worker["url"] for worker in workers}
+
+    async def acquire(self, organization_id: str) -> bool:
+        lease = await self.mongo_manager.find_one_and_update(
+            LEASES_COLLECTION,
+            {
+                "organization_id": organization_id,
+                "$or": [
+                    {"worker_id": self.worker_id},
+                    {"expires_at": {"$lt": datetime.now(timezone.utc)}},
+                ],
+            },
+            {"worker_id": self.worker_id, "expires_at": self._expiry()},
+            upsert=True,
+        )
+        return lease is not None and lease.get("worker_id") == self.worker_id
+
+    async def renew(self, organization_ids: List[str]) -> List[str]:
+        """Extend the given leases. Returns the organizations whose lease was lost."""
+        lost = []
+        for organization_id in organization_ids:
+            if not await self.acquire(organization_id):
+                lost.append(organization_id)
+        return lost
+
+    async def release(self, organization_id: str) -> bool:
+        return await self.mongo_manager.delete_one(
+            LEASES_COLLECTION, {"organization_id": organization_id, "worker_id": self.worker_id}
+        )
+
+    async def holder(self, organization_id: str) -> Optional[str]:
+        lease = await self.mongo_manager.find_one(
+            LEASES_COLLECTION,
+            {"organization_id": organization_id, "expires_at": {"$gt": datetime.now(timezone.utc)}},
+        )
+        return lease["worker_id"] if lease else None
+
+    async def deregister(self) -> None:
+        await self.mongo_manager.delete_many(LEASES_COLLECTION, {"worker_id": self.worker_id})
+        await self.mongo_manager.delete_one(WORKERS_COLLECTION, {"worker_id": self.worker_id})
+
+
+class WorkerRouter:
+    """Control-plane side: sends start/stop/status for an organization to the
+    worker that owns it. The owner is the current lease holder, or, for an
+    organization that is not running anywhere, its place on the hash ring
+    of live workers."""
+
+    def __init__(
+        self,
+        leases: WorkerLeaseStore,
+        secret: str = config.WORKER_SHARED_SECRET,
+        timeout: float = config.WORKER_REQUEST_TIMEOUT,
+    ) -> None:
+        self.leases = leases
+        self._client = httpx.AsyncClient(timeout=timeout, headers={"X-Worker-Token": secret})
+
+    async def owner(self, organization_id: str) -> Optional[Tuple[str, str]]:
+        workers = await self.leases.live_workers()
+        worker_id = await self.leases.holder(organization_id)
+        if worker_id not in workers:
+            worker_id = HashRing(workers).owner(organization_id)
+        return (worker_id, workers[worker_id]) if worker_id else None
+
+    async def call(
+        self, method: str, url: str, path: str, json: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        try:
+            response = await self._client.request(method, f"{url}{path}", json=json)
+            response.raise_for_status()
+            return response.json()
+        except Exception as e:
+            logger.error(f"Worker request {method} {url}{path} failed: {str(e)}")
+            return {"success": False, "message": f"Worker unavailable: {str(e)}"}
+
+    async def call_owner(
+        self, method: str, organization_id: str, action: str, json: Optional[Dict] = None
+    ) -> Dict[str, Any]:
+        owner = await self.owner(organization_id)
+        if owner is None:
+            return {"success": False, "message": "No Telegram workers are running"}
+        return await self.call(
+            method, owner[1], f"/internal/tasks/{organization_id}/{action}", json
+        )
+
+    async def list_tasks(self) -> Dict[str, Any]:
+        active_tasks: Dict[str, Any] = {}
+        for worker_id, url in (await self.leases.live_workers()).items():
+            result = await self.call("GET", url, "/internal/tasks")
+            for organization_id, task in result.get("active_tasks", {}).items():
+                active_tasks[organization_id] = {**task, "worker_id": worker_id}
+        return {"success": True, "active_tasks": active_tasks, "total_active": len(active_tasks)}
+
+    async def close(self) -> None:
+        await self._client.aclose()
@@ -0,0 +1,200 @@
+import asyncio
+import gc
+import sys
+import time
+import types
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.config.config import config
+from src.core.rag.answer_cache import answer_cache
+from src.core.rag.qdrant import SemanticEmbeddingService, SemanticQdrantService, SemanticSearchRepo
+from src.core.tasks.chat_dispatcher import ChatWorkDispatcher
+from src.core.tasks.intelligent_response import IntelligentResponseHandler
+from src.core.tasks.message_debouncer import MessageDebouncer
+from src.core.tasks.message_writer import MessageWriteBuffer
+from src.db.mongodb import MongoDBManager
+from src.llm import LLMManager
+from src.logs.logs import logger
+
+if TYPE_CHECKING:
+    from src.core.tasks.realtime_intelligence import RealTimeIntelligenceHandler
+
+# Shared by everything, so never counted towards a single object's size.
+_SKIPPED_TYPES = (
+    type,
+    types.ModuleType,
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.CodeType,
+    asyncio.AbstractEventLoop,
+)
+
+
+def deep_sizeof(root: Any, exclude: Iterable[Any] = ()) -> int:
+    """Bytes reachable from ``root`` through ``gc.get_referents``, not following
+    into ``exclude``, modules, classes, functions or the event loop."""
+    seen: Set[int] = {id(obj) for obj in exclude}
+    stack = [root]
+    size = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SKIPPED_TYPES):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj, 0)
+        stack.extend(gc.get_referents(obj))
+    return size
+
+
+class TenantRuntime:
+    """Resources shared by the realtime handlers of every organization.
+
+    Each organization keeps its own TelegramClient, entity cache and
+    conversation summaries. Mongo, the message write buffer, the LLM and
+    retrieval clients, the debouncer and the reply worker pool exist once
+    per process. Queued work is keyed by organization and chat, so tenants
+    share the ``TG_REPLY_WORKERS`` workers fairly and one tenant's burst
+    cannot hold up the others.
+    """
+
+    def __init__(self, workers: int = config.TG_REPLY_WORKERS, memory_ttl: float = 60) -> None:
+        self.mongo_manager = MongoDBManager()
+        self.message_writer = MessageWriteBuffer(self.mongo_manager)
+        self.llm_manager = LLMManager()
+        self.intelligent_response_handler = IntelligentResponseHandler()
+        self.rag_repo = SemanticSearchRepo(
+            SemanticEmbeddingService(),
+            SemanticQdrantService(url=config.QDRANT_API_URL, api_key=config.QDRANT_API_KEY),
+            kb_version=answer_cache.kb_version,
+        )
+        self.dispatcher = ChatWorkDispatcher(
+            self._dispatch, workers=workers, coalesce=self._merge, on_drop=self._save_dropped
+        )
+        self.debouncer = MessageDebouncer(self._submit)
+        self.tenants: Dict[str, "RealTimeIntelligenceHandler"] = {}
+        self._mongo_ready = False
+        self._mongo_lock = asyncio.Lock()
+        self._saving: Set[asyncio.Task] = set()
+        self.memory_ttl = memory_ttl
+        self._memory: Dict[str, Tuple[float, Any]] = {}  # key -> (measured_at, value)
+
+    async def setup_mongo(self) -> bool:
+        """Connect the shared Mongo client once instead of once per tenant."""
+        async with self._mongo_lock:
+            if not self._mongo_ready:
+                self._mongo_ready = await self.mongo_manager.setup()
+        return self._mongo_ready
+
+    def register(self, handler: "RealTimeIntelligenceHandler") -> None:
+        self.tenants[str(handler.organization_id)] = handler
+
+    def unregister(self, organization_id: Optional[str]) -> None:
+        self.tenants.pop(str(organization_id), None)
+        self._memory.pop(str(organization_id), None)
+
+    def enqueue(self, organization_id: Optional[str], event: Any) -> None:
+        message = event.message
+        self.debouncer.add((str(organization_id), message.chat_id, message.sender_id), event)
+
+    def _submit(self, key: Tuple[str, int, int], events: List[Any]) -> None:
+        organization_id, chat_id, _ = key
+        self.dispatcher.submit((organization_id, chat_id), (organization_id, events))
+
+    async def _dispatch(self, item: Tuple[str, List[Any]]) -> None:
+        organization_id, events = item
+        handler = self.tenants.get(organization_id)
+        if handler is None:
+            logger.warning(
+                f"Dropping {len(events)} messages for stopped organization {organization_id}"
+            )
+            return
+        await handler._handle_new_message(events)
+
+    @staticmethod
+    def _merge(waiting: Tuple[str, List[Any]], new: Tuple[str, List[Any]]) -> Tuple[str, List[Any]]:
+        # Only the newest sender is answered, but every merged message is stored.
+        return waiting[0], [*waiting[1], *new[1]]
+
+    def _save_dropped(self, key: Tuple[str, int], item: Tuple[str, List[Any]]) -> None:
+        organization_id, events = item
+        handler = self.tenants.get(organization_id)
+        if handler is None:
+            return
+        task = asyncio.create_task(handler.save_unanswered(events))
+        self._saving.add(task)
+        task.add_done_callback(self._saving.discard)
+
+    async def _wait_saving(self, timeout: float) -> None:
+        if self._saving:
+            await asyncio.wait(set(self._saving), timeout=timeout)
+
+    async def drain(self, organization_id: Optional[str], timeout: float = 30) -> bool:
+        """Answer everything already received for one organization."""
+        prefix = str(organization_id)
+        self.debouncer.flush_all(lambda key: key[0] == prefix)
+        drained = await self.dispatcher.drain(lambda key: key[0] == prefix, timeout=timeout)
+        await self._wait_saving(timeout)
+        return drained
+
+    async def close(self) -> None:
+        self.debouncer.flush_all()
+        await self.dispatcher.stop()
+        await self._wait_saving(30)
+        await self.message_writer.close()
+        self.mongo_manager.close()
+        await self.rag_repo.qdrant_service.close()
+
+    def _shared_objects(self) -> List[Any]:
+        return [self, *vars(self).values()]
+
+    def _tenant_size(self, handler: "RealTimeIntelligenceHandler") -> int:
+        others = [h for h in list(self.tenants.values()) if h is not handler]
+        return deep_sizeof(handler, exclude=[*self._shared_objects(), *others])
+
+    def memory_per_tenant(self) -> Dict[str, int]:
+        """Approximate bytes held by each tenant's own objects, including its
+        TelegramClient, excluding everything that lives in this runtime.
+        Walks every tenant's object graph; prefer ``memory_for`` when serving
+        requests."""
+        return {
+            organization_id: self._tenant_size(handler)
+            for organization_id, handler in list(self.tenants.items())
+        }
+
+    async def _measured(self, key: str, measure: Any) -> Any:
+        # Results are kept for ``memory_ttl`` seconds and measured in a worker
+        # thread, so status polls never walk object graphs on the event loop.
+        cached = self._memory.get(key)
+        now = time.monotonic()
+        if cached and now - cached[0] < self.memory_ttl:
+            return cached[1]
+        value = await asyncio.to_thread(measure)
+        self._memory[key] = (now, value)
+        return value
+
+    async def memory_for(self, organization_id: Optional[str]) -> Optional[int]:
+        handler = self.tenants.get(str(organization_id))
+        if handler is None:
+            return None
+        return await self._measured(str(organization_id), lambda: self._tenant_size(handler))
+
+    async def memory_report(self) -> Dict[str, Any]:
+        def report() -> Dict[str, Any]:
+            memory = list(self.memory_per_tenant().values())
+            return {
+                "tenants": len(memory),
+                "shared_bytes": deep_sizeof(self, exclude=list(self.tenants.values())),
+                "tenant_bytes_total": sum(memory),
+                "tenant_bytes_avg": int(sum(memory) / len(memory)) if memory else 0,
+                "tenant_bytes_max": max(memory, default=0),
+            }
+
+        return await self._measured("*report*", report)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "tenants": sorted(self.tenants),
+            "reply_queues": self.dispatcher.stats(),
+            "debounce": self.debouncer.stats(),
+            "message_writes": self.message_writer.stats(),
+        }
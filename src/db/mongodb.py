@@ -1,6 +1,8 @@
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Optional
 
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
 
 from src.config.config import config
 
@@ -21,11 +23,13 @@ class MongoDBManager:
         except Exception as e:
             return False
 
-    async def create_index(self, collection: str, index_fields: List, unique: bool = False) -> bool:
+    async def create_index(
+        self, collection: str, index_fields: List, unique: bool = False, **options: Any
+    ) -> bool:
         try:
             if self.db is None:
                 return False
-            await self.db[collection].create_index(index_fields, unique=unique)
+            await self.db[collection].create_index(index_fields, unique=unique, **options)
             return True
         except Exception as e:
             return False
@@ -48,6 +52,27 @@ class MongoDBManager:
         except Exception as e:
             return 0
 
+    async def insert_many_ignore_duplicates(
+        self, collection: str, documents: List[Dict]
+    ) -> Dict[str, int]:
+        """Unordered insert in one round trip. Documents that violate a unique
+        index are skipped instead of failing the batch."""
+        result = {"inserted": 0, "duplicates": 0, "failed": 0}
+        try:
+            if self.db is None or not documents:
+                result["failed"] = len(documents)
+                return result
+            inserted = await self.db[collection].insert_many(documents, ordered=False)
+            result["inserted"] = len(inserted.inserted_ids)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            result["inserted"] = e.details.get("nInserted", 0)
+            result["duplicates"] = sum(1 for error in errors if error.get("code") == 11000)
+            result["failed"] = len(documents) - result["inserted"] - result["duplicates"]
+        except Exception as e:
+            result["failed"] = len(documents)
+        return result
+
     async def find_one(self, collection: str, filter_dict: Dict) -> Optional[Dict]:
         try:
             if self.db is None:
@@ -97,6 +122,27 @@ class MongoDBManager:
         except Exception as e:
             return False
 
+    async def find_one_and_update(
+        self,
+        collection: str,
+        filter_dict: Dict,
+        update_dict: Dict,
+        upsert: bool = False,
+    ) -> Optional[Dict]:
+        """Atomically update the first match and return it after the update.
+        Returns None when nothing matched, or when an upsert hit a unique index."""
+        try:
+            if self.db is None:
+                return None
+            return await self.db[collection].find_one_and_update(
+                filter_dict,
+                {"$set": update_dict},
+                upsert=upsert,
+                return_document=ReturnDocument.AFTER,
+            )
+        except Exception as e:
+            return None
+
     async def update_many(self, collection: str, filter_dict: Dict, update_dict: Dict) -> int:
         try:
             if self.db is None:
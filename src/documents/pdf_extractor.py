@@ -0,0 +1,159 @@
+import asyncio
+from collections import deque
+import multiprocessing
+from multiprocessing.pool import Pool
+import os
+import threading
+from typing import AsyncIterator, Deque, Dict, Optional, Tuple
+
+import PyPDF2
+
+from src.logs.logs import logger
+
+# Worker-side reader cache. Each pool process opens a document once and
+# reuses the parsed reader for every page it is asked to extract. In the
+# thread path several pages of one document are extracted at once, and a
+# PdfReader seeks one shared stream, so every use of the cache holds the lock.
+# PyPDF2 is pure Python, so this costs no parallelism under the GIL.
+_READERS: Dict[Tuple[str, float], PyPDF2.PdfReader] = {}
+_READERS_LOCK = threading.RLock()
+_MAX_CACHED_READERS = 2
+
+
+def _reader(pdf_path: str) -> PyPDF2.PdfReader:
+    """Callers must hold ``_READERS_LOCK``."""
+    key = (pdf_path, os.path.getmtime(pdf_path))
+    reader = _READERS.get(key)
+    if reader is None:
+        if len(_READERS) >= _MAX_CACHED_READERS:
+            _READERS.clear()
+        reader = PyPDF2.PdfReader(pdf_path)
+        _READERS[key] = reader
+    return reader
+
+
+def count_pages(pdf_path: str) -> int:
+    with _READERS_LOCK:
+        return len(_reader(pdf_path).pages)
+
+
+def extract_page(pdf_path: str, page_number: int) -> str:
+    with _READERS_LOCK:
+        return _reader(pdf_path).pages[page_number - 1].extract_text() or ""
+
+
+class PDFTextExtractor:
+    """Extracts PDF text page by page, in page order, without loading it all.
+
+    Documents with at least ``process_pool_min_pages`` pages are spread over a
+    pool of worker processes; smaller ones use a thread. At most
+    ``read_ahead`` pages are extracted ahead of the consumer. A page that
+    takes longer than ``page_timeout`` seconds is skipped. Pool workers stuck
+    on it are terminated and the pool is replaced; pages other documents
+    still had in flight on the old pool are resubmitted to the new one.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        page_timeout: float = 30,
+        process_pool_min_pages: int = 20,
+        read_ahead: Optional[int] = None,
+    ) -> None:
+        self.max_workers = max(1, max_workers)
+        self.page_timeout = page_timeout
+        self.process_pool_min_pages = process_pool_min_pages
+        self.read_ahead = read_ahead or self.max_workers * 2
+        self._pool: Optional[Pool] = None
+        # Unresolved pool pages of every caller, so a pool reset can resubmit them.
+        self._in_pool: Dict[asyncio.Future, Tuple[str, int]] = {}
+
+    def _get_pool(self) -> Pool:
+        if self._pool is None:
+            # spawn, not fork: the parent runs an event loop and client threads.
+            self._pool = multiprocessing.get_context("spawn").Pool(self.max_workers)
+        return self._pool
+
+    def _reset_pool(self) -> None:
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool = None
+        for future, (pdf_path, page_number) in list(self._in_pool.items()):
+            self._apply(future, pdf_path, page_number)
+
+    def _apply(self, future: asyncio.Future, pdf_path: str, page_number: int) -> None:
+        loop = future.get_loop()
+
+        def resolve(result: str) -> None:
+            if not future.done():
+                future.set_result(result)
+
+        def reject(error: BaseException) -> None:
+            if not future.done():
+                future.set_exception(error)
+
+        self._get_pool().apply_async(
+            extract_page,
+            (pdf_path, page_number),
+            callback=lambda result: loop.call_soon_threadsafe(resolve, result),
+            error_callback=lambda error: loop.call_soon_threadsafe(reject, error),
+        )
+
+    def _submit(self, pdf_path: str, page_number: int, use_pool: bool) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        if not use_pool:
+            return asyncio.ensure_future(asyncio.to_thread(extract_page, pdf_path, page_number))
+
+        future: asyncio.Future = loop.create_future()
+        self._in_pool[future] = (pdf_path, page_number)
+        future.add_done_callback(lambda done: self._in_pool.pop(done, None))
+        self._apply(future, pdf_path, page_number)
+        return future
+
+    async def iter_pages(self, pdf_path: str) -> AsyncIterator[Tuple[int, str]]:
+        if not os.path.exists(pdf_path):
+            raise FileNotFoundError(f"PDF file not found: {pdf_path}")
+
+        page_count = await asyncio.to_thread(count_pages, pdf_path)
+        use_pool = page_count >= self.process_pool_min_pages
+        logger.info(
+            f"Extracting {page_count} pages from {pdf_path} "
+            f"({'process pool' if use_pool else 'thread'})"
+        )
+
+        pending: Deque[Tuple[int, asyncio.Future]] = deque()
+        next_page = 1
+
+        def fill() -> None:
+            nonlocal next_page
+            while next_page <= page_count and len(pending) < self.read_ahead:
+                pending.append((next_page, self._submit(pdf_path, next_page, use_pool)))
+                next_page += 1
+
+        fill()
+        try:
+            while pending:
+                page_number, future = pending.popleft()
+                try:
+                    text = await asyncio.wait_for(future, timeout=self.page_timeout)
+                except asyncio.TimeoutError:
+                    logger.error(f"Timed out extracting page {page_number} of {pdf_path}")
+                    text = ""
+                    if use_pool:
+                        # The stuck worker can only be stopped by replacing the
+                        # pool. wait_for cancelled this page's future, so only
+                        # the pages still wanted are resubmitted.
+                        self._reset_pool()
+                except Exception as e:
+                    logger.error(f"Failed to extract page {page_number} of {pdf_path}: {e}")
+                    text = ""
+                fill()
+                yield page_number, text
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool = None
@@ -0,0 +1,168 @@
+from dataclasses import asdict, dataclass
+import re
+from typing import Any, Dict, List, Optional
+
+from src.config.config import config
+from src.llm.tokens import CHARS_PER_TOKEN, estimate_tokens
+from src.logs.logs import logger
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+@dataclass
+class PromptReport:
+    budget: int
+    fixed_tokens: int = 0
+    context_tokens: int = 0
+    history_tokens: int = 0
+    chunks_in: int = 0
+    chunks_duplicate: int = 0
+    chunks_used: int = 0
+    history_in: int = 0
+    history_used: int = 0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.fixed_tokens + self.context_tokens + self.history_tokens
+
+
+@dataclass
+class PromptContext:
+    message: str
+    search_results: str
+    recent_messages: str
+    report: PromptReport
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if estimate_tokens(text) <= max_tokens:
+        return text
+    cut = text[: max_tokens * CHARS_PER_TOKEN]
+    while cut and estimate_tokens(cut + " …") > max_tokens:
+        cut = cut[: int(len(cut) * 0.9)]
+    return cut.rsplit(" ", 1)[0] + " …" if " " in cut else cut + " …"
+
+
+class ContextBuilder:
+    """Fits retrieved chunks and chat history into a prompt token budget.
+
+    The template and the message itself are always sent. What remains of
+    ``max_prompt_tokens`` is shared between knowledge base context
+    (``context_share``) and history, and either side may use what the other
+    leaves unused. Chunks are deduplicated and added best score first. History
+    is kept newest first, and older messages that do not fit are dropped and
+    replaced by a one-line note.
+    """
+
+    OMITTED_NOTE_TOKENS = 8
+
+    def __init__(
+        self,
+        max_prompt_tokens: int = config.PROMPT_MAX_TOKENS,
+        context_share: float = 0.6,
+        max_history_message_tokens: int = 200,
+        template: str = "",
+    ) -> None:
+        self.max_prompt_tokens = max_prompt_tokens
+        self.context_share = context_share
+        self.max_history_message_tokens = max_history_message_tokens
+        self.template_tokens = estimate_tokens(template)
+        self.requests = 0
+        self.total_prompt_tokens = 0
+        self.max_seen_prompt_tokens = 0
+
+    @staticmethod
+    def _normalize(text: str) -> str:
+        return _WHITESPACE.sub(" ", text).strip().lower()
+
+    def _select_chunks(
+        self, search_results: List[Dict[str, Any]], budget: int, report: PromptReport
+    ) -> List[str]:
+        ranked = sorted(search_results, key=lambda r: r.get("score") or 0.0, reverse=True)
+        kept: List[str] = []
+        kept_normalized: List[str] = []
+        used = 0
+        for result in ranked:
+            text = (result.get("text") or "").strip()
+            normalized = self._normalize(text)
+            if not normalized:
+                continue
+            # Overlapping chunks from the same document often contain each other.
+            if any(normalized in other or other in normalized for other in kept_normalized):
+                report.chunks_duplicate += 1
+                continue
+            tokens = estimate_tokens(text)
+            if used + tokens > budget:
+                continue
+            kept.append(text)
+            kept_normalized.append(normalized)
+            used += tokens
+        report.context_tokens = used
+        report.chunks_used = len(kept)
+        return kept
+
+    def _select_history(
+        self, recent_messages: List[Dict[str, Any]], budget: int, report: PromptReport
+    ) -> List[str]:
+        kept: List[str] = []
+        used = 0
+        for message in reversed(recent_messages):
+            text = (message.get("text") or "").strip()
+            if not text:
+                continue
+            text = truncate_to_tokens(text, self.max_history_message_tokens)
+            tokens = estimate_tokens(text)
+            # Leave room for the note about omitted messages.
+            if used + tokens > budget - self.OMITTED_NOTE_TOKENS:
+                break
+            kept.append(text)
+            used += tokens
+        kept.reverse()
+
+        omitted = sum(1 for m in recent_messages if (m.get("text") or "").strip()) - len(kept)
+        if omitted > 0:
+            kept.insert(0, f"({omitted} earlier messages omitted)")
+            used += estimate_tokens(kept[0])
+        report.history_tokens = used
+        report.history_used = len(kept) - (1 if omitted > 0 else 0)
+        return kept
+
+    def build(
+        self,
+        message: str,
+        search_results: Optional[List[Dict[str, Any]]] = None,
+        recent_messages: Optional[List[Dict[str, Any]]] = None,
+    ) -> PromptContext:
+        search_results = search_results or []
+        recent_messages = recent_messages or []
+        report = PromptReport(
+            budget=self.max_prompt_tokens,
+            chunks_in=len(search_results),
+            history_in=len(recent_messages),
+        )
+
+        message = truncate_to_tokens(message, self.max_prompt_tokens // 4)
+        report.fixed_tokens = self.template_tokens + estimate_tokens(message)
+        remaining = max(0, self.max_prompt_tokens - report.fixed_tokens)
+
+        chunks = self._select_chunks(search_results, int(remaining * self.context_share), report)
+        history = self._select_history(recent_messages, remaining - report.context_tokens, report)
+
+        self.requests += 1
+        self.total_prompt_tokens += report.total_tokens
+        self.max_seen_prompt_tokens = max(self.max_seen_prompt_tokens, report.total_tokens)
+        logger.info(f"Prompt size: {report.total_tokens}/{report.budget} tokens {asdict(report)}")
+
+        return PromptContext(
+            message=message,
+            search_results="\n- ".join(chunks),
+            recent_messages="\n- ".join(history),
+            report=report,
+        )
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "avg_prompt_tokens": self.total_prompt_tokens / self.requests if self.requests else 0,
+            "max_prompt_tokens": self.max_seen_prompt_tokens,
+        }
@@ -0,0 +1,299 @@
+import asyncio
+from dataclasses import dataclass
+from enum import IntEnum
+import itertools
+import random
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import httpx
+import openai
+
+from src.config.config import config
+from src.llm.tokens import estimate_tokens
+from src.logs.logs import logger
+
+
+class Priority(IntEnum):
+    REALTIME = 0
+    BACKGROUND = 1
+
+
+@dataclass
+class ModelLimits:
+    requests_per_minute: int
+    tokens_per_minute: int
+
+
+def parse_model_limits(value: str) -> Dict[str, ModelLimits]:
+    """Parses ``model=requests:tokens`` pairs separated by commas."""
+    limits: Dict[str, ModelLimits] = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        model, _, numbers = item.partition("=")
+        requests, _, tokens = numbers.partition(":")
+        limits[model.strip()] = ModelLimits(int(requests), int(tokens))
+    return limits
+
+
+class TokenBucket:
+    def __init__(self, per_minute: int) -> None:
+        self.capacity = float(max(1, per_minute))
+        self.rate = self.capacity / 60
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _ModelBuckets:
+    def __init__(self, limits: ModelLimits) -> None:
+        self.requests = TokenBucket(limits.requests_per_minute)
+        self.tokens = TokenBucket(limits.tokens_per_minute)
+
+    def wait_time(self, tokens: int) -> float:
+        return max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+
+    def consume(self, tokens: int) -> None:
+        self.requests.consume(1)
+        self.tokens.consume(tokens)
+
+
+class LLMGateway:
+    """Process-wide entry point for chat completions.
+
+    Clients are shared per (base_url, api_key) over one pooled HTTP client.
+    Every request is admitted through per-model request and token buckets and
+    a global concurrency limit. Waiting requests are admitted in priority
+    order, so real-time replies overtake background work. Rate limit, timeout
+    and 5xx errors are retried with jittered exponential backoff.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = config.LLM_MAX_CONNECTIONS,
+        max_concurrency: int = config.LLM_MAX_CONCURRENCY,
+        default_limits: Optional[ModelLimits] = None,
+        model_limits: Optional[Dict[str, ModelLimits]] = None,
+        max_retries: int = config.LLM_MAX_RETRIES,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        default_completion_tokens: int = 500,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.default_limits = default_limits or ModelLimits(
+            config.LLM_REQUESTS_PER_MINUTE, config.LLM_TOKENS_PER_MINUTE
+        )
+        self.model_limits = (
+            model_limits
+            if model_limits is not None
+            else parse_model_limits(config.LLM_MODEL_LIMITS)
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.default_completion_tokens = default_completion_tokens
+        self._http_limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._clients: Dict[Tuple[Optional[str], str], openai.AsyncOpenAI] = {}
+        self._buckets: Dict[str, _ModelBuckets] = {}
+        self._waiters: List[Tuple[int, int, asyncio.Future, str, int]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._changed: Optional[asyncio.Event] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+        self.retries = 0
+        self.rate_limited = 0
+
+    def client(self, api_key: str, base_url: Optional[str] = None) -> openai.AsyncOpenAI:
+        key = (base_url, api_key)
+        if key not in self._clients:
+            if self._http_client is None:
+                self._http_client = httpx.AsyncClient(
+                    limits=self._http_limits, timeout=httpx.Timeout(60.0, connect=10.0)
+                )
+            # Retries are handled here so they go back through admission control.
+            self._clients[key] = openai.AsyncOpenAI(
+                api_key=api_key, base_url=base_url, http_client=self._http_client, max_retries=0
+            )
+        return self._clients[key]
+
+    def _model_buckets(self, model: str) -> _ModelBuckets:
+        if model not in self._buckets:
+            self._buckets[model] = _ModelBuckets(self.model_limits.get(model, self.default_limits))
+        return self._buckets[model]
+
+    def _estimate_tokens(self, kwargs: Dict[str, Any]) -> int:
+        prompt = 0
+        for message in kwargs.get("messages", []):
+            content = message.get("content", "")
+            if isinstance(content, list):
+                content = " ".join(part.get("text", "") for part in content)
+            prompt += estimate_tokens(content)
+        completion = kwargs.get("max_tokens") or kwargs.get("max_completion_tokens")
+        return prompt + (completion or self.default_completion_tokens)
+
+    def _notify(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop = loop
+            self._changed = asyncio.Event()
+            self._dispatcher = None
+        assert self._changed is not None
+        self._changed.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+    async def _dispatch(self) -> None:
+        assert self._changed is not None
+        while self._waiters:
+            self._changed.clear()
+            next_wait: Optional[float] = None
+            blocked_models = set()
+            for waiter in sorted(self._waiters):
+                _, _, future, model, tokens = waiter
+                if future.done():
+                    self._waiters.remove(waiter)
+                    continue
+                if self._in_flight >= self.max_concurrency:
+                    break
+                # Lower-priority requests for a throttled model may not overtake.
+                if model in blocked_models:
+                    continue
+                buckets = self._model_buckets(model)
+                wait = buckets.wait_time(tokens)
+                if wait > 0:
+                    blocked_models.add(model)
+                    next_wait = wait if next_wait is None else min(next_wait, wait)
+                    continue
+                buckets.consume(tokens)
+                self._in_flight += 1
+                self._waiters.remove(waiter)
+                future.set_result(None)
+            if not self._waiters:
+                break
+            try:
+                await asyncio.wait_for(self._changed.wait(), timeout=next_wait)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _acquire(self, model: str, tokens: int, priority: Priority) -> None:
+        future = asyncio.get_running_loop().create_future()
+        self._waiters.append((int(priority), next(self._sequence), future, model, tokens))
+        self._notify()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self._release(model, tokens, None)
+            raise
+
+    def _release(self, model: str, estimated: int, actual: Optional[int]) -> None:
+        self._in_flight -= 1
+        if actual is not None and actual < estimated:
+            self._model_buckets(model).tokens.refund(estimated - actual)
+        if self._waiters:
+            self._notify()
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                return min(float(retry_after), self.backoff_max)
+            except ValueError:
+                pass
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+            return True
+        return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+    async def _create(
+        self, client: openai.AsyncOpenAI, priority: Priority, kwargs: Dict[str, Any]
+    ) -> Tuple[Any, int]:
+        model = kwargs["model"]
+        tokens = self._estimate_tokens(kwargs)
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(model, tokens, priority)
+            try:
+                return await client.chat.completions.create(**kwargs), tokens
+            except asyncio.CancelledError:
+                # The slot must be returned or it is lost for good.
+                self._release(model, tokens, None)
+                raise
+            except Exception as e:
+                self._release(model, tokens, None)
+                if isinstance(e, openai.RateLimitError):
+                    self.rate_limited += 1
+                if attempt == self.max_retries or not self._is_retryable(e):
+                    raise
+                delay = self._retry_delay(attempt, e)
+                self.retries += 1
+                logger.warning(
+                    f"LLM request to {model} failed ({str(e)}), retrying in {delay:.1f}s"
+                )
+                await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    async def chat_completion(
+        self,
+        client: openai.AsyncOpenAI,
+        priority: Priority = Priority.REALTIME,
+        **kwargs: Any,
+    ) -> Any:
+        response, tokens = await self._create(client, priority, kwargs)
+        usage = getattr(response, "usage", None)
+        self._release(kwargs["model"], tokens, getattr(usage, "total_tokens", None))
+        return response
+
+    async def chat_completion_stream(
+        self,
+        client: openai.AsyncOpenAI,
+        priority: Priority = Priority.REALTIME,
+        **kwargs: Any,
+    ) -> AsyncIterator[Any]:
+        """Streams completion chunks. The concurrency slot is held until the
+        stream is exhausted; only opening the stream is retried."""
+        stream, tokens = await self._create(client, priority, {**kwargs, "stream": True})
+        try:
+            async for chunk in stream:
+                yield chunk
+        finally:
+            self._release(kwargs["model"], tokens, None)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self._in_flight,
+            "waiting": sum(1 for waiter in self._waiters if not waiter[2].done()),
+            "retries": self.retries,
+            "rate_limited": self.rate_limited,
+        }
+
+    async def close(self) -> None:
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+        self._clients.clear()
+
+
+llm_gateway = LLMGateway()
@@ -0,0 +1,36 @@
+import re
+from typing import List
+
+_CODE_FENCE = re.compile(r"^```(?:html)?\s*|\s*```$", flags=re.DOTALL)
+_TAG = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9-]*)[^<>]*?(/?)>")
+_PARTIAL_ENTITY = re.compile(r"&#?[a-zA-Z0-9]{0,8}$")
+_VOID_TAGS = {"br", "hr", "img"}
+
+
+def strip_code_fences(text: str) -> str:
+    return _CODE_FENCE.sub("", text.strip()).strip()
+
+
+def close_open_tags(html: str) -> str:
+    """Makes a partial HTML response safe to send with parse_mode="html".
+
+    A trailing tag or entity that is still being generated is cut off and
+    every tag left open is closed in reverse order.
+    """
+    last_open = html.rfind("<")
+    if last_open > html.rfind(">"):
+        html = html[:last_open]
+    html = _PARTIAL_ENTITY.sub("", html)
+
+    stack: List[str] = []
+    for match in _TAG.finditer(html):
+        closing, name, self_closing = match.group(1), match.group(2).lower(), match.group(3)
+        if name in _VOID_TAGS or self_closing:
+            continue
+        if not closing:
+            stack.append(name)
+        elif name in stack:
+            while stack:
+                if stack.pop() == name:
+                    break
+    return html + "".join(f"</{name}>" for name in reversed(stack))
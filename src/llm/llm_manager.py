@@ -1,11 +1,12 @@
 import base64
 from enum import Enum
-import re
+from typing import Any, AsyncIterator, Dict, List
 
 import aiofiles
-import openai
 
 from src.config.config import config
+from src.llm.gateway import Priority, llm_gateway
+from src.llm.html import strip_code_fences
 from src.logs.logs import logger
 
 
@@ -47,53 +48,137 @@ Take care of the following points:
 \n===============\n Context: {search_results} \n===============\n Recent messages: {recent_messages}
 """
 
+CONVERSATION_SUMMARY_PROMPT = """Update the running summary of a chat conversation with the new messages below.
+Keep names, questions that were asked, answers and commitments that were given, and anything still unresolved.
+Drop greetings and small talk. Write plain text of at most 150 words and return only the updated summary.
+
+Current summary: {summary}
+
+New messages:
+{transcript}
+"""
+
 
 class LLMManager:
     def __init__(self):
         if config.SERVICE == Service.OPENAI_API.value:
             self.api_key = config.OPENAI_API_KEY
-            self.client = openai.AsyncOpenAI(api_key=self.api_key)
+            self.client = llm_gateway.client(api_key=self.api_key)
             self.model = Model.GPT_5.value
 
         elif config.SERVICE == Service.AI_ML_API.value:
             self.ai_ml_api_key = config.AI_ML_API_KEY
-            self.client = openai.AsyncOpenAI(
-                base_url="https://api.aimlapi.com/v1", api_key=self.ai_ml_api_key
+            self.client = llm_gateway.client(
+                api_key=self.ai_ml_api_key, base_url="https://api.aimlapi.com/v1"
             )
             self.model = Model.GPT_5_CHAT_AI_ML_API.value
         self.max_tokens = 500
         self.top_p = 0.1
         self.temperature = 1
 
+    def _response_messages(
+        self, text: str, search_results: str, recent_messages: str
+    ) -> List[Dict[str, str]]:
+        prompt = f"""
+                Give a proper next response to the message.
+                
+                Text: "{text}"
+                """
+        return [
+            {
+                "role": "user",
+                "content": INTELLIGENT_RESPONSE_PROMPT_BUILDER.format(
+                    search_results=search_results, recent_messages=recent_messages
+                ),
+            },
+            {"role": "user", "content": prompt},
+        ]
+
     async def generate_response(
         self,
         text: str,
         search_results: str,
         recent_messages: str,
+        priority: Priority = Priority.REALTIME,
     ) -> str:
         try:
             if not self.client:
                 logger.error("OpenAI client not initialized")
                 return ""
 
-            prompt = f"""
-                Give a proper next response to the message.
-                
-                Text: "{text}"
-                """
+            response = await llm_gateway.chat_completion(
+                self.client,
+                priority=priority,
+                model=self.model,
+                messages=self._response_messages(text, search_results, recent_messages),
+                temperature=self.temperature,
+            )
+
+            result = (
+                response.choices[0].message.content.strip()
+                if response.choices[0].message.content
+                else ""
+            )
 
-            response = await self.client.chat.completions.create(
+            logger.info(f"Result: {result}")
+
+            return strip_code_fences(result)
+        except Exception as e:
+            logger.error(f"Error in LLM response generation: {str(e)}")
+            return ""
+
+    async def generate_response_stream(
+        self,
+        text: str,
+        search_results: str,
+        recent_messages: str,
+        priority: Priority = Priority.REALTIME,
+    ) -> AsyncIterator[str]:
+        """Yields the response as content deltas while it is being generated."""
+        try:
+            if not self.client:
+                logger.error("OpenAI client not initialized")
+                return
+
+            stream = llm_gateway.chat_completion_stream(
+                self.client,
+                priority=priority,
+                model=self.model,
+                messages=self._response_messages(text, search_results, recent_messages),
+                temperature=self.temperature,
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            logger.error(f"Error in LLM response streaming: {str(e)}")
+
+    async def summarize_conversation(
+        self,
+        summary: str,
+        turns: List[Dict[str, Any]],
+        priority: Priority = Priority.BACKGROUND,
+    ) -> str:
+        try:
+            if not self.client:
+                logger.error("OpenAI client not initialized")
+                return ""
+
+            transcript = "\n".join(
+                f"{turn.get('sender_name', 'Unknown')}: {turn.get('text', '')}" for turn in turns
+            )
+            response = await llm_gateway.chat_completion(
+                self.client,
+                priority=priority,
                 model=self.model,
                 messages=[
                     {
                         "role": "user",
-                        "content": INTELLIGENT_RESPONSE_PROMPT_BUILDER.format(
-                            search_results=search_results, recent_messages=recent_messages
+                        "content": CONVERSATION_SUMMARY_PROMPT.format(
+                            summary=summary or "(none)", transcript=transcript
                         ),
-                    },
-                    {"role": "user", "content": prompt},
+                    }
                 ],
-                temperature=self.temperature,
             )
 
             result = (
@@ -101,16 +186,15 @@ class LLMManager:
                 if response.choices[0].message.content
                 else ""
             )
-
-            logger.info(f"Result: {result}")
-
-            cleaned = re.sub(r"^```(?:html)?\s*|\s*```$", "", result, flags=re.DOTALL).strip()
-            return cleaned
+            logger.info(f"Conversation summary: {result}")
+            return result
         except Exception as e:
-            logger.error(f"Error in LLM response generation: {str(e)}")
+            logger.error(f"Error in conversation summary: {str(e)}")
             return ""
 
-    async def image_descriptor(self, image_base64: str) -> str:
+    async def image_descriptor(
+        self, image_base64: str, priority: Priority = Priority.BACKGROUND
+    ) -> str:
         try:
             if not self.client:
                 logger.error("OpenAI client not initialized")
@@ -118,7 +202,9 @@ class LLMManager:
 
             prompt = "Describe the contents of this image in detail."
 
-            response = await self.client.chat.completions.create(
+            response = await llm_gateway.chat_completion(
+                self.client,
+                priority=priority,
                 model=self.model,
                 messages=[
                     {
@@ -0,0 +1,16 @@
+import math
+import re
+
+# OpenAI's rule of thumb for English text is ~4 characters per token. Short
+# texts made mostly of numbers, codes or punctuation tokenize worse than that,
+# so we also count word/symbol pieces and take whichever estimate is larger.
+CHARS_PER_TOKEN = 4
+_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    if not text:
+        return 0
+    by_chars = math.ceil(len(text) / CHARS_PER_TOKEN)
+    by_pieces = len(_PIECE_PATTERN.findall(text))
+    return max(by_chars, by_pieces)
@@ -0,0 +1,170 @@
+from collections import deque
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import secrets
+import time
+from typing import Any, Deque, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.config.config import config
+from src.logs.logs import logger
+
+try:
+    from opentelemetry import trace as otel_trace
+except ImportError:
+    otel_trace = None
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def duration_ms(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The span in OTLP/JSON field names, as accepted by OpenTelemetry collectors."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [
+                {"key": key, "value": {"stringValue": str(value)}}
+                for key, value in self.attributes.items()
+            ],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+
+
+class LatencyHistogram:
+    """Durations of the most recent ``window`` calls of one stage."""
+
+    def __init__(self, window: int) -> None:
+        self.samples: Deque[float] = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+    def record(self, duration_ms: float, error: bool = False) -> None:
+        self.samples.append(duration_ms)
+        self.count += 1
+        self.errors += int(error)
+
+    def summary(self) -> Dict[str, float]:
+        values = np.fromiter(self.samples, dtype=np.float64)
+        p50, p95, p99 = np.percentile(values, [50, 95, 99]) if values.size else (0, 0, 0)
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "p50_ms": round(float(p50), 2),
+            "p95_ms": round(float(p95), 2),
+            "p99_ms": round(float(p99), 2),
+            "max_ms": round(float(values.max()), 2) if values.size else 0,
+        }
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Nested timing spans for the stages of a request.
+
+    The active span lives in a context variable, so spans opened inside a
+    span, including in awaited coroutines, become its children. Attributes of
+    a span (organization, chat) are inherited by its children. Every finished
+    span feeds the latency histogram of its name, and the last
+    ``keep_spans`` spans are kept in OTLP/JSON form. When the OpenTelemetry
+    API is installed, each span is also mirrored as an OpenTelemetry span,
+    so any configured SDK exporter receives them.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = config.TRACING_ENABLED,
+        window: int = config.TRACING_WINDOW,
+        keep_spans: int = 1000,
+        export_otel: bool = True,
+    ) -> None:
+        self.enabled = enabled
+        self.window = window
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self.finished: Deque[Span] = deque(maxlen=keep_spans)
+        self._otel = (
+            otel_trace.get_tracer("personal_assistant") if export_otel and otel_trace else None
+        )
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+        if not self.enabled:
+            yield None
+            return
+
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            start_ns=time.time_ns(),
+            attributes={**(parent.attributes if parent else {}), **attributes},
+        )
+        token = _current_span.set(span)
+        try:
+            with ExitStack() as stack:
+                if self._otel is not None:
+                    stack.enter_context(
+                        self._otel.start_as_current_span(
+                            name, attributes={k: str(v) for k, v in span.attributes.items()}
+                        )
+                    )
+                yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {str(e)}"
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            self._finish(span)
+
+    def _finish(self, span: Span) -> None:
+        histogram = self.histograms.get(span.name)
+        if histogram is None:
+            histogram = self.histograms[span.name] = LatencyHistogram(self.window)
+        histogram.record(span.duration_ms, error=span.error is not None)
+        self.finished.append(span)
+        if span.parent_id is None:
+            logger.debug(f"Trace {span.trace_id} {span.name} took {span.duration_ms:.1f}ms")
+
+    def current_span(self) -> Optional[Span]:
+        return _current_span.get()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {name: histogram.summary() for name, histogram in sorted(self.histograms.items())}
+
+    def recent_spans(
+        self, limit: int = 100, organization_id: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        spans = [
+            span
+            for span in self.finished
+            if organization_id is None or span.attributes.get("organization_id") == organization_id
+        ]
+        return [span.to_otlp() for span in spans[-limit:]]
+
+
+tracer = Tracer()
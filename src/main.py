@@ -1,7 +1,15 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
+from src.auth.tokens import get_current_org
+from src.core.rag.embedding_backends import embedding_backend
+from src.core.rag.rerank import reranker
+from src.core.tasks.background_task_manager import background_task_manager
+from src.llm.gateway import llm_gateway
+from src.logs.tracing import tracer
 from src.routers import (
     auth_router,
     background_tasks_router,
@@ -9,11 +17,27 @@ from src.routers import (
     file_router,
     organization_router,
 )
+from src.routers.files import file_controller
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Load a local embedding model before the first message needs it.
+    await embedding_backend.warmup()
+    await file_controller.job_manager.start()
+    yield
+    await file_controller.job_manager.stop()
+    await background_task_manager.shutdown()
+    await llm_gateway.close()
+    if reranker:
+        reranker.close()
+
 
 app = FastAPI(
     title="Personal Assistant API",
     description="API for Personal assistant and real-time message handling",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 app.add_middleware(
@@ -41,3 +65,13 @@ async def root():
 @app.get("/health")
 async def health_check():
     return JSONResponse(content={"status": "healthy"})
+
+
+@app.get("/metrics/latency", dependencies=[Depends(get_current_org)])
+async def latency_metrics():
+    return JSONResponse(content=tracer.stats())
+
+
+@app.get("/metrics/runtime", dependencies=[Depends(get_current_org)])
+async def runtime_metrics():
+    return JSONResponse(content=await background_task_manager.memory_report())
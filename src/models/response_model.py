@@ -1,6 +1,30 @@
+from datetime import datetime
+from typing import List, Optional
+
 from pydantic import BaseModel
 
 
 class FileUploadResponse(BaseModel):
     filename: str
     message: str
+    job_id: Optional[str] = None
+    status: Optional[str] = None
+
+
+class IngestionJobResponse(BaseModel):
+    job_id: str
+    filename: Optional[str] = None
+    file_type: str
+    status: str
+    batches_committed: int = 0
+    chunks_committed: int = 0
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+class IngestionJobsListResponse(BaseModel):
+    success: bool
+    jobs: List[IngestionJobResponse] = []
+    total: int = 0
@@ -199,6 +199,11 @@ class BackgroundTaskStatusResponse(BaseModel):
     is_running: Optional[bool] = None
     started_at: Optional[datetime] = None
     stopped_at: Optional[datetime] = None
+    entity_cache: Optional[Dict] = None
+    reply_queues: Optional[Dict] = None
+    debounce: Optional[Dict] = None
+    message_writes: Optional[Dict] = None
+    memory_bytes: Optional[int] = None
 
 
 class BackgroundTasksListResponse(BaseModel):
@@ -43,3 +43,8 @@ async def stop_all_background_tasks(current_org=Depends(get_current_org)):
 @background_tasks_router.get("/stats")
 async def get_tg_stats(current_org=Depends(get_current_org)):
     return await controller.get_tg_stats(current_org)
+
+
+@background_tasks_router.get("/traces")
+async def get_recent_traces(limit: int = 100, current_org=Depends(get_current_org)):
+    return await controller.get_recent_traces(current_org, limit)
@@ -5,13 +5,17 @@ from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
 from src.auth.tokens import get_current_org
 from src.controllers import FileController
 from src.logs.logs import logger
-from src.models.response_model import FileUploadResponse
+from src.models.response_model import (
+    FileUploadResponse,
+    IngestionJobResponse,
+    IngestionJobsListResponse,
+)
 
 file_router = APIRouter()
 file_controller = FileController()
 
 
-@file_router.post("/upload-file/", response_model=FileUploadResponse)
+@file_router.post("/upload-file/", response_model=FileUploadResponse, status_code=202)
 async def upload_file(
     file: UploadFile = File(...),
     file_type: str = Form(...),
@@ -22,15 +26,34 @@ async def upload_file(
         logger.info(f"The file type received is: {file_type}")
         logger.info(f"The description received is: {description}")
 
-        response = await file_controller.process_embeddings(
-            current_org, file, file_type, description
-        )
-        if response is False:
+        if file.filename is None:
             raise HTTPException(status_code=500, detail="Some error occurred while uploading")
 
-        if file.filename is None:
+        job = await file_controller.submit_upload(current_org, file, file_type, description)
+        if job is None:
             raise HTTPException(status_code=500, detail="Some error occurred while uploading")
 
-        return FileUploadResponse(filename=file.filename, message="File is uploaded successfully.")
+        return FileUploadResponse(
+            filename=file.filename,
+            message="File is uploaded and queued for processing.",
+            job_id=job["job_id"],
+            status=job["status"],
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+
+@file_router.get("/jobs/{job_id}", response_model=IngestionJobResponse)
+async def get_ingestion_job(job_id: str, current_org=Depends(get_current_org)):
+    job = await file_controller.get_job(current_org, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return IngestionJobResponse(**job)
+
+
+@file_router.get("/jobs", response_model=IngestionJobsListResponse)
+async def list_ingestion_jobs(limit: int = 50, current_org=Depends(get_current_org)):
+    jobs = await file_controller.list_jobs(current_org, limit=limit)
+    return IngestionJobsListResponse(
+        success=True, jobs=[IngestionJobResponse(**job) for job in jobs], total=len(jobs)
+    )
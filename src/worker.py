@@ -0,0 +1,97 @@
+"""Telegram listener worker process.
+
+Start one or more workers next to the API, each with its own WORKER_ID and
+WORKER_URL, and set WORKER_MODE=control on the API process:
+
+    WORKER_MODE=worker WORKER_ID=worker-1 WORKER_URL=http://127.0.0.1:8101 \\
+        uvicorn src.worker:app --host 0.0.0.0 --port 8101
+
+Organizations are spread over the live workers by consistent hashing. The
+/internal routes are called by the API process only and require the
+X-Worker-Token header to match WORKER_SHARED_SECRET.
+"""
+
+from contextlib import asynccontextmanager
+import hmac
+from typing import List, Optional
+
+from fastapi import Depends, FastAPI, Header, HTTPException
+from pydantic import BaseModel
+
+from src.config.config import config
+from src.core.rag.embedding_backends import embedding_backend
+from src.core.rag.rerank import reranker
+from src.core.tasks.background_task_manager import background_task_manager
+from src.core.tasks.shard_worker import ShardWorker
+from src.llm.gateway import llm_gateway
+from src.logs.tracing import tracer
+
+shard_worker = ShardWorker(background_task_manager)
+
+
+class StartRequest(BaseModel):
+    group_ids: Optional[List[int]] = None
+
+
+def verify_token(x_worker_token: str = Header(default="")):
+    secret = config.WORKER_SHARED_SECRET
+    if not secret or not hmac.compare_digest(x_worker_token, secret):
+        raise HTTPException(status_code=401, detail="Invalid worker token")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await embedding_backend.warmup()
+    await shard_worker.start()
+    yield
+    await shard_worker.stop()
+    await llm_gateway.close()
+    if reranker:
+        reranker.close()
+
+
+app = FastAPI(title="Personal Assistant Telegram worker", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health_check():
+    return {
+        "status": "healthy",
+        "worker_id": shard_worker.worker_id,
+        "tenants": len(background_task_manager.active_tasks),
+    }
+
+
+@app.get("/internal/tasks", dependencies=[Depends(verify_token)])
+async def list_tasks():
+    return await background_task_manager.get_active_tasks()
+
+
+@app.post("/internal/tasks/{organization_id}/start", dependencies=[Depends(verify_token)])
+async def start_task(organization_id: str, request: StartRequest):
+    return await shard_worker.start_task(organization_id, request.group_ids)
+
+
+@app.post("/internal/tasks/{organization_id}/stop", dependencies=[Depends(verify_token)])
+async def stop_task(organization_id: str):
+    return await shard_worker.stop_task(organization_id)
+
+
+@app.get("/internal/tasks/{organization_id}/status", dependencies=[Depends(verify_token)])
+async def task_status(organization_id: str):
+    return await background_task_manager.get_task_status(organization_id)
+
+
+@app.get("/internal/tasks/{organization_id}/traces", dependencies=[Depends(verify_token)])
+async def task_traces(organization_id: str, limit: int = 100):
+    return await background_task_manager.get_recent_traces(organization_id, limit)
+
+
+@app.get("/metrics/latency", dependencies=[Depends(verify_token)])
+async def latency_metrics():
+    return tracer.stats()
+
+
+@app.get("/metrics/runtime", dependencies=[Depends(verify_token)])
+async def runtime_metrics():
+    return await background_task_manager.memory_report()
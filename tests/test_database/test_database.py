@@ -93,3 +93,23 @@ def test_close_success(mongo_manager):
     mongo_manager.close = Mock()
     mongo_manager.close()
     mongo_manager.close.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_insert_many_ignore_duplicates_counts_skipped_documents():
+    from pymongo.errors import BulkWriteError
+
+    with patch("src.db.mongodb.AsyncIOMotorClient", autospec=True):
+        manager = MongoDBManager(mongo_uri="mongodb://test", db_name="test_db")
+    collection = Mock()
+    collection.insert_many = AsyncMock(
+        side_effect=BulkWriteError(
+            {"nInserted": 2, "writeErrors": [{"index": 1, "code": 11000, "errmsg": "dup"}]}
+        )
+    )
+    manager.db = {"messages": collection}
+
+    result = await manager.insert_many_ignore_duplicates("messages", [{}, {}, {}])
+
+    assert result == {"inserted": 2, "duplicates": 1, "failed": 0}
+    assert collection.insert_many.await_args.kwargs["ordered"] is False
@@ -0,0 +1,123 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.documents import pdf_extractor
+from src.documents.pdf_extractor import PDFTextExtractor
+
+
+def write_pdf(path, pages):
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        None,
+        "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    kids = []
+    for text in pages:
+        stream = f"BT /F1 12 Tf 72 720 Td ({text}) Tj ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>"
+
+    body = b"%PDF-1.4\n"
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{obj}\nendobj\n".encode()
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    body += "".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode()
+    body += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF".encode()
+    )
+    path.write_bytes(body)
+    return str(path)
+
+
+@pytest.fixture
+def pdf_path(tmp_path):
+    return write_pdf(tmp_path / "doc.pdf", [f"Page number {i}" for i in range(1, 7)])
+
+
+async def collect(extractor, path):
+    return [page async for page in extractor.iter_pages(path)]
+
+
+@pytest.mark.asyncio
+async def test_pages_yielded_in_order(pdf_path):
+    extractor = PDFTextExtractor(process_pool_min_pages=100, read_ahead=2)
+    pages = await collect(extractor, pdf_path)
+    assert [number for number, _ in pages] == [1, 2, 3, 4, 5, 6]
+    assert all(f"Page number {number}" in text for number, text in pages)
+
+
+@pytest.mark.asyncio
+async def test_process_pool_matches_thread(pdf_path):
+    extractor = PDFTextExtractor(max_workers=2, process_pool_min_pages=1)
+    try:
+        pooled = await collect(extractor, pdf_path)
+    finally:
+        extractor.close()
+    threaded = await collect(PDFTextExtractor(process_pool_min_pages=100), pdf_path)
+    assert pooled == threaded
+
+
+@pytest.mark.asyncio
+async def test_slow_page_is_skipped(pdf_path):
+    original = pdf_extractor.extract_page
+
+    def slow_third_page(path, page_number):
+        if page_number == 3:
+            time.sleep(0.5)
+        return original(path, page_number)
+
+    extractor = PDFTextExtractor(page_timeout=0.1, process_pool_min_pages=100)
+    with patch.object(pdf_extractor, "extract_page", side_effect=slow_third_page):
+        pages = await collect(extractor, pdf_path)
+
+    assert [number for number, _ in pages] == [1, 2, 3, 4, 5, 6]
+    assert pages[2][1] == ""
+    assert "Page number 4" in pages[3][1]
+
+
+@pytest.mark.asyncio
+async def test_missing_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        await collect(PDFTextExtractor(), str(tmp_path / "missing.pdf"))
+
+
+class FakePool:
+    def __init__(self):
+        self.calls = []
+
+    def apply_async(self, func, args, callback, error_callback):
+        self.calls.append((args, callback))
+
+    def terminate(self):
+        pass
+
+
+@pytest.mark.asyncio
+async def test_pool_reset_resubmits_other_documents_pages():
+    extractor = PDFTextExtractor()
+    pools = [FakePool(), FakePool()]
+    with patch.object(extractor, "_get_pool", side_effect=lambda: pools[0]):
+        stuck = extractor._submit("a.pdf", 3, use_pool=True)
+        other = extractor._submit("b.pdf", 1, use_pool=True)
+    stuck.cancel()
+    await asyncio.sleep(0)
+
+    pools.pop(0)
+    with patch.object(extractor, "_get_pool", side_effect=lambda: pools[0]):
+        extractor._reset_pool()
+
+    assert [args for args, _ in pools[0].calls] == [("b.pdf", 1)]
+    pools[0].calls[0][1]("page one")
+    assert await asyncio.wait_for(other, timeout=1) == "page one"
+    assert extractor._in_pool == {}
@@ -0,0 +1,60 @@
+from src.llm.context_builder import ContextBuilder, truncate_to_tokens
+from src.llm.tokens import estimate_tokens
+
+
+def history(n, words=20):
+    return [{"text": f"message {i} " + "word " * words} for i in range(n)]
+
+
+def test_everything_fits_small_budget_untouched():
+    builder = ContextBuilder(max_prompt_tokens=1000)
+    context = builder.build(
+        "when do you open?",
+        search_results=[{"text": "We open at 9.", "score": 0.8}],
+        recent_messages=[{"text": "hi"}, {"text": "hello"}],
+    )
+    assert context.message == "when do you open?"
+    assert context.search_results == "We open at 9."
+    assert context.recent_messages == "hi\n- hello"
+
+
+def test_chunks_are_ranked_and_deduplicated():
+    builder = ContextBuilder(max_prompt_tokens=1000)
+    context = builder.build(
+        "q",
+        search_results=[
+            {"text": "Low score fact.", "score": 0.5},
+            {"text": "We open at 9. We close at 5.", "score": 0.9},
+            {"text": "we open   at 9.", "score": 0.7},
+        ],
+    )
+    assert context.search_results == "We open at 9. We close at 5.\n- Low score fact."
+    assert context.report.chunks_duplicate == 1
+
+
+def test_history_keeps_newest_messages_within_budget():
+    builder = ContextBuilder(max_prompt_tokens=200, context_share=0.5)
+    context = builder.build("q", recent_messages=history(30))
+
+    lines = context.recent_messages.split("\n- ")
+    assert lines[0].endswith("earlier messages omitted)")
+    assert lines[-1].startswith("message 29")
+    assert context.report.total_tokens <= 200
+    assert context.report.history_used < 30
+
+
+def test_context_uses_history_leftover_and_respects_budget():
+    builder = ContextBuilder(max_prompt_tokens=300, template="x " * 50)
+    results = [{"text": f"fact {i} " + "detail " * 30, "score": 1 - i / 10} for i in range(10)]
+    context = builder.build("q", search_results=results, recent_messages=history(10))
+
+    assert context.report.total_tokens <= 300
+    assert context.report.chunks_used >= 1
+    assert builder.stats()["requests"] == 1
+
+
+def test_truncate_to_tokens():
+    text = "word " * 500
+    truncated = truncate_to_tokens(text, 50)
+    assert estimate_tokens(truncated) <= 50
+    assert truncated.endswith("…")
@@ -0,0 +1,149 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import httpx
+import openai
+import pytest
+
+from src.llm.gateway import LLMGateway, ModelLimits, Priority, TokenBucket, parse_model_limits
+
+
+def make_client(side_effect):
+    client = Mock()
+    client.chat.completions.create = AsyncMock(side_effect=side_effect)
+    return client
+
+
+def api_error(cls, status):
+    response = httpx.Response(status, request=httpx.Request("POST", "https://api.test"))
+    return cls("error", response=response, body=None)
+
+
+def completion(total_tokens=10):
+    return SimpleNamespace(usage=SimpleNamespace(total_tokens=total_tokens))
+
+
+def gateway(**kwargs):
+    return LLMGateway(
+        default_limits=ModelLimits(1000, 1_000_000),
+        model_limits={},
+        backoff_base=0.001,
+        **kwargs,
+    )
+
+
+@pytest.mark.asyncio
+async def test_realtime_requests_overtake_background():
+    release = asyncio.Event()
+    order = []
+
+    async def create(**kwargs):
+        order.append(kwargs["messages"][0]["content"])
+        if kwargs["messages"][0]["content"] == "first":
+            await release.wait()
+        return completion()
+
+    llm = gateway(max_concurrency=1)
+    client = make_client(create)
+
+    def call(name, priority):
+        return asyncio.create_task(
+            llm.chat_completion(client, priority=priority, model="m", messages=[{"content": name}])
+        )
+
+    first = call("first", Priority.BACKGROUND)
+    await asyncio.sleep(0.01)
+    background = call("background", Priority.BACKGROUND)
+    realtime = call("realtime", Priority.REALTIME)
+    await asyncio.sleep(0.01)
+    release.set()
+    await asyncio.gather(first, background, realtime)
+
+    assert order == ["first", "realtime", "background"]
+
+
+@pytest.mark.asyncio
+async def test_retries_rate_limit_and_server_errors():
+    llm = gateway()
+    client = make_client(
+        [
+            api_error(openai.RateLimitError, 429),
+            api_error(openai.InternalServerError, 503),
+            completion(),
+        ]
+    )
+
+    await llm.chat_completion(client, model="m", messages=[])
+
+    assert client.chat.completions.create.await_count == 3
+    assert llm.stats()["retries"] == 2
+    assert llm.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_not_retried():
+    llm = gateway()
+    client = make_client([api_error(openai.BadRequestError, 400)])
+
+    with pytest.raises(openai.BadRequestError):
+        await llm.chat_completion(client, model="m", messages=[])
+    assert client.chat.completions.create.await_count == 1
+
+
+@pytest.mark.asyncio
+async def test_stream_holds_slot_until_exhausted():
+    async def chunks():
+        yield "a"
+        yield "b"
+
+    llm = gateway()
+    client = make_client([chunks()])
+
+    stream = llm.chat_completion_stream(client, model="m", messages=[])
+    assert await stream.__anext__() == "a"
+    assert llm.stats()["in_flight"] == 1
+    assert [chunk async for chunk in stream] == ["b"]
+    assert llm.stats()["in_flight"] == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("stream", [False, True])
+async def test_cancelled_request_returns_its_slot(stream):
+    started = asyncio.Event()
+
+    async def hang(**kwargs):
+        started.set()
+        await asyncio.Event().wait()
+
+    llm = gateway(max_concurrency=1)
+    call = llm.chat_completion_stream if stream else llm.chat_completion
+
+    async def request():
+        result = call(make_client(hang), model="m", messages=[])
+        return [chunk async for chunk in result] if stream else await result
+
+    task = asyncio.create_task(request())
+    await started.wait()
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert llm.stats()["in_flight"] == 0
+    response = await asyncio.wait_for(
+        llm.chat_completion(make_client([completion()]), model="m", messages=[]), timeout=1
+    )
+    assert response.usage.total_tokens == 10
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(per_minute=60)
+    bucket.consume(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0, abs=0.05)
+
+
+def test_parse_model_limits():
+    assert parse_model_limits("gpt-5=500:30000, gpt-4.1=10:100") == {
+        "gpt-5": ModelLimits(500, 30000),
+        "gpt-4.1": ModelLimits(10, 100),
+    }
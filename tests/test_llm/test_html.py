@@ -0,0 +1,20 @@
+from src.llm.html import close_open_tags, strip_code_fences
+
+
+def test_closes_open_tags_in_reverse_order():
+    assert close_open_tags("<b>Hours: <i>9-5") == "<b>Hours: <i>9-5</i></b>"
+
+
+def test_drops_partial_tag_and_entity():
+    assert close_open_tags("<b>Price</b> <a hr") == "<b>Price</b> "
+    assert close_open_tags("Fish &am") == "Fish "
+    assert close_open_tags("Fish & chips") == "Fish & chips"
+
+
+def test_void_and_closed_tags_are_left_alone():
+    html = '<b>a</b><br><a href="https://x.y">link</a>'
+    assert close_open_tags(html) == html
+
+
+def test_strip_code_fences():
+    assert strip_code_fences("```html\n<b>hi</b>\n```") == "<b>hi</b>"
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from src.logs.tracing import Tracer
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_awaits_and_inherit_attributes():
+    tracer = Tracer(export_otel=False)
+
+    async def stage(name):
+        with tracer.span(name):
+            await asyncio.sleep(0)
+
+    with tracer.span("request", organization_id="org", chat_id=1) as root:
+        await asyncio.gather(stage("a"), stage("b"))
+
+    spans = {span["name"]: span for span in tracer.recent_spans()}
+    assert spans["a"]["parentSpanId"] == root.span_id  # type: ignore
+    assert spans["b"]["traceId"] == root.trace_id  # type: ignore
+    assert {"key": "chat_id", "value": {"stringValue": "1"}} in spans["a"]["attributes"]
+    assert tracer.current_span() is None
+
+
+def test_histograms_report_percentiles_and_errors():
+    tracer = Tracer(window=100, export_otel=False)
+    for _ in range(10):
+        with tracer.span("stage"):
+            pass
+    with pytest.raises(ValueError):
+        with tracer.span("stage"):
+            raise ValueError("boom")
+
+    stats = tracer.stats()["stage"]
+    assert stats["count"] == 11
+    assert stats["errors"] == 1
+    assert 0 <= stats["p50_ms"] <= stats["p95_ms"] <= stats["p99_ms"] <= stats["max_ms"]
+    assert tracer.recent_spans(1)[0]["status"]["code"] == 2
+
+
+def test_recent_spans_filtered_by_organization():
+    tracer = Tracer(export_otel=False)
+    with tracer.span("request", organization_id="org-1"):
+        pass
+    with tracer.span("request", organization_id="org-2"):
+        pass
+
+    assert len(tracer.recent_spans(organization_id="org-1")) == 1
+
+
+def test_disabled_tracer_records_nothing():
+    tracer = Tracer(enabled=False)
+    with tracer.span("stage") as span:
+        assert span is None
+    assert tracer.stats() == {}
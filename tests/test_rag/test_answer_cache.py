@@ -0,0 +1,87 @@
+from unittest.mock import patch
+
+import pytest
+
+from src.core.rag.answer_cache import SemanticAnswerCache
+
+
+class FakeMongo:
+    def __init__(self):
+        self.versions = {}
+
+    async def find_one(self, collection, filter_dict):
+        return self.versions.get(filter_dict["account_id"])
+
+    async def update_one(self, collection, filter_dict, update_dict, upsert=False):
+        self.versions[filter_dict["account_id"]] = dict(update_dict)
+        return True
+
+
+@pytest.fixture
+def cache():
+    return SemanticAnswerCache(
+        threshold=0.9, ttl=60, max_entries=2, version_refresh_interval=0, mongo_manager=FakeMongo()
+    )
+
+
+@pytest.mark.asyncio
+async def test_similar_query_hits(cache):
+    results = [{"text": "t", "metadata": {"type": "image", "path": "a.png"}}]
+    await cache.store("org", "what are your hours?", [1.0, 0.0, 0.0], "<b>9-5</b>", results)
+
+    hit = await cache.lookup("org", [0.98, 0.1, 0.0])
+    assert hit is not None
+    assert hit.answer == "<b>9-5</b>"
+    assert hit.search_results == results
+
+    assert await cache.lookup("org", [0.0, 1.0, 0.0]) is None
+    assert cache.stats("org") == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1}
+
+
+@pytest.mark.asyncio
+async def test_tenants_are_isolated(cache):
+    await cache.store("org-a", "q", [1.0, 0.0], "answer", [])
+    assert await cache.lookup("org-b", [1.0, 0.0]) is None
+
+
+@pytest.mark.asyncio
+async def test_answers_are_scoped_to_their_chat(cache):
+    await cache.store("org", "what about tomorrow?", [1.0, 0.0], "chat 1 answer", [], scope=1)
+    await cache.store("org", "what about tomorrow?", [0.9, 0.1], "chat 2 answer", [], scope=2)
+
+    assert (await cache.lookup("org", [1.0, 0.0], scope=2)).answer == "chat 2 answer"
+    assert await cache.lookup("org", [1.0, 0.0], scope=3) is None
+
+
+@pytest.mark.asyncio
+async def test_invalidate_on_knowledge_base_change(cache):
+    await cache.store("org", "q", [1.0, 0.0], "answer", [])
+    await cache.invalidate("org")
+    assert await cache.lookup("org", [1.0, 0.0]) is None
+
+
+@pytest.mark.asyncio
+async def test_version_change_from_another_process(cache):
+    await cache.store("org", "q", [1.0, 0.0], "answer", [])
+    cache.mongo_manager.versions["org"] = {"account_id": "org", "version": 123.0}
+    assert await cache.lookup("org", [1.0, 0.0]) is None
+    assert cache.stats("org")["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_entries_are_dropped(cache):
+    await cache.store("org", "q", [1.0, 0.0], "answer", [])
+    with patch("src.core.rag.answer_cache.time.time", return_value=10**12):
+        assert await cache.lookup("org", [1.0, 0.0]) is None
+
+
+@pytest.mark.asyncio
+async def test_least_recently_used_entry_is_evicted(cache):
+    await cache.store("org", "a", [1.0, 0.0, 0.0], "A", [])
+    await cache.store("org", "b", [0.0, 1.0, 0.0], "B", [])
+    await cache.lookup("org", [1.0, 0.0, 0.0])
+    await cache.store("org", "c", [0.0, 0.0, 1.0], "C", [])
+
+    assert (await cache.lookup("org", [1.0, 0.0, 0.0])).answer == "A"
+    assert await cache.lookup("org", [0.0, 1.0, 0.0]) is None
+    assert (await cache.lookup("org", [0.0, 0.0, 1.0])).answer == "C"
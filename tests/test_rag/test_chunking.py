@@ -0,0 +1,47 @@
+import pytest
+
+from src.core.rag.chunking import TokenChunker, WordChunker, get_chunker
+
+TEXT = (
+    "The Urban Net plan costs $49 per month. It includes 200 GB of data. " * 12
+    + "\n\n"
+    + "Product AB-1234 ships in two days. Returns are accepted within 30 days. " * 20
+)
+
+
+def test_token_chunks_respect_budget_and_offsets():
+    chunks = TokenChunker(max_tokens=60, overlap_tokens=20).chunk(TEXT, page=3)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk.token_count <= 60
+        assert chunk.page == 3
+        assert TEXT[chunk.start_offset : chunk.end_offset] == chunk.text
+
+
+def test_token_chunks_overlap_and_end_on_sentences():
+    chunks = TokenChunker(max_tokens=60, overlap_tokens=20).chunk(TEXT)
+
+    for previous, current in zip(chunks, chunks[1:]):
+        assert current.start_offset < previous.end_offset
+        assert previous.text.endswith(".")
+
+
+def test_long_sentence_is_split_on_words():
+    chunks = TokenChunker(max_tokens=10, overlap_tokens=0).chunk("word " * 100)
+    assert all(chunk.token_count <= 10 for chunk in chunks)
+    assert " ".join(chunk.text for chunk in chunks).split() == ["word"] * 100
+
+
+def test_chunk_pages_numbers_chunks_across_pages():
+    chunks = list(WordChunker(5).chunk_pages([(1, "a b c d e f"), (2, "g h")]))
+    assert [(c.index, c.page, c.text) for c in chunks] == [
+        (0, 1, "a b c d e"),
+        (1, 1, "f"),
+        (2, 2, "g h"),
+    ]
+
+
+def test_get_chunker_rejects_unknown_name():
+    with pytest.raises(ValueError):
+        get_chunker("sentence-transformer")
@@ -0,0 +1,127 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+import pytest
+from qdrant_client import models
+from qdrant_client.models import PointStruct
+
+from src.core.rag.collection_profiles import PROFILES, get_profile, truncate_embedding
+from src.core.rag.qdrant import SemanticQdrantService
+
+
+def make_service(profile="default"):
+    with patch("src.core.rag.qdrant.AsyncQdrantClient", autospec=True):
+        qdrant_service = SemanticQdrantService(
+            url="http://test", api_key="test", profile=get_profile(profile)
+        )
+    qdrant_service.client.get_collection = AsyncMock(
+        return_value=SimpleNamespace(
+            payload_schema={"account_id": {}, "type": {}, "path": {}},
+            config=SimpleNamespace(params=SimpleNamespace(vectors=SimpleNamespace(size=1536))),
+        )
+    )
+    qdrant_service.client.query_points = AsyncMock(return_value=SimpleNamespace(points=[]))
+    return qdrant_service
+
+
+def test_truncate_embedding_renormalizes():
+    reduced = truncate_embedding([3.0, 4.0, 12.0], 2)
+
+    assert reduced == pytest.approx([0.6, 0.8])
+    assert get_profile("default").reduce([3.0, 4.0, 12.0]) == [3.0, 4.0, 12.0]
+
+
+def test_profiles_build_qdrant_configs():
+    balanced = get_profile("balanced")
+    assert balanced.vectors_config(1536).on_disk is True
+    assert isinstance(balanced.quantization_config(), models.ScalarQuantization)
+    assert balanced.search_params().quantization.rescore is True  # type: ignore
+
+    assert get_profile("default").quantization_config() is None
+    assert get_profile("default").search_params() is None
+    assert get_profile("matryoshka-512").vectors_config(1536).size == 512
+    assert isinstance(get_profile("compact").quantization_config(), models.BinaryQuantization)
+    assert all(
+        p.bytes_per_vector(1536)["ram"] < PROFILES["default"].bytes_per_vector(1536)["ram"]
+        for name, p in PROFILES.items()
+        if name != "default"
+    )
+
+    with pytest.raises(ValueError):
+        get_profile("unknown")
+
+
+@pytest.mark.asyncio
+async def test_matryoshka_profile_reduces_stored_and_query_vectors():
+    qdrant_service = make_service("matryoshka-512")
+    vector = np.random.default_rng(0).normal(size=1536).tolist()
+
+    await qdrant_service.upsert_points("c", [PointStruct(id=1, vector=vector, payload={})])
+    await qdrant_service.search(vector, "org", collection_name="c")
+
+    stored = qdrant_service.client.upsert.call_args.kwargs["points"][0].vector
+    query = qdrant_service.client.query_points.call_args.kwargs["query"]
+    assert len(stored) == len(query) == 512
+    assert np.linalg.norm(query) == pytest.approx(1.0, abs=1e-5)
+    assert qdrant_service.client.query_points.call_args.kwargs["search_params"] is not None
+
+
+@pytest.mark.asyncio
+async def test_migrate_plain_collection_to_alias():
+    qdrant_service = make_service()
+    client = qdrant_service.client
+    client.get_aliases = AsyncMock(return_value=SimpleNamespace(aliases=[]))
+    client.collection_exists = AsyncMock(side_effect=lambda name: name == "kb")
+    point = SimpleNamespace(id="p1", vector=[1.0] * 1536, payload={"text": "t"})
+    client.scroll = AsyncMock(return_value=([point], None))
+    client.count = AsyncMock(return_value=SimpleNamespace(count=1))
+
+    target = await qdrant_service.migrate_collection("kb", get_profile("balanced"))
+
+    assert target.startswith("kb_balanced_")
+    assert client.create_collection.call_args.kwargs["collection_name"] == target
+    assert client.upsert.call_args.kwargs["collection_name"] == target
+    client.delete_collection.assert_awaited_once_with("kb")
+    (operation,) = client.update_collection_aliases.call_args.kwargs["change_aliases_operations"]
+    assert operation.create_alias.alias_name == "kb"
+    assert operation.create_alias.collection_name == target
+
+
+@pytest.mark.asyncio
+async def test_migrate_alias_swaps_atomically_and_keeps_incomplete_copies_out():
+    qdrant_service = make_service()
+    client = qdrant_service.client
+    client.get_aliases = AsyncMock(
+        return_value=SimpleNamespace(
+            aliases=[SimpleNamespace(alias_name="kb", collection_name="kb_default_1")]
+        )
+    )
+    client.collection_exists = AsyncMock(return_value=False)
+    client.scroll = AsyncMock(return_value=([], None))
+    client.count = AsyncMock(
+        side_effect=lambda name, exact: SimpleNamespace(count=2 if name == "kb_default_1" else 0)
+    )
+
+    with pytest.raises(RuntimeError):
+        await qdrant_service.migrate_collection("kb", get_profile("compact"))
+    client.update_collection_aliases.assert_not_called()
+
+    client.count = AsyncMock(return_value=SimpleNamespace(count=0))
+    await qdrant_service.migrate_collection("kb", get_profile("compact"))
+    operations = client.update_collection_aliases.call_args.kwargs["change_aliases_operations"]
+    assert [type(op).__name__ for op in operations] == [
+        "DeleteAliasOperation",
+        "CreateAliasOperation",
+    ]
+    client.delete_collection.assert_awaited_once_with("kb_default_1")
+
+
+@pytest.mark.asyncio
+async def test_create_collection_rejects_other_dimension():
+    qdrant_service = make_service()
+    qdrant_service.client.collection_exists = AsyncMock(return_value=True)
+
+    await qdrant_service.create_collection("kb", dimension=1536)
+    with pytest.raises(ValueError):
+        await qdrant_service.create_collection("kb", dimension=384)
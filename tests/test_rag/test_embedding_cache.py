@@ -0,0 +1,56 @@
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import pytest
+
+from src.core.rag.embedding_backends import OpenAIEmbeddingBackend
+from src.core.rag.embedding_cache import EmbeddingCache
+from src.core.rag.qdrant import SemanticEmbeddingService
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = EmbeddingCache(path=str(tmp_path / "embeddings.sqlite3"), max_entries=10)
+    yield cache
+    cache.close()
+
+
+def test_round_trip_and_counters(cache):
+    cache.put_many("model-a", {"hello": [0.5, -1.25]})
+    assert cache.get_many("model-a", ["hello", "missing"]) == {"hello": [0.5, -1.25]}
+    assert cache.get_many("model-b", ["hello"]) == {}
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["misses"] == 2
+
+
+def test_survives_reopen(cache, tmp_path):
+    cache.put_many("model-a", {"hello": [1.0]})
+    cache.close()
+    reopened = EmbeddingCache(path=str(tmp_path / "embeddings.sqlite3"))
+    assert reopened.get_many("model-a", ["hello"]) == {"hello": [1.0]}
+    reopened.close()
+
+
+def test_evicts_least_recently_used(cache):
+    cache.put_many("m", {f"text-{i}": [float(i)] for i in range(10)})
+    cache.get_many("m", ["text-0"])
+    cache.put_many("m", {"text-10": [10.0]})
+    assert cache.stats()["entries"] <= 10
+    assert cache.get_many("m", ["text-0", "text-10"]).keys() == {"text-0", "text-10"}
+
+
+@pytest.mark.asyncio
+async def test_service_reads_persistent_cache(cache):
+    with patch("src.core.rag.embedding_backends.OpenAI", autospec=True):
+        first = SemanticEmbeddingService(persistent_cache=cache, backend=OpenAIEmbeddingBackend())
+        first.client = Mock()
+        first.client.embeddings.create = Mock(
+            return_value=SimpleNamespace(data=[SimpleNamespace(index=0, embedding=[2.0])])
+        )
+        await first.get_embeddings("shared text")
+
+        second = SemanticEmbeddingService(persistent_cache=cache, backend=OpenAIEmbeddingBackend())
+        second.client = Mock()
+        assert await second.get_embeddings("shared text") == [2.0]
+        second.client.embeddings.create.assert_not_called()
@@ -0,0 +1,133 @@
+import sys
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+import pytest_asyncio
+
+from src.core.rag.embedding_backends import LocalEmbeddingBackend, OpenAIEmbeddingBackend
+from src.core.rag.qdrant import COLLECTION_NAME, SemanticEmbeddingService, collection_name_for
+from src.llm.tokens import estimate_tokens
+
+
+def fake_create(model, input):
+    return SimpleNamespace(
+        data=[
+            SimpleNamespace(index=i, embedding=[float(len(text))])
+            for i, text in reversed(list(enumerate(input)))
+        ]
+    )
+
+
+@pytest_asyncio.fixture
+async def embedding_service():
+    with patch("src.core.rag.embedding_backends.OpenAI", autospec=True):
+        embedding_service = SemanticEmbeddingService(
+            persistent_cache=None, backend=OpenAIEmbeddingBackend()
+        )
+        embedding_service.client = Mock()
+        embedding_service.client.embeddings.create = Mock(side_effect=fake_create)
+        yield embedding_service
+
+
+@pytest.mark.asyncio
+async def test_batch_preserves_order(embedding_service):
+    texts = ["a", "bbb", "cc"]
+    result = await embedding_service.get_embeddings_batch(texts)
+    assert result == [[1.0], [3.0], [2.0]]
+    embedding_service.client.embeddings.create.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_batch_only_requests_cache_misses(embedding_service):
+    await embedding_service.get_embeddings_batch(["a", "bbb"])
+    embedding_service.client.embeddings.create.reset_mock()
+
+    result = await embedding_service.get_embeddings_batch(["bbb", "dddd", "a", "dddd"])
+
+    assert result == [[3.0], [4.0], [1.0], [4.0]]
+    embedding_service.client.embeddings.create.assert_called_once()
+    assert embedding_service.client.embeddings.create.call_args.kwargs["input"] == ["dddd"]
+
+
+@pytest.mark.asyncio
+async def test_batch_splits_on_token_budget(embedding_service):
+    texts = ["word " * 100 for _ in range(5)]
+    texts = [f"{i} {text}" for i, text in enumerate(texts)]
+    await embedding_service.get_embeddings_batch(texts, max_batch_tokens=300)
+    assert embedding_service.client.embeddings.create.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_rejected_batch_falls_back_to_single_requests(embedding_service):
+    def reject_bad(model, input):
+        if "bad" in input:
+            raise ValueError("invalid input")
+        return fake_create(model, input)
+
+    embedding_service.client.embeddings.create.side_effect = reject_bad
+
+    result = await embedding_service.get_embeddings_batch(["a", "bad", "ccc"])
+
+    assert result == [[1.0], [], [3.0]]
+
+
+@pytest.mark.asyncio
+async def test_blank_and_over_long_inputs(embedding_service):
+    long_text = "word " * 20000
+
+    result = await embedding_service.get_embeddings_batch(["", "  ", long_text])
+
+    assert result[:2] == [[], []]
+    assert result[2]
+    (sent,) = embedding_service.client.embeddings.create.call_args.kwargs["input"]
+    assert estimate_tokens(sent) <= SemanticEmbeddingService.MAX_INPUT_TOKENS
+
+
+class FakeSentenceTransformer:
+    def __init__(self, model_name, device, **kwargs):
+        self.calls = []
+
+    def get_sentence_embedding_dimension(self):
+        return 2
+
+    def encode(self, texts, batch_size, **kwargs):
+        self.calls.append(list(texts))
+        return np.array([[float(len(text)), 1.0] for text in texts])
+
+
+@pytest.mark.asyncio
+async def test_local_backend_batches_on_thread_pool():
+    fake_module = SimpleNamespace(SentenceTransformer=FakeSentenceTransformer)
+    with patch.dict(sys.modules, {"sentence_transformers": fake_module}):
+        backend = LocalEmbeddingBackend("local/model", batch_size=2, threads=2)
+        embedding_service = SemanticEmbeddingService(persistent_cache=None, backend=backend)
+
+        result = await embedding_service.get_embeddings_batch(["a", "bb", "ccc", "a"])
+
+    assert result == [[1.0, 1.0], [2.0, 1.0], [3.0, 1.0], [1.0, 1.0]]
+    assert sorted(backend._model.calls) == [["a", "bb"], ["ccc"]]
+    assert embedding_service.dimension == 2
+    assert embedding_service.collection_name == "personal_assistant__local-model_2"
+
+
+@pytest.mark.asyncio
+async def test_local_dimension_is_resolved_by_warmup():
+    fake_module = SimpleNamespace(SentenceTransformer=FakeSentenceTransformer)
+    with patch.dict(sys.modules, {"sentence_transformers": fake_module}):
+        backend = LocalEmbeddingBackend("local/model")
+        with pytest.raises(RuntimeError):
+            backend.dimension
+        await backend.warmup()
+
+    assert backend.dimension == 2
+
+
+def test_collection_names_are_tagged_by_model_and_dimension():
+    assert collection_name_for("text-embedding-3-small", 1536) == COLLECTION_NAME
+    assert collection_name_for("text-embedding-3-small", 512) != COLLECTION_NAME
+    assert (
+        collection_name_for("BAAI/bge-small-en-v1.5", 384)
+        == "personal_assistant__baai-bge-small-en-v1-5_384"
+    )
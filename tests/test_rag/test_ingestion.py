@@ -0,0 +1,124 @@
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.core.rag.ingestion import IngestionPipeline, point_id
+from src.core.rag.qdrant import SemanticSearchRepo
+
+
+class MemoryCheckpointStore:
+    def __init__(self, last_committed_batch: int = -1):
+        self.last_committed_batch = last_committed_batch
+        self.cleared = False
+
+    async def load(self, ingestion_id):
+        return self.last_committed_batch
+
+    async def save(self, ingestion_id, last_committed_batch, chunks):
+        self.last_committed_batch = last_committed_batch
+
+    async def clear(self, ingestion_id):
+        self.cleared = True
+
+
+def make_pipeline(checkpoint_store=None, fail_on_batch=None):
+    embedding_service = AsyncMock()
+    embedding_service.get_embeddings_batch = AsyncMock(
+        side_effect=lambda texts: [[1.0] for _ in texts]
+    )
+    qdrant_service = AsyncMock()
+    calls = []
+
+    async def upsert_points(collection_name, points):
+        texts = [point.payload["text"] for point in points]
+        if fail_on_batch is not None and f"chunk-{fail_on_batch * 2}" in texts:
+            raise RuntimeError("qdrant unavailable")
+        calls.append(texts)
+        return len(points)
+
+    qdrant_service.upsert_points = upsert_points
+    pipeline = IngestionPipeline(
+        embedding_service,
+        qdrant_service,
+        "test",
+        batch_size=2,
+        max_in_flight=2,
+        checkpoint_store=checkpoint_store,
+        max_retries=0,
+    )
+    return pipeline, calls
+
+
+def chunks(count):
+    return ((f"chunk-{i}", {"account_id": "org"}) for i in range(count))
+
+
+@pytest.mark.asyncio
+async def test_pipeline_upserts_every_chunk_in_batches():
+    pipeline, calls = make_pipeline()
+    progress = await pipeline.run(chunks(5))
+
+    assert progress.done is True
+    assert progress.chunks_committed == 5
+    assert progress.batches_committed == 3
+    assert sorted(len(batch) for batch in calls) == [1, 2, 2]
+
+
+@pytest.mark.asyncio
+async def test_pipeline_resumes_after_last_committed_batch():
+    store = MemoryCheckpointStore(last_committed_batch=1)
+    pipeline, calls = make_pipeline(checkpoint_store=store)
+    progress = await pipeline.run(chunks(5), ingestion_id="file")
+
+    assert calls == [["chunk-4"]]
+    assert progress.batches_skipped == 2
+    assert store.cleared is True
+
+
+@pytest.mark.asyncio
+async def test_pipeline_failure_keeps_checkpoint():
+    store = MemoryCheckpointStore()
+    pipeline, _ = make_pipeline(checkpoint_store=store, fail_on_batch=2)
+
+    with pytest.raises(RuntimeError):
+        await pipeline.run(chunks(10), ingestion_id="file")
+
+    assert store.last_committed_batch < 2
+    assert store.cleared is False
+
+
+@pytest.mark.asyncio
+async def test_pipeline_skips_blank_chunks():
+    pipeline, calls = make_pipeline()
+    source = [("chunk-0", {"account_id": "org"}), ("  ", {"account_id": "org"})]
+    progress = await pipeline.run(iter(source))
+
+    assert progress.done is True
+    assert calls == [["chunk-0"]]
+
+
+def test_point_ids_are_deterministic():
+    assert point_id("org", "a.pdf", "text") == point_id("org", "a.pdf", "text")
+    assert point_id("org", "a.pdf", "text") != point_id("org", "b.pdf", "text")
+    assert point_id("org", "a.pdf", "text") != point_id("other", "a.pdf", "text")
+
+
+@pytest.mark.asyncio
+async def test_sync_document_only_touches_changed_chunks():
+    pipeline, calls = make_pipeline()
+    qdrant_service = pipeline.qdrant_service
+    unchanged_id = point_id("org", "a.pdf", "kept")
+    removed_id = point_id("org", "a.pdf", "removed")
+    qdrant_service.list_point_ids = AsyncMock(return_value={unchanged_id, removed_id})
+    qdrant_service.delete_points = AsyncMock()
+    repo = SemanticSearchRepo(pipeline.embedding_service, qdrant_service, lexical=None)
+
+    meta = {"account_id": "org", "path": "a.pdf"}
+    progress = await repo.sync_document(
+        [("kept", meta), ("added", meta), ("added", meta)], account_id="org", path="a.pdf"
+    )
+
+    assert calls == [["added"]]
+    assert progress.chunks_committed == 1
+    qdrant_service.delete_points.assert_awaited_once()
+    assert qdrant_service.delete_points.call_args.args[1] == [removed_id]
@@ -0,0 +1,197 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+from src.core.rag.lexical_index import LexicalIndex, reciprocal_rank_fusion
+from src.core.rag.qdrant import SemanticSearchRepo
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = LexicalIndex(str(tmp_path))
+    yield index
+    index.close()
+
+
+def test_exact_code_ranks_first(index):
+    index.add(
+        "org",
+        [
+            ("p1", "Our plans start at a low monthly price", {"type": "pdf"}),
+            ("p2", "Error code E-4012 means the card was declined", {"type": "pdf"}),
+            ("p3", "Contact support for any error", {"type": "txt"}),
+        ],
+    )
+
+    hits = index.search("org", "what does E-4012 mean?")
+
+    assert hits[0][0] == "p2"
+    assert hits[0][3] == {"type": "pdf"}
+    assert [hit[0] for hit in index.search("org", "error", file_type="txt")] == ["p3"]
+
+
+def test_tenants_are_isolated(index):
+    index.add("org-1", [("p1", "invoice INV-77", {})])
+
+    assert index.search("org-2", "INV-77") == []
+    assert not index.exists("org-2")
+
+
+def test_add_replaces_and_delete_removes(index):
+    index.add("org", [("p1", "old text", {})])
+    index.add("org", [("p1", "new text", {})])
+    assert [hit[2] for hit in index.search("org", "text")] == ["new text"]
+
+    index.delete("org", ["p1"])
+    assert index.search("org", "text") == []
+
+
+def test_build_query_quotes_terms():
+    assert LexicalIndex.build_query('price "AND" price? NEAR(') == '"price" OR "near"'
+    assert LexicalIndex.build_query("?!") == ""
+
+
+def test_stopwords_and_min_score(index):
+    index.add(
+        "org",
+        [
+            ("p1", "the office is open on weekdays", {}),
+            ("p2", "what is included in the premium plan", {}),
+            ("p3", "premium support contract", {}),
+        ],
+    )
+
+    assert index.search("org", "hi, what is the?") == []
+    assert {hit[0] for hit in index.search("org", "premium")} == {"p2", "p3"}
+    assert index.search("org", "premium", min_score=100) == []
+
+
+def test_strong_match():
+    assert LexicalIndex.query_terms("what's the refund?") == ["refund"]
+    assert LexicalIndex.is_strong_match("refund for order 77", "order 77 was refunded")
+    assert LexicalIndex.is_strong_match("status of T-100", "ticket T-100 escalated")
+    assert not LexicalIndex.is_strong_match("what's new in the office?", "office hours")
+
+
+@pytest.mark.asyncio
+async def test_weak_keyword_hits_need_a_dense_hit(index):
+    index.add("org", [("p1", "office hours are 9 to 5", {"text": "office hours are 9 to 5"})])
+    index.mark_backfilled("org")
+    embedding_service = AsyncMock()
+    embedding_service.get_embeddings = AsyncMock(return_value=[0.1])
+    qdrant_service = AsyncMock()
+    qdrant_service.search = AsyncMock(return_value=[])
+    repo = SemanticSearchRepo(embedding_service, qdrant_service, lexical=index)
+
+    assert await repo.query_text("what's new at the office?", "org") == []
+    assert len(await repo.query_text("office hours?", "org")) == 1
+
+
+def test_reciprocal_rank_fusion():
+    scores = reciprocal_rank_fusion([["a", "b"], ["b", "c"]], k=60)
+
+    assert max(scores, key=scores.get) == "b"  # type: ignore
+    assert scores["a"] == pytest.approx(1 / 61)
+
+
+@pytest.mark.asyncio
+async def test_query_text_fuses_dense_and_keyword_hits(index):
+    index.add(
+        "org",
+        [
+            ("dense", "refund policy overview", {"text": "refund policy overview"}),
+            ("sku", "SKU-991 costs 40 dollars", {"text": "SKU-991 costs 40 dollars"}),
+        ],
+    )
+    index.mark_backfilled("org")
+    embedding_service = AsyncMock()
+    embedding_service.get_embeddings = AsyncMock(return_value=[0.1])
+    qdrant_service = AsyncMock()
+    qdrant_service.search = AsyncMock(
+        return_value=[
+            SimpleNamespace(id="dense", score=0.8, payload={"text": "refund policy overview"}),
+            SimpleNamespace(id="sku", score=0.6, payload={"text": "SKU-991 costs 40 dollars"}),
+        ]
+    )
+    repo = SemanticSearchRepo(embedding_service, qdrant_service, lexical=index)
+
+    results = await repo.query_text("price of SKU-991", "org", limit=5)
+
+    assert [r["text"] for r in results] == ["SKU-991 costs 40 dollars", "refund policy overview"]
+    assert results[0]["vector_score"] == 0.6
+    assert qdrant_service.search.call_args.kwargs["limit"] > 5
+    assert {"embed_ms", "vector_ms", "lexical_ms", "fusion_ms"} <= set(repo.last_timings)
+
+
+@pytest.mark.asyncio
+async def test_query_text_rebuilds_missing_index(index):
+    embedding_service = AsyncMock()
+    embedding_service.get_embeddings = AsyncMock(return_value=[0.1])
+    qdrant_service = AsyncMock()
+    qdrant_service.search = AsyncMock(return_value=[])
+
+    async def iter_payloads(collection_name, account_id):
+        yield "p1", {"text": "ticket T-100 escalated"}
+
+    qdrant_service.iter_payloads = iter_payloads
+    repo = SemanticSearchRepo(embedding_service, qdrant_service, lexical=index)
+
+    assert await repo.query_text("T-100", "org") == []
+    await repo._lexical_rebuilds["org"]
+
+    results = await repo.query_text("T-100", "org")
+    assert [r["text"] for r in results] == ["ticket T-100 escalated"]
+    assert results[0]["lexical_only"] is True
+
+
+@pytest.mark.asyncio
+async def test_backfill_runs_when_upload_created_the_index_first(index):
+    index.add("org", [("new", "fresh upload", {"text": "fresh upload"})])
+    embedding_service = AsyncMock()
+    embedding_service.get_embeddings = AsyncMock(return_value=[0.1])
+    qdrant_service = AsyncMock()
+    qdrant_service.search = AsyncMock(return_value=[])
+
+    async def iter_payloads(collection_name, account_id):
+        yield "old", {"text": "invoice INV-5 from last year"}
+        yield "new", {"text": "fresh upload"}
+
+    qdrant_service.iter_payloads = iter_payloads
+    repo = SemanticSearchRepo(embedding_service, qdrant_service, lexical=index)
+
+    assert index.exists("org") and not index.is_backfilled("org")
+    assert await repo.query_text("INV-5", "org") == []
+    await repo._lexical_rebuilds["org"]
+
+    assert index.is_backfilled("org")
+    assert [r["text"] for r in await repo.query_text("INV-5", "org")] == [
+        "invoice INV-5 from last year"
+    ]
+
+
+@pytest.mark.asyncio
+async def test_knowledge_base_version_bump_rebuilds_the_index(index):
+    index.add("org", [("gone", "retired plan P-1", {"text": "retired plan P-1"})])
+    index.mark_backfilled("org", version=1.0)
+    version = AsyncMock(return_value=1.0)
+    embedding_service = AsyncMock()
+    embedding_service.get_embeddings = AsyncMock(return_value=[0.1])
+    qdrant_service = AsyncMock()
+    qdrant_service.search = AsyncMock(return_value=[])
+
+    async def iter_payloads(collection_name, account_id):
+        # Uploaded through another process since version 1.0.
+        yield "new", {"text": "plan P-2 launched"}
+
+    qdrant_service.iter_payloads = iter_payloads
+    repo = SemanticSearchRepo(embedding_service, qdrant_service, lexical=index, kb_version=version)
+    assert [r["text"] for r in await repo.query_text("P-1", "org")] == ["retired plan P-1"]
+
+    version.return_value = 2.0
+    assert await repo.query_text("P-2", "org") == []
+    await repo._lexical_rebuilds["org"]
+
+    assert index.backfilled_version("org") == 2.0
+    assert [r["text"] for r in await repo.query_text("P-2", "org")] == ["plan P-2 launched"]
+    assert await repo.query_text("retired", "org") == []
@@ -0,0 +1,50 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from src.core.rag.qdrant import COLLECTION_NAME, SemanticQdrantService
+
+
+@pytest.fixture
+def qdrant_service():
+    with patch("src.core.rag.qdrant.AsyncQdrantClient", autospec=True):
+        qdrant_service = SemanticQdrantService(url="http://test", api_key="test")
+        qdrant_service.client.get_collection = AsyncMock(
+            return_value=SimpleNamespace(payload_schema={"account_id": {}})
+        )
+        qdrant_service.client.query_points = AsyncMock(return_value=SimpleNamespace(points=[]))
+        yield qdrant_service
+
+
+@pytest.mark.asyncio
+async def test_search_filters_by_tenant_and_type(qdrant_service):
+    await qdrant_service.search([0.1], "org-1", limit=3, file_type="pdf", score_threshold=0.6)
+
+    kwargs = qdrant_service.client.query_points.call_args.kwargs
+    conditions = {c.key: c.match.value for c in kwargs["query_filter"].must}
+    assert conditions == {"account_id": "org-1", "type": "pdf"}
+    assert kwargs["score_threshold"] == 0.6
+    assert kwargs["limit"] == 3
+    assert kwargs["collection_name"] == COLLECTION_NAME
+
+
+@pytest.mark.asyncio
+async def test_payload_indexes_created_once(qdrant_service):
+    await qdrant_service.search([0.1], "org-1")
+    await qdrant_service.search([0.1], "org-2")
+
+    created = [
+        c.kwargs["field_name"] for c in qdrant_service.client.create_payload_index.call_args_list
+    ]
+    assert created == ["type", "path"]
+
+
+@pytest.mark.asyncio
+async def test_upsert_points_in_batches(qdrant_service):
+    qdrant_service.upsert_batch_size = 2
+    points = [object() for _ in range(5)]
+
+    assert await qdrant_service.upsert_points(COLLECTION_NAME, points) == 5  # type: ignore
+    sizes = [len(c.kwargs["points"]) for c in qdrant_service.client.upsert.call_args_list]
+    assert sizes == [2, 2, 1]
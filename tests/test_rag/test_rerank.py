@@ -0,0 +1,109 @@
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import numpy as np
+import pytest
+
+from src.core.rag.qdrant import SemanticSearchRepo
+from src.core.rag.rerank import CrossEncoderScorer, Reranker, TermCoverageScorer
+
+
+class FixedScorer:
+    def __init__(self, scores, delay=0.0):
+        self.scores = scores
+        self.delay = delay
+
+    def score(self, query, texts):
+        time.sleep(self.delay)
+        return np.array(self.scores[: len(texts)], dtype=np.float32)
+
+
+def make_results(*texts):
+    return [{"text": text, "score": 1.0 - i / 10, "metadata": {}} for i, text in enumerate(texts)]
+
+
+def test_term_coverage_prefers_full_and_ordered_matches():
+    scores = TermCoverageScorer().score(
+        "reset router password",
+        [
+            "How to reset the router password in three steps",
+            "password router reset",
+            "Our router ships with a default configuration",
+            "Unrelated billing question",
+        ],
+    )
+
+    assert scores[0] > scores[1] > scores[2] > scores[3] == 0
+    assert TermCoverageScorer().score("?!", ["text"]).tolist() == [0.0]
+
+
+def test_cross_encoder_falls_back_without_model():
+    scorer = CrossEncoderScorer("does-not-exist/model")
+    scorer._fallback = TermCoverageScorer()
+
+    assert scorer.score("router", ["router", "billing"]).tolist()[1] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_rerank_keeps_best_k():
+    reranker = Reranker(FixedScorer([0.1, 0.9, 0.5]), budget_ms=1000)
+
+    reranked = await reranker.rerank("q", make_results("a", "b", "c"), top_k=2)
+
+    assert [r["text"] for r in reranked] == ["b", "c"]
+    assert reranked[0]["score"] == pytest.approx(0.9)
+    assert reranked[0]["retrieval_score"] == pytest.approx(0.9)
+
+
+@pytest.mark.asyncio
+async def test_rerank_falls_back_when_over_budget():
+    reranker = Reranker(FixedScorer([0.1, 0.9, 0.5], delay=0.2), budget_ms=20)
+
+    reranked = await reranker.rerank("q", make_results("a", "b", "c"), top_k=2)
+
+    assert [r["text"] for r in reranked] == ["a", "b"]
+    assert reranker.stats()["fallbacks"] == 1
+
+
+@pytest.mark.asyncio
+async def test_rerank_is_skipped_while_abandoned_calls_hold_every_worker():
+    reranker = Reranker(FixedScorer([0.1, 0.9, 0.5], delay=0.2), budget_ms=20, workers=1)
+
+    await reranker.rerank("q", make_results("a", "b", "c"), top_k=2)
+    skipped = await reranker.rerank("q", make_results("a", "b", "c"), top_k=2)
+
+    assert [r["text"] for r in skipped] == ["a", "b"]
+    assert reranker.stats()["skipped"] == 1
+    await asyncio.sleep(0.3)
+    assert reranker.stats()["busy_workers"] == 0
+    reranker.scorer.delay = 0
+    reranked = await reranker.rerank("q", make_results("a", "b", "c"), top_k=2)
+    assert [r["text"] for r in reranked] == ["b", "c"]
+    reranker.close()
+
+
+@pytest.mark.asyncio
+async def test_query_text_over_fetches_then_reranks():
+    embedding_service = AsyncMock()
+    embedding_service.get_embeddings = AsyncMock(return_value=[0.1])
+    qdrant_service = AsyncMock()
+    qdrant_service.search = AsyncMock(
+        return_value=[
+            SimpleNamespace(id=str(i), score=0.9 - i / 100, payload={"text": f"chunk {i}"})
+            for i in range(8)
+        ]
+    )
+    repo = SemanticSearchRepo(
+        embedding_service,
+        qdrant_service,
+        lexical=None,
+        reranker=Reranker(FixedScorer([float(i) for i in range(8)]), budget_ms=1000),
+    )
+
+    results = await repo.query_text("question", "org", limit=2)
+
+    assert qdrant_service.search.call_args.kwargs["limit"] >= 8
+    assert [r["text"] for r in results] == ["chunk 7", "chunk 6"]
+    assert "rerank_ms" in repo.last_timings
@@ -0,0 +1,112 @@
+import asyncio
+
+import pytest
+
+from src.core.tasks.chat_dispatcher import ChatWorkDispatcher
+
+
+class Recorder:
+    def __init__(self):
+        self.handled = []
+        self.release = asyncio.Event()
+
+    async def __call__(self, item):
+        await self.release.wait()
+        self.handled.append(item)
+
+
+@pytest.mark.asyncio
+async def test_keeps_order_within_chat_and_alternates_chats():
+    recorder = Recorder()
+    dispatcher = ChatWorkDispatcher(recorder, workers=1, max_queue_depth=10)
+
+    for i in range(3):
+        dispatcher.submit("busy", f"busy-{i}")
+    dispatcher.submit("quiet", "quiet-0")
+    recorder.release.set()
+    await dispatcher.stop()
+
+    assert recorder.handled == ["busy-0", "quiet-0", "busy-1", "busy-2"]
+    assert dispatcher.stats()["processed"] == 4
+
+
+@pytest.mark.asyncio
+async def test_one_worker_per_chat_at_a_time():
+    running = set()
+    overlaps = []
+
+    async def handler(item):
+        chat_id, _ = item
+        overlaps.append(chat_id in running)
+        running.add(chat_id)
+        await asyncio.sleep(0.01)
+        running.discard(chat_id)
+
+    dispatcher = ChatWorkDispatcher(handler, workers=4, max_queue_depth=10)
+    for i in range(4):
+        dispatcher.submit(1, (1, i))
+        dispatcher.submit(2, (2, i))
+    await dispatcher.stop()
+
+    assert len(overlaps) == 8
+    assert not any(overlaps)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "policy, expected, dropped, coalesced",
+    [
+        ("drop_oldest", [0, 2, 3], [1], 0),
+        ("drop_newest", [0, 1, 2], [3], 0),
+        ("coalesce", [0, 1, 3], [], 1),
+    ],
+)
+async def test_overflow_policies(policy, expected, dropped, coalesced):
+    recorder = Recorder()
+    on_drop = []
+    dispatcher = ChatWorkDispatcher(
+        recorder,
+        workers=1,
+        max_queue_depth=2,
+        overflow_policy=policy,
+        on_drop=lambda chat_id, item: on_drop.append(item),
+    )
+
+    dispatcher.submit("chat", 0)
+    await asyncio.sleep(0)  # the worker takes item 0, leaving room for two
+    for i in (1, 2, 3):
+        dispatcher.submit("chat", i)
+    assert dispatcher.depth("chat") == 2
+
+    recorder.release.set()
+    await dispatcher.stop()
+
+    stats = dispatcher.stats()
+    assert recorder.handled == expected
+    assert (stats["dropped"], stats["coalesced"]) == (len(dropped), coalesced)
+    assert on_drop == dropped
+    assert stats["max_depth_seen"] == 2
+    assert stats["queued"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failures_do_not_stop_the_chat():
+    handled = []
+
+    async def handler(item):
+        if item == "bad":
+            raise RuntimeError("boom")
+        handled.append(item)
+
+    dispatcher = ChatWorkDispatcher(handler, workers=1)
+    dispatcher.submit("chat", "bad")
+    dispatcher.submit("chat", "good")
+    await dispatcher.stop()
+
+    assert handled == ["good"]
+    assert dispatcher.stats()["failed"] == 1
+
+
+def test_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        ChatWorkDispatcher(lambda item: None, overflow_policy="block")
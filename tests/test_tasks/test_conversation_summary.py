@@ -0,0 +1,143 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.core.tasks.conversation_summary import ConversationSummaryStore
+
+
+class FakeMongo:
+    def __init__(self):
+        self.documents = {}
+
+    async def find_one(self, collection, filter_dict):
+        return self.documents.get(filter_dict["chat_id"])
+
+    async def update_one(self, collection, filter_dict, update_dict, upsert=False):
+        self.documents[filter_dict["chat_id"]] = dict(update_dict)
+        return True
+
+
+def make_store(history=None, summary="summary v1"):
+    llm_manager = Mock(summarize_conversation=AsyncMock(return_value=summary))
+    loader = AsyncMock(return_value=history or [])
+    store = ConversationSummaryStore(
+        "org",
+        llm_manager=llm_manager,
+        history_loader=loader,
+        mongo_manager=FakeMongo(),
+        recent_turns=2,
+        fold_batch=2,
+    )
+    return store, llm_manager, loader
+
+
+def turn(i):
+    return ConversationSummaryStore.make_turn(f"user{i}", f"message {i}")
+
+
+@pytest.mark.asyncio
+async def test_seeds_new_chat_from_stored_messages_once():
+    store, _, loader = make_store(history=[{"text": "hello", "sender_name": "Ann"}])
+
+    assert await store.recent_context(1) == [{"text": "Ann: hello"}]
+    await store.recent_context(1)
+    loader.assert_awaited_once_with(1, 2)
+
+
+@pytest.mark.asyncio
+async def test_folds_old_turns_into_summary_in_batches():
+    store, llm_manager, _ = make_store()
+
+    await store.update(1, [turn(1), turn(2), turn(3)])
+    llm_manager.summarize_conversation.assert_not_awaited()
+
+    await store.update(1, [turn(4)])
+    llm_manager.summarize_conversation.assert_awaited_once_with("", [turn(1), turn(2)])
+
+    context = await store.recent_context(1)
+    assert context == [
+        {"text": "Summary of the earlier conversation: summary v1"},
+        {"text": "user3: message 3"},
+        {"text": "user4: message 4"},
+    ]
+    assert store.mongo_manager.documents[1]["summarized_turns"] == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_summary_keeps_turns():
+    store, _, _ = make_store(summary="")
+    await store.update(1, [turn(1), turn(2), turn(3), turn(4)])
+
+    state = await store.get(1)
+    assert state.summary == ""
+    assert len(state.turns) == 4
+
+
+@pytest.mark.asyncio
+async def test_state_is_restored_from_mongo():
+    store, _, loader = make_store()
+    store.mongo_manager.documents[1] = {"summary": "s", "turns": [turn(9)], "summarized_turns": 5}
+
+    assert await store.recent_context(1) == [
+        {"text": "Summary of the earlier conversation: s"},
+        {"text": "user9: message 9"},
+    ]
+    loader.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_scheduled_updates_are_flushed():
+    store, _, _ = make_store()
+    store.schedule_update(1, [turn(1)])
+    await store.flush()
+    assert store.mongo_manager.documents[1]["turns"] == [turn(1)]
+
+
+@pytest.mark.asyncio
+async def test_state_is_bounded_and_reloaded_after_eviction():
+    store, _, _ = make_store()
+    store._states.max_entries = 2
+    for chat_id in (1, 2, 3):
+        await store.update(chat_id, [turn(chat_id)])
+
+    assert len(store._states) == 2
+    assert not store._locks
+
+    context = await store.recent_context(1)
+    assert context == [{"text": "user1: message 1"}]
+
+
+@pytest.mark.asyncio
+async def test_seeded_messages_are_not_added_twice():
+    store, _, _ = make_store(history=[{"text": "hello", "sender_name": "Ann", "message_id": 7}])
+
+    await store.update(1, [ConversationSummaryStore.make_turn("Ann", "hello", message_id=7)])
+
+    assert await store.recent_context(1) == [{"text": "Ann: hello"}]
+
+
+@pytest.mark.asyncio
+async def test_eviction_does_not_replace_state_mid_update():
+    store, llm_manager, _ = make_store()
+    store._states.max_entries = 1
+    release = asyncio.Event()
+
+    async def slow_summary(summary, turns):
+        await release.wait()
+        return "summary"
+
+    llm_manager.summarize_conversation.side_effect = slow_summary
+    update = asyncio.create_task(store.update(1, [turn(1), turn(2), turn(3), turn(4)]))
+    await asyncio.sleep(0)
+    await store.update(2, [turn(5)])
+
+    later = asyncio.create_task(store.update(1, [turn(6)]))
+    await asyncio.sleep(0)
+    release.set()
+    await asyncio.gather(update, later)
+
+    document = store.mongo_manager.documents[1]
+    assert document["summary"] == "summary"
+    assert document["turns"] == [turn(3), turn(4), turn(6)]
+    assert not store._active
@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from telethon.tl.types import UpdateChannel, UpdateUserName
+
+from src.core.tasks.entity_cache import TelegramEntityCache, TTLCache
+
+
+def make_message(sender_id=1, chat_id=-1000000001234, sender=None, chat=None):
+    return SimpleNamespace(
+        sender_id=sender_id,
+        chat_id=chat_id,
+        sender=sender,
+        chat=chat,
+        get_chat=AsyncMock(return_value=SimpleNamespace(id=abs(chat_id), title="Group")),
+    )
+
+
+def test_ttl_cache_expires_and_evicts():
+    cache = TTLCache(ttl=10, max_entries=2)
+    with patch("src.core.tasks.entity_cache.time.monotonic", return_value=0):
+        cache.put("a", 1)
+        cache.put("b", 2)
+        assert cache.get("a") == 1
+        cache.put("c", 3)
+        assert cache.get("b") is None
+    with patch("src.core.tasks.entity_cache.time.monotonic", return_value=11):
+        assert cache.get("a") is None
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 2, "evictions": 1}
+
+
+@pytest.mark.asyncio
+async def test_self_id_fetched_once():
+    cache = TelegramEntityCache()
+    client = SimpleNamespace(get_me=AsyncMock(return_value=SimpleNamespace(user_id=42)))
+
+    assert await cache.load_self_id(client) == 42
+    assert await cache.load_self_id(client) == 42
+    client.get_me.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_entities_carried_by_event_are_used_and_stored():
+    cache = TelegramEntityCache()
+    client = SimpleNamespace(get_entity=AsyncMock())
+    sender = SimpleNamespace(first_name="Ada")
+
+    assert await cache.get_sender(client, make_message(sender=sender)) is sender
+    assert await cache.get_sender(client, make_message()) is sender
+    client.get_entity.assert_not_called()
+    assert cache.users.hits == 1
+
+
+@pytest.mark.asyncio
+async def test_chat_fetched_once_then_invalidated_by_update():
+    cache = TelegramEntityCache()
+    first, second = make_message(), make_message()
+
+    await cache.get_chat(first)
+    await cache.get_chat(second)
+    first.get_chat.assert_awaited_once()
+    second.get_chat.assert_not_called()
+
+    await cache.handle_update(UpdateChannel(channel_id=1234))
+    await cache.get_chat(second)
+    second.get_chat.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_user_name_update_drops_user():
+    cache = TelegramEntityCache()
+    cache.users.put(7, SimpleNamespace(first_name="Old"))
+
+    await cache.handle_update(
+        UpdateUserName(user_id=7, first_name="New", last_name="", usernames=[])
+    )
+
+    assert cache.users.get(7) is None
@@ -0,0 +1,193 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from src.core.rag.ingestion import IngestionProgress
+from src.core.tasks.ingestion_job_manager import (
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    IngestionJobManager,
+)
+
+
+def matches(document, filter_dict):
+    for key, condition in filter_dict.items():
+        if key == "$or":
+            if not any(matches(document, option) for option in condition):
+                return False
+            continue
+        value = document.get(key)
+        if isinstance(condition, dict):
+            if "$in" in condition and value not in condition["$in"]:
+                return False
+            if "$lt" in condition and (value is None or not value < condition["$lt"]):
+                return False
+        elif value != condition:
+            return False
+    return True
+
+
+class FakeMongo:
+    def __init__(self, jobs=None):
+        self.jobs = {job["job_id"]: dict(job) for job in jobs or []}
+
+    async def insert_one(self, collection, document):
+        self.jobs[document["job_id"]] = dict(document)
+        return True
+
+    async def find_one(self, collection, filter_dict):
+        for job in self.jobs.values():
+            if matches(job, filter_dict):
+                return dict(job)
+        return None
+
+    async def find_many(self, collection, filter_dict=None, sort_fields=None, limit=None):
+        return [dict(job) for job in self.jobs.values() if matches(job, filter_dict or {})]
+
+    async def find_one_and_update(self, collection, filter_dict, update_dict, upsert=False):
+        for job in self.jobs.values():
+            if matches(job, filter_dict):
+                job.update(update_dict)
+                return dict(job)
+        return None
+
+    async def update_one(self, collection, filter_dict, update_dict, upsert=False):
+        for job in self.jobs.values():
+            if matches(job, filter_dict):
+                job.update(update_dict)
+                return True
+        return False
+
+
+async def wait_until(predicate, timeout=2):
+    async def poll():
+        while not predicate():
+            await asyncio.sleep(0.01)
+
+    await asyncio.wait_for(poll(), timeout)
+
+
+@pytest.mark.asyncio
+async def test_jobs_run_round_robin_with_per_org_limit():
+    order = []
+    running = {}
+    max_running = {}
+
+    async def runner(job, on_progress):
+        org = job["organization_id"]
+        running[org] = running.get(org, 0) + 1
+        max_running[org] = max(max_running.get(org, 0), running[org])
+        order.append(org)
+        await asyncio.sleep(0.02)
+        running[org] -= 1
+        progress = IngestionProgress(ingestion_id=None, batches_committed=1, chunks_committed=3)
+        await on_progress(progress)
+        return progress
+
+    mongo = FakeMongo()
+    manager = IngestionJobManager(runner, max_workers=2, max_jobs_per_org=1, mongo_manager=mongo)
+    for _ in range(4):
+        await manager.submit("bulk", file_type="pdf")
+    await manager.submit("small", file_type="pdf")
+
+    await manager.start()
+    try:
+        await wait_until(lambda: all(j["status"] == JOB_COMPLETED for j in mongo.jobs.values()))
+    finally:
+        await manager.stop()
+
+    assert max_running == {"bulk": 1, "small": 1}
+    assert order.index("small") < 2
+    assert all(job["chunks_committed"] == 3 for job in mongo.jobs.values())
+
+
+@pytest.mark.asyncio
+async def test_failed_job_records_error():
+    async def runner(job, on_progress):
+        raise RuntimeError("embedding service down")
+
+    mongo = FakeMongo()
+    manager = IngestionJobManager(runner, mongo_manager=mongo)
+    await manager.start()
+    try:
+        job = await manager.submit("org", file_type="pdf")
+        await wait_until(lambda: mongo.jobs[job["job_id"]]["status"] == JOB_FAILED)
+    finally:
+        await manager.stop()
+
+    assert mongo.jobs[job["job_id"]]["error"] == "embedding service down"
+    assert mongo.jobs[job["job_id"]]["finished_at"] is not None
+
+
+@pytest.mark.asyncio
+async def test_start_resumes_interrupted_jobs():
+    mongo = FakeMongo(
+        [
+            {"job_id": "a", "organization_id": "org", "status": JOB_RUNNING},
+            {"job_id": "b", "organization_id": "org", "status": JOB_QUEUED},
+            {"job_id": "c", "organization_id": "org", "status": JOB_COMPLETED},
+        ]
+    )
+    ran = []
+
+    async def runner(job, on_progress):
+        ran.append(job["job_id"])
+        return IngestionProgress(ingestion_id=None, done=True)
+
+    manager = IngestionJobManager(runner, mongo_manager=mongo)
+    await manager.start()
+    try:
+        await wait_until(lambda: len(ran) == 2)
+    finally:
+        await manager.stop()
+
+    assert sorted(ran) == ["a", "b"]
+
+
+@pytest.mark.asyncio
+async def test_jobs_are_claimed_by_one_process_only():
+    now = datetime.now(timezone.utc)
+    mongo = FakeMongo(
+        [
+            {"job_id": "queued", "organization_id": "org", "status": JOB_QUEUED},
+            {
+                "job_id": "live",
+                "organization_id": "org",
+                "status": JOB_RUNNING,
+                "owner": "elsewhere",
+                "heartbeat_at": now,
+            },
+            {
+                "job_id": "stale",
+                "organization_id": "org",
+                "status": JOB_RUNNING,
+                "owner": "crashed",
+                "heartbeat_at": now - timedelta(minutes=10),
+            },
+        ]
+    )
+    ran = []
+
+    async def runner(job, on_progress):
+        ran.append(job["job_id"])
+        await asyncio.sleep(0.02)
+        return IngestionProgress(ingestion_id=None, done=True)
+
+    first = IngestionJobManager(runner, mongo_manager=mongo, max_jobs_per_org=2)
+    second = IngestionJobManager(runner, mongo_manager=mongo, max_jobs_per_org=2)
+    await first.start()
+    await second.start()
+    try:
+        await wait_until(
+            lambda: all(mongo.jobs[j]["status"] == JOB_COMPLETED for j in ("queued", "stale"))
+        )
+    finally:
+        await first.stop()
+        await second.stop()
+
+    assert sorted(ran) == ["queued", "stale"]
+    assert mongo.jobs["live"]["status"] == JOB_RUNNING
+    assert mongo.jobs["stale"]["owner"] in {first.owner_id, second.owner_id}
@@ -0,0 +1,100 @@
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.core.tasks.message_debouncer import MessageDebouncer
+from src.core.tasks.realtime_intelligence import RealTimeIntelligenceHandler
+
+
+@pytest.mark.asyncio
+async def test_fragments_within_window_flush_once():
+    flushed = []
+    debouncer = MessageDebouncer(lambda key, items: flushed.append((key, items)), window=0.05)
+
+    for text in ("hi", "what are", "your hours?"):
+        debouncer.add(("chat", 1), text)
+        await asyncio.sleep(0.01)
+    debouncer.add(("chat", 2), "other sender")
+    await asyncio.sleep(0.1)
+
+    assert flushed == [
+        (("chat", 1), ["hi", "what are", "your hours?"]),
+        (("chat", 2), ["other sender"]),
+    ]
+    assert debouncer.stats()["requests_saved"] == 2
+
+
+@pytest.mark.asyncio
+async def test_max_wait_and_max_fragments_cap_a_burst():
+    flushed = []
+    debouncer = MessageDebouncer(
+        lambda key, items: flushed.append(items), window=0.05, max_wait=0.08, max_fragments=3
+    )
+
+    for i in range(5):
+        debouncer.add("key", i)
+    assert flushed == [[0, 1, 2]]
+
+    for i in range(5, 10):
+        debouncer.add("key", i)
+        await asyncio.sleep(0.03)
+    await asyncio.sleep(0.1)
+    assert sum(len(items) for items in flushed) == 10
+    assert all(len(items) <= 3 for items in flushed)
+
+
+@pytest.mark.asyncio
+async def test_zero_window_and_flush_all():
+    flushed = []
+    debouncer = MessageDebouncer(lambda key, items: flushed.append(items), window=0)
+    debouncer.add("key", "a")
+    assert flushed == [["a"]]
+
+    debouncer.window = 10
+    debouncer.add("key", "b")
+    debouncer.flush_all()
+    assert flushed == [["a"], ["b"]]
+
+
+def make_message(message_id, text):
+    return SimpleNamespace(
+        id=message_id,
+        text=text,
+        date=datetime(2025, 1, 1, tzinfo=timezone.utc),
+        sender_id=7,
+        chat_id=-100,
+        sender=SimpleNamespace(first_name="Ada", last_name="Lovelace"),
+        chat=SimpleNamespace(title="Support"),
+    )
+
+
+@pytest.mark.asyncio
+async def test_fragments_are_answered_with_one_llm_call():
+    handler = RealTimeIntelligenceHandler(organization_id="org")
+    handler.get_message_ownership = AsyncMock(return_value=False)
+    handler.conversation_summaries = Mock(recent_context=AsyncMock(return_value=[]))
+    handler.rag_repo = Mock(query_text=AsyncMock(return_value=[]))
+    handler.intelligent_response_handler = Mock(handle_message=AsyncMock(return_value=["9-5"]))
+    handler.send_intelligent_response = AsyncMock()
+    handler.message_writer = Mock()
+
+    with patch("src.core.tasks.realtime_intelligence.config") as config:
+        config.ANSWER_CACHE_ENABLED = False
+        config.STREAM_RESPONSES = False
+        result = await handler.process_message(
+            make_message(3, "your hours?"),
+            earlier=[make_message(1, "hi"), make_message(2, "what are")],
+        )
+
+    handler.intelligent_response_handler.handle_message.assert_awaited_once()
+    assert handler.intelligent_response_handler.handle_message.await_args.args[0] == (
+        "hi\nwhat are\nyour hours?"
+    )
+    handler.rag_repo.query_text.assert_awaited_once()
+    handler.send_intelligent_response.assert_awaited_once()
+    saved = handler.message_writer.add_many.call_args.args[0]
+    assert [doc["message_id"] for doc in saved] == [1, 2, 3]
+    assert result["intelligent_response"] == ["9-5"]
@@ -0,0 +1,120 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.core.tasks.message_writer import MessageWriteBuffer
+
+
+def make_mongo():
+    async def insert(collection, documents):
+        return {"inserted": len(documents), "duplicates": 0, "failed": 0}
+
+    return Mock(insert_many_ignore_duplicates=AsyncMock(side_effect=insert))
+
+
+def doc(message_id, chat_id=1):
+    return {"organization_id": "org", "chat_id": chat_id, "message_id": message_id}
+
+
+@pytest.mark.asyncio
+async def test_flushes_when_batch_is_full():
+    mongo = make_mongo()
+    writer = MessageWriteBuffer(mongo, batch_size=3, flush_interval_ms=10_000)
+
+    writer.add_many([doc(1), doc(2)])
+    await asyncio.sleep(0)
+    mongo.insert_many_ignore_duplicates.assert_not_called()
+
+    writer.add(doc(3))
+    await asyncio.sleep(0)
+    mongo.insert_many_ignore_duplicates.assert_awaited_once()
+    assert len(mongo.insert_many_ignore_duplicates.await_args.args[1]) == 3
+
+
+@pytest.mark.asyncio
+async def test_flushes_after_interval():
+    mongo = make_mongo()
+    writer = MessageWriteBuffer(mongo, batch_size=100, flush_interval_ms=20)
+
+    for i in range(10):
+        writer.add(doc(i))
+    await asyncio.sleep(0.05)
+
+    mongo.insert_many_ignore_duplicates.assert_awaited_once()
+    stats = writer.stats()
+    assert stats["inserted"] == 10
+    assert stats["round_trips_per_message"] == 0.1
+
+
+@pytest.mark.asyncio
+async def test_close_writes_pending_documents():
+    mongo = make_mongo()
+    writer = MessageWriteBuffer(mongo, batch_size=100, flush_interval_ms=10_000)
+    writer.add_many([doc(1), doc(2, chat_id=2)])
+
+    assert [d["message_id"] for d in writer.pending(chat_id=2)] == [2]
+
+    await writer.close()
+    mongo.insert_many_ignore_duplicates.assert_awaited_once()
+    assert writer.stats()["pending"] == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_batch_is_retried_with_backoff():
+    results = [{"inserted": 1, "duplicates": 0, "failed": 1}]
+
+    async def insert(collection, documents):
+        if results:
+            return results.pop()
+        return {"inserted": 1, "duplicates": 1, "failed": 0}
+
+    mongo = Mock(insert_many_ignore_duplicates=AsyncMock(side_effect=insert))
+    writer = MessageWriteBuffer(mongo, batch_size=2, flush_interval_ms=10_000, retry_delay=0.01)
+
+    writer.add_many([doc(1), doc(2)])
+    await asyncio.sleep(0)
+    assert len(writer.pending()) == 2
+    await asyncio.sleep(0.05)
+
+    assert mongo.insert_many_ignore_duplicates.await_count == 2
+    stats = writer.stats()
+    assert (stats["retries"], stats["failed"], stats["pending"]) == (1, 0, 0)
+
+
+@pytest.mark.asyncio
+async def test_batch_is_dropped_after_max_retries():
+    async def insert(collection, documents):
+        return {"inserted": 0, "duplicates": 0, "failed": len(documents)}
+
+    mongo = Mock(insert_many_ignore_duplicates=AsyncMock(side_effect=insert))
+    writer = MessageWriteBuffer(
+        mongo, batch_size=100, flush_interval_ms=10_000, max_retries=2, retry_delay=0.001
+    )
+    writer.add(doc(1))
+
+    await writer.close()
+
+    assert mongo.insert_many_ignore_duplicates.await_count == 3
+    assert writer.stats()["failed"] == 1
+    assert writer.pending() == []
+
+
+@pytest.mark.asyncio
+async def test_in_flight_documents_stay_visible():
+    release = asyncio.Event()
+
+    async def insert(collection, documents):
+        await release.wait()
+        return {"inserted": len(documents), "duplicates": 0, "failed": 0}
+
+    mongo = Mock(insert_many_ignore_duplicates=AsyncMock(side_effect=insert))
+    writer = MessageWriteBuffer(mongo, batch_size=1, flush_interval_ms=10_000)
+
+    writer.add(doc(1))
+    await asyncio.sleep(0)
+    assert [d["message_id"] for d in writer.pending(chat_id=1)] == [1]
+
+    release.set()
+    await writer.close()
+    assert writer.pending() == []
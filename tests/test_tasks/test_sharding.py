@@ -0,0 +1,155 @@
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+
+from src.config.config import config
+from src.core.tasks.background_task_manager import BackgroundTaskManager
+from src.core.tasks.shard_worker import ShardWorker
+from src.core.tasks.sharding import HashRing, WorkerRouter
+
+ORGS = [f"org-{i}" for i in range(300)]
+
+
+def test_hash_ring_spreads_keys_and_moves_few_on_change():
+    ring = HashRing(["w1", "w2", "w3"])
+    owners = {org: ring.owner(org) for org in ORGS}
+    counts = {worker: list(owners.values()).count(worker) for worker in ("w1", "w2", "w3")}
+    assert min(counts.values()) > 50
+
+    bigger = HashRing(["w1", "w2", "w3", "w4"])
+    moved = [org for org in ORGS if bigger.owner(org) != owners[org]]
+    assert all(bigger.owner(org) == "w4" for org in moved)
+    assert len(moved) < len(ORGS) / 2
+    assert HashRing().owner("org-1") is None
+
+
+class FakeLeases:
+    """In-memory stand-in for WorkerLeaseStore shared by several workers."""
+
+    def __init__(self, store, worker_id):
+        self.store = store
+        self.worker_id = worker_id
+        self.url = f"http://{worker_id}"
+
+    async def heartbeat(self):
+        self.store["workers"][self.worker_id] = self.url
+
+    async def live_workers(self):
+        return dict(self.store["workers"])
+
+    async def acquire(self, organization_id):
+        holder = self.store["leases"].setdefault(organization_id, self.worker_id)
+        return holder == self.worker_id
+
+    async def renew(self, organization_ids):
+        return [org for org in organization_ids if not await self.acquire(org)]
+
+    async def release(self, organization_id):
+        if self.store["leases"].get(organization_id) == self.worker_id:
+            del self.store["leases"][organization_id]
+
+    async def holder(self, organization_id):
+        return self.store["leases"].get(organization_id)
+
+
+def make_worker(store, worker_id, desired):
+    manager = Mock(active_tasks={})
+
+    async def start(organization_id, group_ids=None):
+        manager.active_tasks[organization_id] = object()
+        return {"success": True}
+
+    async def stop(organization_id, handoff=False):
+        manager.active_tasks.pop(organization_id)
+        return {"success": True}
+
+    manager.start_intelligence_task = AsyncMock(side_effect=start)
+    manager.stop_intelligence_task = AsyncMock(side_effect=stop)
+    manager.mongo_manager.find_many = AsyncMock(
+        side_effect=lambda *args, **kwargs: [{"organization_id": org} for org in desired]
+    )
+    worker = ShardWorker(manager, worker_id=worker_id, url=f"http://{worker_id}")
+    worker.leases = FakeLeases(store, worker_id)
+    return worker
+
+
+@pytest.mark.asyncio
+async def test_workers_split_organizations_and_rebalance():
+    store = {"workers": {}, "leases": {}}
+    desired = ORGS[:40]
+    first = make_worker(store, "w1", desired)
+    await first.reconcile()
+    assert set(first.manager.active_tasks) == set(desired)
+
+    second = make_worker(store, "w2", desired)
+    await second.leases.heartbeat()
+    handed = await first.reconcile()
+    await second.reconcile()
+
+    ring = HashRing(["w1", "w2"])
+    assert set(handed["handed_off"]) == {org for org in desired if ring.owner(org) == "w2"}
+    assert set(second.manager.active_tasks) == set(handed["handed_off"])
+    assert set(first.manager.active_tasks) | set(second.manager.active_tasks) == set(desired)
+    assert not set(first.manager.active_tasks) & set(second.manager.active_tasks)
+    first.manager.stop_intelligence_task.assert_awaited_with(handed["handed_off"][-1], handoff=True)
+
+
+@pytest.mark.asyncio
+async def test_worker_does_not_start_an_organization_leased_elsewhere():
+    store = {"workers": {}, "leases": {"org-1": "w9"}}
+    worker = make_worker(store, "w1", ["org-1"])
+
+    await worker.reconcile()
+    result = await worker.start_task("org-1", None)
+
+    assert worker.manager.active_tasks == {}
+    assert result["success"] is False
+
+
+@pytest.mark.asyncio
+async def test_router_sends_calls_to_lease_holder():
+    store = {"workers": {"w1": "http://w1", "w2": "http://w2"}, "leases": {"org-1": "w2"}}
+    router = WorkerRouter(FakeLeases(store, "api"), secret="s")
+    router.call = AsyncMock(return_value={"success": True})
+
+    await router.call_owner("GET", "org-1", "status")
+    router.call.assert_awaited_once_with("GET", "http://w2", "/internal/tasks/org-1/status", None)
+
+    del store["leases"]["org-1"]
+    owner = await router.owner("org-1")
+    assert owner[0] == HashRing(["w1", "w2"]).owner("org-1")
+    await router.close()
+
+
+@pytest.mark.asyncio
+async def test_worker_start_fails_without_lease_indexes():
+    worker = ShardWorker(Mock(), worker_id="w1", url="http://w1")
+    worker.leases = Mock(setup_indexes=AsyncMock(return_value=False), heartbeat=AsyncMock())
+
+    with pytest.raises(RuntimeError):
+        await worker.start()
+    worker.leases.heartbeat.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_only_shard_workers_hand_off_on_shutdown():
+    manager = BackgroundTaskManager()
+    manager.active_tasks = {"org-1": Mock()}
+    manager.stop_intelligence_task = AsyncMock()
+
+    await manager.shutdown()
+    manager.stop_intelligence_task.assert_awaited_once_with("org-1", handoff=False)
+    assert manager._runtime is None
+
+    worker = ShardWorker(manager, worker_id="w1", url="http://w1")
+    worker.leases = Mock(deregister=AsyncMock())
+    await worker.stop()
+    manager.stop_intelligence_task.assert_awaited_with("org-1", handoff=True)
+
+
+def test_control_mode_builds_no_runtime():
+    with patch.object(config, "WORKER_MODE", "control"):
+        manager = BackgroundTaskManager()
+
+    assert manager.router is not None
+    assert manager._runtime is None
@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.core.tasks.realtime_intelligence import RealTimeIntelligenceHandler
+
+
+async def deltas(*parts):
+    for part in parts:
+        yield part
+
+
+@pytest.fixture
+def handler():
+    handler = RealTimeIntelligenceHandler(organization_id="org")
+    placeholder = Mock(edit=AsyncMock(), delete=AsyncMock())
+    handler.client = Mock(
+        is_connected=Mock(return_value=True), send_message=AsyncMock(return_value=placeholder)
+    )
+    return handler, placeholder
+
+
+@pytest.mark.asyncio
+async def test_edits_placeholder_with_valid_partial_html(handler):
+    handler, placeholder = handler
+    result = await handler.stream_intelligent_response(
+        1, deltas("```html\n<b>Open", " 9-5</b>", " daily\n```"), edit_interval=0
+    )
+
+    assert result == "<b>Open 9-5</b> daily"
+    handler.client.send_message.assert_awaited_once_with(1, handler.STREAM_PLACEHOLDER)
+    edits = [call.args[0] for call in placeholder.edit.await_args_list]
+    assert edits[0] == "<b>Open</b>"
+    assert edits[-1] == "<b>Open 9-5</b> daily"
+
+
+@pytest.mark.asyncio
+async def test_edits_are_throttled(handler):
+    handler, placeholder = handler
+    await handler.stream_intelligent_response(1, deltas("a", "b", "c", "d"), edit_interval=60)
+
+    edits = [call.args[0] for call in placeholder.edit.await_args_list]
+    assert edits == ["a", "abcd"]
+
+
+@pytest.mark.asyncio
+async def test_empty_stream_removes_placeholder(handler):
+    handler, placeholder = handler
+    assert await handler.stream_intelligent_response(1, deltas(), edit_interval=0) == ""
+    placeholder.delete.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failed_stream_returns_none_and_closes_deltas(handler):
+    handler, placeholder = handler
+    placeholder.edit.side_effect = [None, RuntimeError("edit failed")]
+    closed = []
+
+    async def endless():
+        try:
+            while True:
+                yield "part "
+        finally:
+            closed.append(True)
+
+    assert await handler.stream_intelligent_response(1, endless(), edit_interval=0) is None
+    assert closed == [True]
+
+
+def test_keyword_only_results_do_not_attach_media(handler):
+    handler, _ = handler
+    results = [
+        {"metadata": {"type": "pdf", "path": "a.pdf"}, "vector_score": 0.7},
+        {"metadata": {"type": "image", "path": "b.png"}, "lexical_only": True},
+    ]
+
+    assert handler.extract_media_files(results) == ([], [], [], ["a.pdf"])
@@ -0,0 +1,149 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, Mock
+
+import pytest
+
+from src.core.tasks.realtime_intelligence import RealTimeIntelligenceHandler
+from src.core.tasks.tenant_runtime import TenantRuntime, deep_sizeof
+
+
+def make_event(chat_id, sender_id=1, text="hello"):
+    return SimpleNamespace(message=SimpleNamespace(chat_id=chat_id, sender_id=sender_id, text=text))
+
+
+@pytest.fixture
+def runtime():
+    runtime = TenantRuntime(workers=2)
+    runtime.debouncer.window = 0
+    return runtime
+
+
+@pytest.mark.asyncio
+async def test_handlers_share_clients_and_get_their_own_messages(runtime):
+    first = RealTimeIntelligenceHandler("org-1", runtime=runtime)
+    second = RealTimeIntelligenceHandler("org-2", runtime=runtime)
+    assert first.mongo_manager is second.mongo_manager
+    assert first.rag_repo is second.rag_repo
+    assert first.entity_cache is not second.entity_cache
+
+    first._handle_new_message = AsyncMock()
+    second._handle_new_message = AsyncMock()
+    await first.handle_new_message(make_event(10))
+    await second.handle_new_message(make_event(10))
+    await runtime.dispatcher.drain()
+
+    assert first._handle_new_message.await_args.args[0][0].message.chat_id == 10
+    first._handle_new_message.assert_awaited_once()
+    second._handle_new_message.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stopping_one_tenant_keeps_shared_resources_open(runtime):
+    handler = RealTimeIntelligenceHandler("org-1", runtime=runtime)
+    handler.conversation_summaries = Mock(flush=AsyncMock())
+    runtime.close = AsyncMock()
+    processed = []
+
+    async def slow_handle(events):
+        await asyncio.sleep(0.01)
+        processed.extend(events)
+
+    handler._handle_new_message = slow_handle
+    await handler.handle_new_message(make_event(10))
+    await handler.stop_listening()
+
+    assert len(processed) == 1
+    assert "org-1" not in runtime.tenants
+    runtime.close.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_memory_per_tenant_excludes_shared_objects(runtime):
+    small = RealTimeIntelligenceHandler("small", runtime=runtime)
+    large = RealTimeIntelligenceHandler("large", runtime=runtime)
+    large.entity_cache.users.put(1, "x" * 1_000_000)
+
+    memory = runtime.memory_per_tenant()
+
+    assert memory["large"] - memory["small"] >= 1_000_000
+    assert memory["small"] < deep_sizeof(runtime.rag_repo)
+    assert (await runtime.memory_report())["tenants"] == 2
+
+
+@pytest.mark.asyncio
+async def test_memory_for_is_cached_per_organization(runtime):
+    handler = RealTimeIntelligenceHandler("org-1", runtime=runtime)
+    runtime.register(handler)
+
+    first = await runtime.memory_for("org-1")
+    handler.entity_cache.users.put(1, "x" * 1_000_000)
+
+    assert await runtime.memory_for("org-1") == first
+    runtime.memory_ttl = 0
+    assert await runtime.memory_for("org-1") - first >= 1_000_000
+    assert await runtime.memory_for("missing") is None
+
+
+@pytest.mark.asyncio
+async def test_overflowing_messages_are_saved_without_a_reply(runtime):
+    handler = RealTimeIntelligenceHandler("org-1", runtime=runtime)
+    handler.save_unanswered = AsyncMock()
+    release = asyncio.Event()
+    handled = []
+
+    async def slow_handle(events):
+        await release.wait()
+        handled.append([event.message.text for event in events])
+
+    handler._handle_new_message = slow_handle
+    runtime.dispatcher.max_queue_depth = 1
+    for text in ("a", "b", "c"):
+        await handler.handle_new_message(make_event(10, text=text))
+        await asyncio.sleep(0)
+
+    runtime.dispatcher.overflow_policy = "drop_newest"
+    dropped = make_event(10, text="d")
+    await handler.handle_new_message(dropped)
+    release.set()
+    await runtime.drain("org-1")
+
+    assert handled == [["a"], ["b", "c"]]
+    handler.save_unanswered.assert_awaited_once_with([dropped])
+
+
+@pytest.mark.asyncio
+async def test_merged_batch_answers_only_the_last_sender(runtime):
+    handler = RealTimeIntelligenceHandler("org-1", runtime=runtime)
+    handler.save_unanswered = AsyncMock()
+    handler.process_message = AsyncMock(return_value={})
+    events = [make_event(10, 1, "a"), make_event(10, 2, "b"), make_event(10, 2, "c")]
+
+    await handler._handle_new_message(events)
+
+    handler.save_unanswered.assert_awaited_once_with(events[:1])
+    handler.process_message.assert_awaited_once_with(events[2].message, earlier=[events[1].message])
+
+
+@pytest.mark.asyncio
+async def test_unanswered_messages_reach_the_conversation_summary(runtime):
+    handler = RealTimeIntelligenceHandler("org-1", runtime=runtime)
+    handler.message_writer = Mock()
+    handler.conversation_summaries = Mock()
+    handler._build_message_data = AsyncMock(
+        side_effect=lambda message: {
+            "id": 1,
+            "chat_id": message.chat_id,
+            "text": message.text,
+            "date": None,
+            "sender_id": message.sender_id,
+            "sender_name": "Ann",
+        }
+    )
+
+    await handler.save_unanswered([make_event(10, text="first"), make_event(10, text="second")])
+
+    handler.message_writer.add_many.assert_called_once()
+    chat_id, turns = handler.conversation_summaries.schedule_update.call_args.args
+    assert chat_id == 10
+    assert [turn["text"] for turn in turns] == ["first", "second"]